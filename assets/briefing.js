@@ -0,0 +1,115 @@
+// Tasks arrive as a JSON payload of [text, priority, source] rows and only the
+// rows near the viewport are kept in the DOM, so long lists stay responsive.
+(function () {
+    const ROW_HEIGHT = 82;  // .task-item height (70px) + 12px gap
+    const OVERSCAN = 8;     // rows rendered beyond each edge of the viewport
+    const SOURCE_ICONS = {user: '👤', email: '📧', ai: '🤖'};
+
+    const tasks = JSON.parse(document.getElementById('task-data').textContent);
+    const list = document.getElementById('task-list');
+    const rows = new Map();  // task index -> row element currently in the DOM
+
+    // Load saved state from localStorage
+    const taskStates = JSON.parse(localStorage.getItem('taskStates')) || {};
+    let completed = Object.keys(taskStates).filter(id => taskStates[id] && id < tasks.length).length;
+
+    const rowTemplate = document.createElement('div');
+    rowTemplate.className = 'task-item';
+    rowTemplate.innerHTML = '<div class="task-checkbox"></div>' +
+        '<div class="task-content"><div class="task-text"></div>' +
+        '<div class="task-meta"><span class="task-priority"></span><span class="task-source"></span></div></div>';
+
+    function createRow(index) {
+        const [text, priority, source] = tasks[index];
+        const row = rowTemplate.cloneNode(true);
+        row.dataset.taskId = index;
+        row.style.top = (index * ROW_HEIGHT) + 'px';
+        if (taskStates[index]) {
+            row.classList.add('completed');
+        }
+
+        const textEl = row.querySelector('.task-text');
+        textEl.textContent = text;
+        textEl.title = text;
+        const priorityEl = row.querySelector('.task-priority');
+        priorityEl.className = 'task-priority ' + priority;
+        priorityEl.textContent = priority.toUpperCase();
+        const icon = SOURCE_ICONS[source.split(' + ')[0]] || '📝';
+        row.querySelector('.task-source').textContent = icon + ' ' + source;
+        return row;
+    }
+
+    // Keep only the rows in (or near) the viewport attached
+    function renderWindow() {
+        const top = list.getBoundingClientRect().top;
+        const first = Math.max(0, Math.floor(-top / ROW_HEIGHT) - OVERSCAN);
+        const last = Math.min(tasks.length, Math.ceil((window.innerHeight - top) / ROW_HEIGHT) + OVERSCAN);
+
+        for (const [index, row] of rows) {
+            if (index < first || index >= last) {
+                row.remove();
+                rows.delete(index);
+            }
+        }
+
+        const fragment = document.createDocumentFragment();
+        for (let index = first; index < last; index++) {
+            if (!rows.has(index)) {
+                const row = createRow(index);
+                rows.set(index, row);
+                fragment.appendChild(row);
+            }
+        }
+        list.appendChild(fragment);
+    }
+
+    let frameRequested = false;
+    function scheduleRender() {
+        if (!frameRequested) {
+            frameRequested = true;
+            requestAnimationFrame(() => {
+                frameRequested = false;
+                renderWindow();
+            });
+        }
+    }
+
+    // Update progress from the running count (no DOM queries)
+    function updateProgress() {
+        const total = tasks.length;
+        const percentage = total > 0 ? Math.round((completed / total) * 100) : 0;
+
+        document.getElementById('completed-tasks').textContent = completed;
+        document.getElementById('remaining-tasks').textContent = total - completed;
+        document.getElementById('progress-fill').style.width = percentage + '%';
+        document.getElementById('progress-fill').textContent = percentage + '%';
+    }
+
+    // One delegated click handler for every row
+    list.addEventListener('click', event => {
+        const row = event.target.closest('.task-item');
+        if (!row) {
+            return;
+        }
+        const taskId = row.dataset.taskId;
+
+        // Save state
+        if (row.classList.toggle('completed')) {
+            taskStates[taskId] = true;
+            completed++;
+        } else {
+            delete taskStates[taskId];
+            completed--;
+        }
+        localStorage.setItem('taskStates', JSON.stringify(taskStates));
+
+        updateProgress();
+    });
+
+    window.addEventListener('scroll', scheduleRender, {passive: true});
+    window.addEventListener('resize', scheduleRender);
+
+    list.style.height = (tasks.length * ROW_HEIGHT) + 'px';
+    renderWindow();
+    updateProgress();
+})();
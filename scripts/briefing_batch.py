@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Morning Briefing Batch Generator
+Generates briefings for many users in parallel across a process pool,
+with isolated per-user outputs and a throughput/failure summary.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from briefing_model import output_formats
+from briefing_pipeline import final_pipeline, PipelineAbort
+from trace_spans import disable, enable, merge, profiled, recording, span
+
+
+def load_jobs(source):
+    """Build (user, email_data_or_path) jobs from an input directory or a manifest file."""
+    source = Path(source)
+
+    if source.is_dir():
+        return [(path.stem, str(path.resolve())) for path in sorted(source.glob('*.json'))]
+
+    with open(source, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    entries = manifest.get('users', []) if isinstance(manifest, dict) else manifest
+    jobs = []
+    for entry in entries:
+        name = entry.get('name') or entry.get('user')
+        if not name:
+            raise ValueError("Every manifest entry needs a 'name'")
+        if Path(name).name != name or name in ('.', '..'):
+            raise ValueError(f"User name '{name}' must be a plain directory name")
+        if 'email_data' in entry:
+            jobs.append((name, entry['email_data']))
+        elif not entry.get('input'):
+            raise ValueError(f"Manifest entry '{name}' needs 'email_data' or 'input'")
+        else:
+            jobs.append((name, str((source.resolve().parent / entry['input']).resolve())))
+    return jobs
+
+
+def run_user(name, email_input, output_root, skip_image=False, trace=False):
+    """Generate one user's briefing in a worker process (output isolated per user).
+
+    trace: record this user's spans and return them in result['trace'].
+    """
+    if trace:
+        enable()
+    start = time.perf_counter()
+    output_dir = Path(output_root) / name
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    def fetch():
+        if isinstance(email_input, dict):
+            return email_input
+        with open(email_input, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    result = {'user': name, 'ok': False, 'tasks': 0, 'outputs': [], 'error': None}
+    with open(output_dir / 'briefing.log', 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log), \
+            span('user', 'batch', user=name):
+        try:
+            formats = [f for f in output_formats() if f != 'image'] if skip_image else None
+            pipeline = final_pipeline(fetch=fetch, formats=formats)
+            context = pipeline.run(output_dir=str(output_dir))
+            pipeline.print_timings()
+            result['outputs'] = [context[a] for a in pipeline.artifacts if context.get(a)]
+            result['tasks'] = len(context['tasks'])
+            result['ok'] = bool(result['outputs'])
+            if not result['ok']:
+                result['error'] = 'No outputs generated'
+        except PipelineAbort as e:
+            result['error'] = str(e)
+        except Exception as e:
+            result['error'] = f"{type(e).__name__}: {e}"
+
+    result['seconds'] = time.perf_counter() - start
+    if trace:
+        result['trace'] = disable().export()
+    return result
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_batch(jobs, output_root, workers=None, skip_image=False):
+    """Fan jobs out over a process pool and return the per-user results.
+
+    When this run is profiled, each worker records its spans and they are merged into the trace.
+    """
+    results = []
+    trace = recording()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_user, name, email_input, output_root, skip_image, trace): name
+                   for name, email_input in jobs}
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker died (e.g. killed for memory) or failed outside run_user's handling
+                result = {'user': futures[future], 'ok': False, 'tasks': 0, 'outputs': [],
+                          'error': f"{type(e).__name__}: {e}", 'seconds': 0.0}
+            merge(result.pop('trace', None))
+            results.append(result)
+            mark = '✓' if result['ok'] else '✗'
+            print(f"  [{done}/{len(jobs)}] {mark} {result['user']} ({result['seconds']:.2f}s)", flush=True)
+    return results
+
+
+def print_summary(results, elapsed):
+    """Print throughput and failure summary."""
+    ok = [r for r in results if r['ok']]
+    failed = [r for r in results if not r['ok']]
+    durations = [r['seconds'] for r in results]
+
+    print("\n" + "=" * 60)
+    print("BATCH SUMMARY")
+    print("=" * 60)
+    print(f"Users: {len(results)}  Succeeded: {len(ok)}  Failed: {len(failed)}")
+    print(f"Wall time: {elapsed:.2f}s  Throughput: {len(results) / elapsed if elapsed else 0:.1f} users/s")
+    print(f"Per-user time: p50 {percentile(durations, 0.5):.2f}s  "
+          f"p95 {percentile(durations, 0.95):.2f}s  max {max(durations, default=0):.2f}s")
+    print(f"Tasks generated: {sum(r['tasks'] for r in ok)}")
+    if failed:
+        print("\nFailures:")
+        for r in failed:
+            print(f"  ✗ {r['user']}: {r['error']}")
+    print("=" * 60)
+
+
+@profiled
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description='Generate morning briefings for many users')
+    parser.add_argument('inputs', help='Directory of <user>.json inputs, or a manifest JSON file')
+    parser.add_argument('--output-dir', default=os.getenv('MORNING_ROUTINE_OUTPUT_DIR', './outputs'),
+                        help='Root output directory; each user gets a subdirectory')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='Number of worker processes (default: CPU count)')
+    parser.add_argument('--skip-image', action='store_true',
+                        help='Only render webpages, skip static image generation')
+    parser.add_argument('--report', help='Write per-user results as JSON to this file')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("☀️  MORNING BRIEFING BATCH")
+    print("=" * 60)
+
+    try:
+        jobs = load_jobs(args.inputs)
+    except (OSError, ValueError) as e:
+        print(f"✗ Could not load jobs from {args.inputs}: {e}")
+        return 1
+    if not jobs:
+        print(f"⚠️  No user inputs found in {args.inputs}")
+        return 1
+
+    print(f"📋 {len(jobs)} users, {args.workers} workers → {args.output_dir}/<user>/")
+    start = time.perf_counter()
+    results = run_batch(jobs, args.output_dir, workers=args.workers, skip_image=args.skip_image)
+    elapsed = time.perf_counter() - start
+
+    print_summary(results, elapsed)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'elapsed': elapsed, 'results': results}, f, indent=2, ensure_ascii=False)
+        print(f"📝 Report: {args.report}")
+
+    return 0 if all(r['ok'] for r in results) else 1
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\nInterrupted")
+        sys.exit(1)
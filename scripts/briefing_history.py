@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Briefing History
+Keeps an archive of the outputs directory: an append-only manifest
+(history.jsonl, one line per briefing day) and paginated index pages
+(history-1.html is the oldest page, history.html mirrors the newest). Pages
+are in date order. Adding today's briefing rewrites only the page it lands on,
+plus the previous page when a new page is started, so updates stay cheap
+however long the history grows; backfilling an older day also rewrites the
+pages after it, since their entries shift.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+
+from template_renderer import load_template
+
+MANIFEST = 'history.jsonl'
+INDEX_PAGE = 'history.html'
+PAGE_TEMPLATE = 'history_page.html'
+PAGE_SIZE = 30
+
+# Dated output files: morning-briefing-YYYYMMDD.html, morning-routine-YYYYMMDD.md, ...
+DAY_FILE = re.compile(r'^morning-(?:briefing|routine)-(\d{8})(\.[a-z]+)$')
+
+# Linked file suffix -> label, in display order
+LINKS = {'.html': 'Webpage', '.png': 'Image', '.md': 'Report', '.txt': 'Text', '.json': 'Snapshot'}
+
+
+def page_name(page):
+    """File name of a numbered history page (1 is the oldest)."""
+    return f"history-{page}.html"
+
+
+def day_label(day):
+    """'20250101' -> 'Wednesday, January 01, 2025'."""
+    return datetime.strptime(day, '%Y%m%d').strftime("%A, %B %d, %Y")
+
+
+def load_manifest(output_dir):
+    """Entries oldest day first; a later line for a day replaces the earlier one."""
+    by_day = {}
+    path = Path(output_dir) / MANIFEST
+    if not path.exists():
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # a torn last line from an interrupted append
+            by_day[entry['day']] = entry
+    # Lines are appended in the order days were added, which is not date order after a backfill
+    return [by_day[day] for day in sorted(by_day)]
+
+
+def _append(output_dir, entries):
+    with open(Path(output_dir) / MANIFEST, 'a', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+
+def _page_context(entries, page, pages, page_size):
+    chunk = entries[(page - 1) * page_size:page * page_size]
+    nav = []
+    if page < pages:
+        nav.append({'href': page_name(page + 1), 'label': '← Newer'})
+    if page > 1:
+        nav.append({'href': page_name(page - 1), 'label': 'Older →'})
+    return {
+        'page': page,
+        'pages': pages,
+        'entries': [{
+            'date': entry.get('date') or day_label(entry['day']),
+            'summary': entry.get('summary', ''),
+            'tasks': entry.get('tasks', 0),
+            'links': [{'href': entry['files'][suffix], 'label': label}
+                      for suffix, label in LINKS.items() if suffix in entry['files']]
+        } for entry in reversed(chunk)],
+        'nav': nav
+    }
+
+
+def _write_page(output_dir, name, context):
+    # Write-then-rename so a browser never loads a half-written page
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, prefix=f".{name}.")
+    os.close(fd)
+    load_template(PAGE_TEMPLATE).render_to_file(tmp_path, context)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, Path(output_dir) / name)
+
+
+def page_count(count, page_size=PAGE_SIZE):
+    """Number of history pages for `count` entries (at least one)."""
+    return max(1, -(-count // page_size))
+
+
+def shifted_pages(position, old_count, new_count, page_size=PAGE_SIZE):
+    """Pages to rewrite after days were inserted at `position` and later: that page
+    onward, plus the previous newest page when a page was added (it gains a "Newer" link)."""
+    old_pages, pages = page_count(old_count, page_size), page_count(new_count, page_size)
+    first = position // page_size + 1
+    if pages > old_pages:
+        first = min(first, old_pages)
+    return range(first, pages + 1)
+
+
+def write_pages(output_dir, entries, pages_to_write, page_size=PAGE_SIZE):
+    """Render the given page numbers (history.html too when the newest page is among them)."""
+    pages = page_count(len(entries), page_size)
+    written = []
+    for page in sorted(set(pages_to_write)):
+        context = _page_context(entries, page, pages, page_size)
+        _write_page(output_dir, page_name(page), context)
+        written.append(page_name(page))
+        if page == pages:
+            _write_page(output_dir, INDEX_PAGE, context)
+            written.append(INDEX_PAGE)
+    return written
+
+
+def record_day(output_dir, entry, page_size=PAGE_SIZE):
+    """Append a day's entry to the manifest and rewrite only the pages it affects.
+
+    Recording a day again keeps the files of the earlier entry that the new one
+    does not replace (e.g. a report written by another generator). A day older
+    than the newest one is inserted in date order.
+    """
+    entries = load_manifest(output_dir)
+    position = bisect_left([e['day'] for e in entries], entry['day'])
+    replacing = position < len(entries) and entries[position]['day'] == entry['day']
+    if replacing:
+        entry = {**entry, 'files': {**entries[position]['files'], **entry['files']}}
+    _append(output_dir, [entry])
+
+    if replacing:
+        entries[position] = entry
+        return write_pages(output_dir, entries, {position // page_size + 1}, page_size)
+    entries.insert(position, entry)
+    return write_pages(output_dir, entries, shifted_pages(position, len(entries) - 1, len(entries), page_size),
+                       page_size)
+
+
+def record_briefing(output_dir, briefing, outputs):
+    """Record a rendered briefing; outputs maps format -> written path (or None)."""
+    day = briefing.generated_at[:10].replace('-', '')
+    files = {}
+    for path in outputs.values():
+        match = DAY_FILE.match(os.path.basename(path)) if path else None
+        if match and match.group(2) in LINKS:
+            files[match.group(2)] = match.group(0)
+    entry = {'day': day, 'date': briefing.date, 'summary': briefing.email_summary,
+             'tasks': len(briefing.tasks), 'files': files}
+    try:
+        written = record_day(output_dir, entry)
+        print(f"🗂️  History updated: {', '.join(written)}")
+        return str(Path(output_dir) / INDEX_PAGE)
+    except OSError as e:
+        print(f"✗ Error updating history: {e}")
+        return None
+
+
+def scan_outputs(output_dir):
+    """Entries for the dated files found in an outputs directory, oldest day first."""
+    days = {}
+    for name in sorted(os.listdir(output_dir)):
+        match = DAY_FILE.match(name)
+        if match and match.group(2) in LINKS:
+            days.setdefault(match.group(1), {})[match.group(2)] = name
+
+    entries = []
+    for day, files in sorted(days.items()):
+        entry = {'day': day, 'date': day_label(day), 'summary': '', 'tasks': 0, 'files': files}
+        if '.json' in files:
+            try:
+                with open(Path(output_dir) / files['.json'], 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+                entry.update(summary=snapshot.get('email_summary', ''), tasks=len(snapshot.get('tasks', [])))
+            except (OSError, ValueError):
+                pass
+        entries.append(entry)
+    return entries
+
+
+def import_outputs(output_dir, page_size=PAGE_SIZE):
+    """Add days found in the outputs directory that the manifest does not list yet.
+
+    The new days are placed in date order; pages from the oldest new day onward are rewritten.
+    """
+    entries = load_manifest(output_dir)
+    known = {entry['day'] for entry in entries}
+    new_entries = [entry for entry in scan_outputs(output_dir) if entry['day'] not in known]
+    if not new_entries:
+        return new_entries, rebuild(output_dir, page_size)
+    _append(output_dir, new_entries)
+
+    old_count = len(entries)
+    entries = load_manifest(output_dir)
+    position = bisect_left([e['day'] for e in entries], new_entries[0]['day'])
+    return new_entries, write_pages(output_dir, entries, shifted_pages(position, old_count, len(entries), page_size),
+                                    page_size)
+
+
+def rebuild(output_dir, page_size=PAGE_SIZE):
+    """Rewrite every history page from the manifest (after changing the page size, for instance)."""
+    entries = load_manifest(output_dir)
+    return write_pages(output_dir, entries, range(1, page_count(len(entries), page_size) + 1), page_size)
+
+
+def _benchmark(days, page_size):
+    with tempfile.TemporaryDirectory() as tmp:
+        start_day = datetime(2020, 1, 1).toordinal()
+        entries = [{'day': datetime.fromordinal(start_day + i).strftime('%Y%m%d'), 'summary': f"{i % 40} unread emails",
+                    'tasks': i % 12, 'files': {'.html': 'x.html', '.png': 'x.png'}} for i in range(days + 1)]
+        _append(tmp, entries[:days])
+
+        start = time.perf_counter()
+        rebuild(tmp, page_size)
+        full = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        written = record_day(tmp, entries[days], page_size)
+        incremental = (time.perf_counter() - start) * 1000
+
+        print(f"{days} days, {page_size} per page: full rebuild {full:.1f} ms, "
+              f"adding one day {incremental:.1f} ms ({', '.join(written)})")
+
+
+def main():
+    """Import existing outputs into the history, rebuild its pages, or benchmark updates."""
+    parser = argparse.ArgumentParser(description='Maintain the briefing history index')
+    parser.add_argument('command', choices=['import', 'rebuild', 'benchmark'])
+    parser.add_argument('output_dir', nargs='?', default=os.getenv('MORNING_ROUTINE_OUTPUT_DIR', './outputs'))
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE)
+    parser.add_argument('--days', type=int, default=3650, help='benchmark: history length')
+    args = parser.parse_args()
+
+    if args.command == 'benchmark':
+        _benchmark(args.days, args.page_size)
+        return 0
+
+    if not os.path.isdir(args.output_dir):
+        print(f"✗ No outputs directory: {args.output_dir}")
+        return 1
+
+    if args.command == 'import':
+        new_entries, written = import_outputs(args.output_dir, args.page_size)
+        print(f"✓ {len(new_entries)} new days imported")
+    else:
+        written = rebuild(args.output_dir, args.page_size)
+    print(f"✓ {len(written)} pages written; open {os.path.join(args.output_dir, INDEX_PAGE)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Briefing Model
+The summary and task list of one run, built once as an immutable model and
+saved as a JSON snapshot. Every output format (image, webpage, report, image
+prompt, plain text, JSON) is a renderer over this model, and the renderers run
+in parallel. Adding a format, or re-rendering a saved snapshot, never re-runs
+extraction.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from task_ranking import top_k
+from trace_spans import profiled, span
+
+# Tasks shown on the dashboard image and in the image prompt
+TOP_TASKS = 8
+
+PRIORITY_LABELS = {'high': 'HIGH', 'medium': 'MED', 'low': 'LOW'}
+
+BriefingTask = namedtuple('BriefingTask', ['text', 'priority', 'source'])
+BriefingTask.__doc__ = """One task as rendered: text, priority and source label ('user + email')."""
+
+Briefing = namedtuple('Briefing', ['date', 'generated_at', 'email_summary', 'unread_count',
+                                   'tasks', 'top_tasks', 'image_path'])
+Briefing.__doc__ = """One run's briefing: all tasks in order, plus the top-ranked ones for the image.
+
+unread_count is None when the email source does not report it; image_path is
+where the dashboard image is (or will be) written, if any.
+"""
+
+
+def briefing_task(task):
+    """BriefingTask for a task dict from extraction/dedup."""
+    source = ' + '.join(task.get('sources', [task.get('source', 'unknown')]))
+    return BriefingTask(task.get('task', 'Untitled task'), task.get('priority', 'medium'), source)
+
+
+def build_briefing(email_summary, tasks, unread_count=None, image_path=None, now=None):
+    """Build the model from a summary line and task dicts (ranking runs once, here)."""
+    now = now or datetime.now()
+    return Briefing(
+        date=now.strftime("%A, %B %d, %Y"),
+        generated_at=now.isoformat(timespec='seconds'),
+        email_summary=email_summary,
+        unread_count=unread_count,
+        tasks=tuple(briefing_task(task) for task in tasks),
+        top_tasks=tuple(briefing_task(task) for task in top_k(tasks, TOP_TASKS)),
+        image_path=str(image_path) if image_path else None
+    )
+
+
+def to_dict(briefing):
+    """JSON-ready dict; tasks become [text, priority, source] rows."""
+    data = briefing._asdict()
+    data['tasks'] = [list(task) for task in briefing.tasks]
+    data['top_tasks'] = [list(task) for task in briefing.top_tasks]
+    return data
+
+
+def from_dict(data):
+    """Rebuild the model from a snapshot dict."""
+    return Briefing(**{
+        **data,
+        'tasks': tuple(BriefingTask(*task) for task in data['tasks']),
+        'top_tasks': tuple(BriefingTask(*task) for task in data['top_tasks'])
+    })
+
+
+def write_snapshot(briefing, path):
+    """Write the JSON snapshot (write-then-rename, so readers never see a partial file)."""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(to_dict(briefing), f, indent=2, ensure_ascii=False)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+    return str(path)
+
+
+def load_snapshot(path):
+    """Load a briefing from a JSON snapshot."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return from_dict(json.load(f))
+
+
+def briefing_text(briefing):
+    """Plain-text briefing (terminal, email body, notifications)."""
+    lines = [f"Morning Briefing - {briefing.date}", briefing.email_summary, '', "Today's Tasks"]
+    width = len(str(len(briefing.tasks)))
+    for i, task in enumerate(briefing.tasks, 1):
+        label = PRIORITY_LABELS.get(task.priority, 'TASK')
+        lines.append(f"{i:>{width}}. [{label}] {task.text} ({task.source})")
+    if not briefing.tasks:
+        lines.append("No tasks for today")
+    return '\n'.join(lines) + '\n'
+
+
+def _write_text(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return str(path)
+
+
+# Renderers import their generator lazily: the generators import this module
+def _render_image(briefing, path):
+    from generate_morning_briefing_final import render_static_image
+    return render_static_image(briefing, path)
+
+
+def _render_html(briefing, path):
+    from generate_morning_briefing_final import write_webpage
+    return write_webpage(briefing, path)
+
+
+def _render_markdown(briefing, path):
+    from generate_routine import write_report
+    return write_report(briefing, path)
+
+
+def _render_image_prompt(briefing, path):
+    from generate_morning_briefing_final import image_prompt
+    return _write_text(path, image_prompt(briefing))
+
+
+def _render_text(briefing, path):
+    return _write_text(path, briefing_text(briefing))
+
+
+# Output format -> (file suffix, renderer(briefing, path) -> path or None)
+RENDERERS = {
+    'image': ('.png', _render_image),
+    'html': ('.html', _render_html),
+    'markdown': ('.md', _render_markdown),
+    'image_prompt': ('.prompt.txt', _render_image_prompt),
+    'text': ('.txt', _render_text),
+    'json': ('.json', write_snapshot),
+}
+
+DEFAULT_FORMATS = ('image', 'html', 'json')
+
+
+def output_formats(formats=None):
+    """Formats to render (argument, then MORNING_ROUTINE_FORMATS, then image + html + json)."""
+    if formats is None:
+        value = os.getenv('MORNING_ROUTINE_FORMATS')
+        formats = [f.strip() for f in value.split(',') if f.strip()] if value else DEFAULT_FORMATS
+    unknown = [f for f in formats if f not in RENDERERS]
+    if unknown:
+        raise ValueError(f"Unknown output format(s) {', '.join(unknown)} "
+                         f"(expected: {', '.join(RENDERERS)})")
+    return tuple(dict.fromkeys(formats))
+
+
+def output_path(briefing, output_dir, fmt, prefix='morning-briefing'):
+    """Dated output file for a format, e.g. outputs/morning-briefing-20250101.html."""
+    stamp = briefing.generated_at[:10].replace('-', '')
+    return str(Path(output_dir) / f"{prefix}-{stamp}{RENDERERS[fmt][0]}")
+
+
+def _render_one(briefing, fmt, path):
+    try:
+        # render-image, render-html, render-json, ...
+        with span(f"render-{fmt.replace('_', '-')}", 'render'):
+            return RENDERERS[fmt][1](briefing, path)
+    except Exception as e:
+        print(f"✗ Error rendering {fmt}: {e}")
+        return None
+
+
+def render_all(briefing, output_dir, formats=None, prefix='morning-briefing', max_workers=4):
+    """Render the briefing into every format in parallel; returns {format: path or None}."""
+    formats = output_formats(formats)
+    os.makedirs(output_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {fmt: executor.submit(_render_one, briefing, fmt, output_path(briefing, output_dir, fmt, prefix))
+                   for fmt in formats}
+    return {fmt: future.result() for fmt, future in futures.items()}
+
+
+@profiled
+def main():
+    """Render more formats from a saved snapshot, without re-running extraction."""
+    parser = argparse.ArgumentParser(description='Render a saved briefing snapshot into other formats')
+    parser.add_argument('snapshot', help='JSON snapshot, e.g. outputs/morning-briefing-YYYYMMDD.json')
+    parser.add_argument('--formats', nargs='+', choices=sorted(RENDERERS),
+                        default=['markdown', 'text', 'image_prompt'])
+    parser.add_argument('--output-dir', help='default: the snapshot directory')
+    args = parser.parse_args()
+
+    briefing = load_snapshot(args.snapshot)
+    output_dir = args.output_dir or os.path.dirname(args.snapshot) or '.'
+
+    start = time.perf_counter()
+    results = render_all(briefing, output_dir, args.formats)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    for fmt, path in results.items():
+        print(f"  {fmt:<13} {path or 'failed'}")
+    print(f"✓ {len(briefing.tasks)} tasks rendered into {len(results)} formats in {elapsed:.0f} ms")
+    return 0 if all(results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Briefing Pipeline Engine
+Runs the morning briefing as declared stages: independent stages run concurrently,
+pure stages can be cached, and every stage is timed. Cached results are keyed on
+the code that produced them too, so editing an extractor, matcher or dedup rule
+invalidates them.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+from briefing_history import record_briefing
+from briefing_model import build_briefing, output_path, render_all
+from image_variants import process_image
+from precompress import precompress_outputs
+from task_dedup import dedupe_tasks
+from trace_spans import profiled, span
+
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+
+class PipelineAbort(Exception):
+    """Raised by a stage to stop the pipeline with a user-facing message."""
+
+
+class Stage:
+    """A single pipeline step mapping named inputs to named outputs."""
+
+    def __init__(self, name, func, inputs=(), outputs=(), cacheable=False, version=None):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.cacheable = cacheable
+        self.version = version
+
+    def code_version(self):
+        """The explicit version, else a hash of the scripts' sources."""
+        return self.version or source_version()
+
+    def call(self, args):
+        """Call the stage function and map its return value onto output names."""
+        result = self.func(*args)
+        if not self.outputs:
+            return {}
+        if len(self.outputs) == 1:
+            return {self.outputs[0]: result}
+        return dict(zip(self.outputs, result))
+
+
+@lru_cache(maxsize=None)
+def source_version():
+    """Hash of every script in this directory, read once per process.
+
+    Stage functions call into helpers in other modules (matchers, dedup rules),
+    so the scripts are hashed as a whole rather than the stage's own module.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(SCRIPTS_DIR.glob('*.py')):
+        digest.update(path.name.encode('utf-8'))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class StageCache:
+    """Stage result cache kept in memory and optionally persisted as JSON files."""
+
+    def __init__(self, cache_dir=None):
+        self.memory = {}
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def key(self, stage, args):
+        """Build a cache key from the stage name, its code version and its input values."""
+        payload = json.dumps([stage.name, stage.code_version(), args], sort_keys=True, default=str,
+                             ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return (hit, outputs) for a cache key."""
+        if key in self.memory:
+            return True, self.memory[key]
+        if self.cache_dir:
+            path = self.cache_dir / f"{key}.json"
+            if path.exists():
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        outputs = json.load(f)
+                    self.memory[key] = outputs
+                    return True, outputs
+                except (OSError, ValueError):
+                    pass
+        return False, None
+
+    def put(self, key, outputs):
+        """Store stage outputs under a cache key."""
+        self.memory[key] = outputs
+        if self.cache_dir:
+            try:
+                with open(self.cache_dir / f"{key}.json", 'w', encoding='utf-8') as f:
+                    json.dump(outputs, f, ensure_ascii=False)
+            except (OSError, TypeError):
+                pass
+
+
+class Pipeline:
+    """A set of stages wired together by their declared inputs and outputs."""
+
+    def __init__(self, name, stages, artifacts=(), max_workers=4, cache=None):
+        self.name = name
+        self.stages = list(stages)
+        self.artifacts = tuple(artifacts)
+        self.max_workers = max_workers
+        self.cache = cache
+        self.timings = []
+
+    def without(self, *stage_names):
+        """Drop stages by name (e.g. optional renderers) from this pipeline."""
+        self.stages = [s for s in self.stages if s.name not in stage_names]
+        return self
+
+    def validate(self, initial=()):
+        """Check that every stage input is produced exactly once."""
+        produced = set(initial)
+        for stage in self.stages:
+            for output in stage.outputs:
+                if output in produced:
+                    raise ValueError(f"Output '{output}' is produced more than once")
+                produced.add(output)
+
+        for stage in self.stages:
+            missing = [name for name in stage.inputs if name not in produced]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' needs unknown inputs: {', '.join(missing)}")
+
+    def _run_stage(self, stage, context):
+        """Run one stage, consulting the cache when the stage allows it."""
+        args = [context[name] for name in stage.inputs]
+        start = time.perf_counter()
+
+        key = None
+        if self.cache and stage.cacheable:
+            key = self.cache.key(stage, args)
+            hit, outputs = self.cache.get(key)
+            if hit:
+                return outputs, time.perf_counter() - start, True
+
+        with span(f"stage:{stage.name}", 'stage'):
+            outputs = stage.call(args)
+        if key is not None:
+            self.cache.put(key, outputs)
+        return outputs, time.perf_counter() - start, False
+
+    def run(self, **initial):
+        """Run all stages, starting each one as soon as its inputs are ready."""
+        self.validate(initial)
+        timings = []
+        context = dict(initial)
+        pending = list(self.stages)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                ready = [s for s in pending if all(name in context for name in s.inputs)]
+                for stage in ready:
+                    pending.remove(stage)
+                    running[executor.submit(self._run_stage, stage, context)] = stage
+
+                if not running:
+                    names = ', '.join(s.name for s in pending)
+                    raise ValueError(f"Stages can never run (dependency cycle): {names}")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    outputs, seconds, cached = future.result()
+                    context.update(outputs)
+                    timings.append({
+                        'stage': stage.name,
+                        'seconds': seconds,
+                        'cached': cached
+                    })
+
+        self.timings = timings
+        return context
+
+    def print_timings(self):
+        """Print a per-stage timing table."""
+        print(f"\n⏱️  Stage timings ({self.name}):")
+        for timing in self.timings:
+            note = ' (cached)' if timing['cached'] else ''
+            print(f"  {timing['stage']:<16} {timing['seconds'] * 1000:>9.1f} ms{note}")
+
+
+def _output_paths(output_dir, prefix):
+    """Return the dated image, html and markdown paths under the output directory."""
+    os.makedirs(output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d")
+    return (
+        f"{output_dir}/{prefix}-{timestamp}.png",
+        f"{output_dir}/{prefix}-{timestamp}.html",
+        f"{output_dir}/morning-routine-{timestamp}.md"
+    )
+
+
+def _require_email_data(email_data):
+    """Abort the pipeline when no email data could be loaded."""
+    if not email_data:
+        raise PipelineAbort("No email data provided. Create 'morning_email_input.json' "
+                            "or set MORNING_EMAIL_DATA")
+    return email_data
+
+
+def _summary_of(email_data):
+    """Return the email summary line of briefing-format email data."""
+    return email_data.get('email_summary', 'Email data provided')
+
+
+def _combine(extracted_tasks, ai_suggestions):
+    """Combine extracted tasks and AI suggestions into one list."""
+    return list(extracted_tasks) + list(ai_suggestions)
+
+
+def _briefing_model(email_summary, tasks, output_dir):
+    """Build the briefing that every output format renders from."""
+    briefing = build_briefing(email_summary, tasks)
+    return briefing._replace(image_path=output_path(briefing, output_dir, 'image'))
+
+
+def _fetch_or_manual(fetch, convert, manual):
+    """Build a fetch stage function that falls back to manual input."""
+    def fetch_email_data():
+        data = fetch()
+        if data:
+            return convert(data)
+        return _require_email_data(manual())
+    return fetch_email_data
+
+
+def _task_stages(extract, suggest):
+    """Stages shared by every variant that works on briefing-format email data."""
+    return [
+        Stage('summary', _summary_of, ['email_data'], ['email_summary'], cacheable=True),
+        Stage('extract', extract, ['email_data'], ['extracted_tasks'], cacheable=True),
+        Stage('suggest', suggest, ['email_summary', 'extracted_tasks'], ['ai_suggestions'], cacheable=True),
+        Stage('combine', _combine, ['extracted_tasks', 'ai_suggestions'], ['combined_tasks']),
+        Stage('dedupe', dedupe_tasks, ['combined_tasks'], ['tasks'], cacheable=True),
+        Stage('paths', lambda output_dir: _output_paths(output_dir, 'morning-briefing'),
+              ['output_dir'], ['image_path', 'html_path', 'report_path'])
+    ]
+
+
+def final_pipeline(fetch=None, formats=None):
+    """JSON input, static image and dynamic webpage rendered concurrently.
+
+    fetch: optional callable returning email data, replacing the default
+    morning_email_input.json / MORNING_EMAIL_DATA lookup.
+    formats: output formats to render instead of MORNING_ROUTINE_FORMATS.
+    """
+    import generate_morning_briefing_final as final
+
+    fetch = fetch or final.get_email_data
+    stages = [Stage('fetch', lambda: _require_email_data(fetch()), [], ['email_data'])]
+    stages += _task_stages(final.extract_tasks_from_data, final.generate_ai_suggestions)
+    stages += [
+        Stage('model', _briefing_model, ['email_summary', 'tasks', 'output_dir'], ['briefing']),
+        # Every format in MORNING_ROUTINE_FORMATS (image, webpage and snapshot by default), in parallel
+        Stage('render', lambda briefing, output_dir: render_all(briefing, output_dir, formats),
+              ['briefing', 'output_dir'], ['outputs']),
+        Stage('results', lambda outputs: (outputs.get('image'), outputs.get('html'), outputs.get('json')),
+              ['outputs'], ['image_result', 'webpage_result', 'snapshot_result']),
+        Stage('image_variants', process_image, ['image_result'], ['image_variants']),
+        Stage('history', record_briefing, ['output_dir', 'briefing', 'outputs'], ['history_result']),
+        Stage('precompress', lambda output_dir, history_result: precompress_outputs(output_dir),
+              ['output_dir', 'history_result'], ['precompressed'])
+    ]
+    return Pipeline('final', stages, artifacts=['image_result', 'webpage_result', 'snapshot_result',
+                                                'image_variants', 'history_result'])
+
+
+def original_pipeline():
+    """JSON input, visual dashboard only."""
+    import generate_morning_briefing as original
+
+    stages = [Stage('fetch', lambda: _require_email_data(original.get_user_input_mode()), [], ['email_data'])]
+    stages += _task_stages(original.extract_tasks_from_data, original.generate_ai_suggestions)
+    stages.append(Stage('render_image', original.generate_visual_dashboard,
+                        ['email_summary', 'tasks', 'image_path'], ['image_result']))
+    return Pipeline('original', stages, artifacts=['image_result'])
+
+
+def v2_pipeline():
+    """System OAuth tokens first, manual input fallback, visual dashboard."""
+    import generate_morning_briefing_v2 as v2
+
+    fetch = _fetch_or_manual(v2.try_automatic_email_fetch,
+                             v2.convert_api_data_to_briefing_format,
+                             v2.get_manual_input)
+    stages = [Stage('fetch', fetch, [], ['email_data'])]
+    stages += _task_stages(v2.extract_tasks_from_data, v2.generate_ai_suggestions)
+    stages.append(Stage('render_image', v2.generate_visual_dashboard,
+                        ['email_summary', 'tasks', 'image_path'], ['image_result']))
+    return Pipeline('v2', stages, artifacts=['image_result'])
+
+
+def complete_pipeline():
+    """Gmail API with stored credentials, manual input fallback, visual dashboard."""
+    import generate_morning_briefing_complete as complete
+
+    fetch = _fetch_or_manual(complete.try_fetch_gmail,
+                             complete.convert_gmail_data_to_briefing_format,
+                             complete.get_manual_input)
+    stages = [Stage('fetch', fetch, [], ['email_data'])]
+    stages += _task_stages(complete.extract_tasks_from_data, complete.generate_ai_suggestions)
+    stages.append(Stage('render_image', complete.generate_visual_dashboard,
+                        ['email_summary', 'tasks', 'image_path'], ['image_result']))
+    return Pipeline('complete', stages, artifacts=['image_result'])
+
+
+def routine_pipeline():
+    """Classic markdown report with motivational image placeholder."""
+    import generate_routine as routine
+
+    stages = [
+        Stage('fetch', routine.get_email_summary, [], ['email_data']),
+        Stage('extract', routine.extract_tasks_from_emails, ['email_data'], ['extracted_tasks'], cacheable=True),
+        Stage('suggest', routine.generate_ai_suggestions,
+              ['email_data', 'extracted_tasks'], ['ai_suggestions'], cacheable=True),
+        Stage('combine', _combine, ['extracted_tasks', 'ai_suggestions'], ['combined_tasks']),
+        Stage('dedupe', dedupe_tasks, ['combined_tasks'], ['tasks'], cacheable=True),
+        Stage('render_image', lambda email_data, tasks: routine.generate_motivational_image({
+            'task_count': len(tasks),
+            'email_count': email_data.get('unread_count', 0),
+            'tasks': tasks
+        }), ['email_data', 'tasks'], ['image_result']),
+        Stage('render_report', routine.create_markdown_report,
+              ['email_data', 'tasks', 'image_result', 'output_dir'], ['report_result'])
+    ]
+    return Pipeline('routine', stages, artifacts=['report_result'])
+
+
+def visual_pipeline():
+    """IMAP fetch with a single visual todo image."""
+    import generate_visual_routine as visual
+
+    stages = [
+        Stage('fetch', visual.fetch_emails, [], ['emails']),
+        Stage('summary', visual.summarize_emails_with_llm, ['emails'], ['email_data'], cacheable=True),
+        Stage('extract', visual.extract_tasks_with_llm, ['email_data'], ['task_groups'], cacheable=True),
+        Stage('paths', lambda output_dir: _output_paths(output_dir, 'morning-routine'),
+              ['output_dir'], ['image_path', 'html_path', 'report_path']),
+        Stage('render_image', visual.generate_visual_todo_image,
+              ['email_data', 'task_groups', 'image_path'], ['image_result'])
+    ]
+    return Pipeline('visual', stages, artifacts=['image_result'])
+
+
+VARIANTS = {
+    'final': final_pipeline,
+    'original': original_pipeline,
+    'v2': v2_pipeline,
+    'complete': complete_pipeline,
+    'routine': routine_pipeline,
+    'visual': visual_pipeline
+}
+
+
+def build_pipeline(variant, cache_dir=None, max_workers=4):
+    """Build the pipeline configuration for a briefing variant."""
+    if variant not in VARIANTS:
+        raise ValueError(f"Unknown variant '{variant}' (choose from: {', '.join(VARIANTS)})")
+    pipeline = VARIANTS[variant]()
+    pipeline.max_workers = max_workers
+    pipeline.cache = StageCache(cache_dir)
+    return pipeline
+
+
+@profiled
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description='Run a morning briefing variant as a stage pipeline')
+    parser.add_argument('--variant', default='final', choices=sorted(VARIANTS),
+                        help='Briefing variant to run (default: final)')
+    parser.add_argument('--cache-dir', default=os.getenv('MORNING_ROUTINE_CACHE_DIR'),
+                        help='Persist cacheable stage results in this directory')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Maximum number of stages running at once (default: 4)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"☀️  MORNING BRIEFING PIPELINE - {args.variant.upper()}")
+    print("=" * 60)
+
+    pipeline = build_pipeline(args.variant, cache_dir=args.cache_dir, max_workers=args.workers)
+    output_dir = os.getenv('MORNING_ROUTINE_OUTPUT_DIR', './outputs')
+
+    try:
+        context = pipeline.run(output_dir=output_dir)
+    except PipelineAbort as e:
+        print(f"\n⚠️  {e}")
+        return 1
+
+    pipeline.print_timings()
+
+    results = [context.get(name) for name in pipeline.artifacts]
+    print("\n" + "=" * 60)
+    print("✓ MORNING BRIEFING COMPLETE!" if any(results) else "✗ No outputs generated")
+    print("=" * 60)
+    for name, result in zip(pipeline.artifacts, results):
+        if result:
+            print(f"  {name}: {result}")
+    if 'tasks' in context:
+        print(f"📝 Total tasks: {len(context['tasks'])}")
+    print("=" * 60)
+
+    return 0 if any(results) else 1
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\nInterrupted")
+        sys.exit(1)
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Morning Briefing Scheduler
+Precomputes each configured user's briefing before wake-up time and refreshes
+only the email delta when the user opens it.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import generate_morning_briefing_final as final
+from briefing_history import record_briefing
+from briefing_model import build_briefing, output_formats, render_all
+from briefing_pipeline import final_pipeline, PipelineAbort
+from trace_spans import profiled
+
+DEFAULT_LEAD_MINUTES = 30
+
+# Leading count of summaries like "15 unread emails: ..."
+UNREAD_COUNT = re.compile(r'^(\d+)(?= unread\b)')
+
+SAMPLE_CONFIG = {
+    "output_dir": "./outputs",
+    "users": [
+        {
+            "name": "me",
+            "wake_up": "07:00",
+            "lead_minutes": DEFAULT_LEAD_MINUTES,
+            "source": "file",
+            "input": "./morning_email_input.json"
+        }
+    ]
+}
+
+
+def load_config(config_path):
+    """Load the scheduler config (users, wake-up times, inputs)."""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    base_dir = Path(config_path).resolve().parent
+    for user in config.get('users', []):
+        if 'name' not in user or 'wake_up' not in user:
+            raise ValueError("Each user needs at least 'name' and 'wake_up'")
+        if user.get('input'):
+            user['input'] = str((base_dir / user['input']).resolve())
+    return config
+
+
+def email_key(email):
+    """Stable identity for a key email, used to find the delta on open."""
+    raw = '\x1f'.join([email.get('from', ''), email.get('subject', ''), email.get('snippet', '')])
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def merged_summary(snapshot):
+    """The precomputed full-day summary with the latest unread count and the emails new since then."""
+    summary = snapshot.get('precomputed_summary', snapshot['email_summary'])
+    if snapshot.get('unread_count') is not None:
+        summary = UNREAD_COUNT.sub(str(snapshot['unread_count']), summary, count=1)
+    new_subjects = snapshot.get('new_subjects', [])
+    if new_subjects:
+        summary += f" · {len(new_subjects)} new: " + ", ".join(subject[:30] for subject in new_subjects[:3])
+    return summary
+
+
+def user_dir(config, user):
+    """Per-user artifact directory inside the outputs directory."""
+    output_dir = config.get('output_dir') or os.getenv('MORNING_ROUTINE_OUTPUT_DIR', './outputs')
+    path = Path(output_dir) / user['name']
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def snapshot_path(config, user, day=None):
+    """Path of the precomputed briefing snapshot for a day."""
+    day = day or datetime.now()
+    return user_dir(config, user) / f"briefing-snapshot-{day.strftime('%Y%m%d')}.json"
+
+
+def run_time(user, day):
+    """Precompute time on a given day: wake-up minus the lead time."""
+    hour, minute = (int(part) for part in user['wake_up'].split(':'))
+    lead = timedelta(minutes=user.get('lead_minutes', DEFAULT_LEAD_MINUTES))
+    return day.replace(hour=hour, minute=minute, second=0, microsecond=0) - lead
+
+
+class EmailSource:
+    """Fetches a user's email data in briefing format, optionally only since a time."""
+
+    def __init__(self, user):
+        self.user = user
+        self.gmail_service = None
+
+    def fetch(self, since=None):
+        """Return briefing-format email data (key_emails newer than `since` for Gmail)."""
+        if self.user.get('source') == 'gmail':
+            import fetch_emails_auto
+            from generate_morning_briefing_complete import convert_gmail_data_to_briefing_format
+
+            if self.gmail_service is None:
+                self.gmail_service = fetch_emails_auto.build_gmail_service()
+                if self.gmail_service is None:
+                    return None
+            data = fetch_emails_auto.fetch_with_service(self.gmail_service, since=since)
+            return convert_gmail_data_to_briefing_format(data)
+
+        input_path = self.user.get('input')
+        if input_path and os.path.exists(input_path):
+            with open(input_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return final.get_email_data()
+
+
+def precompute(config, user, source=None):
+    """Build the full briefing (image + webpage) and store a snapshot."""
+    source = source or EmailSource(user)
+    out_dir = user_dir(config, user)
+    started = time.time()
+    print(f"🌅 Precomputing briefing for {user['name']}...", flush=True)
+
+    pipeline = final_pipeline(fetch=source.fetch)
+    try:
+        context = pipeline.run(output_dir=str(out_dir))
+    except PipelineAbort as e:
+        print(f"⚠️  {user['name']}: {e}")
+        return None
+
+    snapshot = {
+        'user': user['name'],
+        'built_at': datetime.fromtimestamp(started).isoformat(timespec='seconds'),
+        'since': started,
+        'email_summary': context['email_summary'],
+        'precomputed_summary': context['email_summary'],
+        'new_subjects': [],
+        'tasks': context['tasks'],
+        'seen_emails': [email_key(e) for e in context['email_data'].get('key_emails', [])],
+        'custom_tasks': list(context['email_data'].get('custom_tasks', [])),
+        'image': context.get('image_result'),
+        'html': context.get('webpage_result') or context['html_path']
+    }
+    with open(snapshot_path(config, user), 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, indent=2, ensure_ascii=False)
+
+    print(f"✓ {user['name']}: {len(context['tasks'])} tasks ready "
+          f"({time.time() - started:.1f}s)", flush=True)
+    return snapshot
+
+
+def open_briefing(config, user, source=None):
+    """Refresh the precomputed briefing with new emails only and return its webpage path.
+
+    Every output except the static image is re-rendered with the merged tasks
+    and the history entry is updated; the image keeps the precomputed tasks.
+    """
+    start = time.perf_counter()
+    path = snapshot_path(config, user)
+
+    if not path.exists():
+        print(f"⚠️  No precomputed briefing for {user['name']} today, building it now...")
+        snapshot = precompute(config, user, source)
+        return snapshot['html'] if snapshot else None
+
+    with open(path, 'r', encoding='utf-8') as f:
+        snapshot = json.load(f)
+
+    source = source or EmailSource(user)
+    email_data = source.fetch(since=snapshot['since'])
+    refreshed_at = time.time()
+
+    new_emails, new_custom = [], []
+    if email_data:
+        seen = set(snapshot['seen_emails'])
+        new_emails = [e for e in email_data.get('key_emails', []) if email_key(e) not in seen]
+        known_custom = set(snapshot['custom_tasks'])
+        new_custom = [t for t in email_data.get('custom_tasks', []) if t not in known_custom]
+
+    if new_emails or new_custom:
+        # Appending keeps task indexes stable, so saved completion state still lines up
+        snapshot['tasks'] += final.extract_tasks_from_data({
+            'custom_tasks': new_custom,
+            'key_emails': new_emails
+        })
+        snapshot['seen_emails'] += [email_key(e) for e in new_emails]
+        snapshot['custom_tasks'] += new_custom
+
+    if email_data:
+        # The delta fetch only describes what arrived since precompute: keep the
+        # full-day summary, take its current unread count and list the new emails
+        snapshot.setdefault('precomputed_summary', snapshot['email_summary'])
+        snapshot['new_subjects'] = snapshot.get('new_subjects', []) + [
+            e.get('subject') or '(No Subject)' for e in new_emails]
+        latest = UNREAD_COUNT.match(email_data.get('email_summary', ''))
+        if latest:
+            snapshot['unread_count'] = int(latest.group(1))
+        snapshot['email_summary'] = merged_summary(snapshot)
+
+    snapshot['since'] = refreshed_at
+    # The cheap formats (webpage, JSON snapshot, markdown, ...) take a few ms; the image is left alone
+    out_dir = str(user_dir(config, user))
+    briefing = build_briefing(snapshot['email_summary'], snapshot['tasks'], image_path=snapshot.get('image'))
+    formats = ('html',) + tuple(f for f in output_formats() if f not in ('html', 'image'))
+    outputs = render_all(briefing, out_dir, formats)
+    html = snapshot['html'] = outputs['html']
+    record_briefing(out_dir, briefing, {**outputs, 'image': snapshot.get('image')})
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, indent=2, ensure_ascii=False)
+
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"✓ {user['name']}: {len(new_emails)} new emails, {len(new_custom)} new tasks "
+          f"merged in {elapsed:.0f} ms")
+    if snapshot.get('image'):
+        print(f"📊 Static Image: {snapshot['image']}")
+    return html
+
+
+def run_scheduler(config, poll_seconds=60):
+    """Run forever, precomputing each user's briefing ahead of wake-up."""
+    users = config.get('users', [])
+    sources = {user['name']: EmailSource(user) for user in users}
+    print(f"⏰ Scheduling {len(users)} user(s)")
+
+    while True:
+        now = datetime.now()
+        upcoming = []
+        for user in users:
+            today_run = run_time(user, now)
+            if now < today_run:
+                upcoming.append(today_run)
+                continue
+            # Catch up when started after today's precompute time
+            if not snapshot_path(config, user).exists():
+                try:
+                    snapshot = precompute(config, user, sources[user['name']])
+                except Exception as e:
+                    # One user's Gmail or input failure must not stop everyone else's briefing
+                    print(f"✗ {user['name']}: precompute failed: {type(e).__name__}: {e}", flush=True)
+                    snapshot = None
+                if snapshot is None:
+                    # No snapshot yet: try again at the next poll rather than tomorrow
+                    upcoming.append(now + timedelta(seconds=poll_seconds))
+                    continue
+            upcoming.append(run_time(user, now + timedelta(days=1)))
+
+        if upcoming:
+            wait_until = min(upcoming)
+            print(f"  next precompute at {wait_until.strftime('%Y-%m-%d %H:%M')}", flush=True)
+            time.sleep(max(1, min(poll_seconds, (wait_until - datetime.now()).total_seconds())))
+        else:
+            time.sleep(poll_seconds)
+
+
+def find_user(config, name):
+    """Look up a configured user by name."""
+    for user in config.get('users', []):
+        if user['name'] == name:
+            return user
+    raise ValueError(f"Unknown user '{name}'")
+
+
+@profiled
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description='Precompute morning briefings before wake-up time')
+    parser.add_argument('command', choices=['run', 'precompute', 'open', 'init'],
+                        help='run: schedule forever; precompute/open: one user now; init: write a sample config')
+    parser.add_argument('--config', default='./briefing_schedule.json', help='Scheduler config file')
+    parser.add_argument('--user', help='User name for precompute/open (default: all / first)')
+    args = parser.parse_args()
+
+    if args.command == 'init':
+        if os.path.exists(args.config):
+            print(f"⚠️  {args.config} already exists")
+            return 1
+        with open(args.config, 'w', encoding='utf-8') as f:
+            json.dump(SAMPLE_CONFIG, f, indent=2)
+        print(f"✓ Sample scheduler config created: {args.config}")
+        return 0
+
+    if not os.path.exists(args.config):
+        print(f"✗ Config not found: {args.config}")
+        print("  Create one with: python scripts/briefing_scheduler.py init")
+        return 1
+
+    config = load_config(args.config)
+
+    if args.command == 'run':
+        run_scheduler(config)
+        return 0
+
+    if args.command == 'precompute':
+        users = [find_user(config, args.user)] if args.user else config.get('users', [])
+        results = [precompute(config, user) for user in users]
+        return 0 if all(results) else 1
+
+    user = find_user(config, args.user) if args.user else config['users'][0]
+    html = open_briefing(config, user)
+    if html:
+        print(f"🌐 Dynamic Webpage: {html}")
+        return 0
+    return 1
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\nScheduler stopped")
+        sys.exit(0)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Morning Briefing Server
+Keeps imports, credentials, the Gmail service and the pipeline warm in memory
+and serves briefings on demand over local HTTP or a Unix socket.
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import socketserver
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import generate_morning_briefing_final as final
+from briefing_pipeline import Pipeline, Stage, PipelineAbort
+from task_dedup import dedupe_tasks
+from trace_spans import profiled, span
+
+
+class BriefingService:
+    """Warm briefing state shared by every request."""
+
+    def __init__(self, source='file'):
+        self.source = source
+        self.gmail_services = None
+        self.started_at = datetime.now()
+
+        if source == 'gmail':
+            import fetch_emails_auto
+            from generate_morning_briefing_complete import convert_gmail_data_to_briefing_format
+
+            if not fetch_emails_auto.check_environment():
+                raise RuntimeError("Gmail OAuth tokens not found in environment "
+                                   "(CAPY_GMAIL_ACCESS_TOKEN, CAPY_GMAIL_REFRESH_TOKEN, ...)")
+            # googleapiclient services sit on one httplib2 connection, which is not
+            # thread-safe: each fetch checks a service out of this pool, building
+            # another only when every warm one is in use by a concurrent request
+            self._build_service = fetch_emails_auto.build_gmail_service
+            self.gmail_services = queue.SimpleQueue()
+            self.gmail_services.put(self._new_gmail_service())
+            self._fetch_with_service = fetch_emails_auto.fetch_with_service
+            self._convert = convert_gmail_data_to_briefing_format
+
+        self.pipeline = Pipeline('server', [
+            Stage('fetch', self.fetch_email_data, [], ['email_data']),
+            Stage('summary', lambda data: data.get('email_summary', 'Email data provided'),
+                  ['email_data'], ['email_summary']),
+            Stage('extract', final.extract_tasks_from_data, ['email_data'], ['extracted_tasks']),
+            Stage('suggest', final.generate_ai_suggestions,
+                  ['email_summary', 'extracted_tasks'], ['ai_suggestions']),
+            Stage('combine', lambda extracted, suggested: list(extracted) + list(suggested),
+                  ['extracted_tasks', 'ai_suggestions'], ['combined_tasks']),
+            Stage('dedupe', dedupe_tasks, ['combined_tasks'], ['tasks'])
+        ])
+
+    def _new_gmail_service(self):
+        service = self._build_service()
+        if service is None:
+            raise RuntimeError("Could not build Gmail service")
+        return service
+
+    def fetch_email_data(self):
+        """Fetch email data from the configured source."""
+        if self.gmail_services is not None:
+            try:
+                service = self.gmail_services.get_nowait()
+            except queue.Empty:
+                service = self._new_gmail_service()
+            try:
+                return self._convert(self._fetch_with_service(service))
+            finally:
+                self.gmail_services.put(service)
+        email_data = final.get_email_data()
+        if not email_data:
+            raise PipelineAbort("No email data provided. Create 'morning_email_input.json' "
+                                "or set MORNING_EMAIL_DATA")
+        return email_data
+
+    def briefing(self):
+        """Build a briefing dict for the current email data."""
+        start = time.perf_counter()
+        context = self.pipeline.run()
+        return {
+            'date': datetime.now().strftime("%A, %B %d, %Y"),
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'source': context['email_data'].get('source', self.source),
+            'email_summary': context['email_summary'],
+            'tasks': context['tasks'],
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 2)
+        }
+
+    def render_html(self, briefing):
+        """Render a briefing as the interactive webpage."""
+        return final.render_dynamic_webpage(briefing['email_summary'], briefing['tasks'])
+
+
+class BriefingRequestHandler(BaseHTTPRequestHandler):
+    """Serves /briefing.json, /briefing.html and /health from the warm service."""
+
+    service = None
+
+    def do_GET(self):
+        """Handle GET requests."""
+        url = urlparse(self.path)
+        fmt = parse_qs(url.query).get('format', [''])[0]
+
+        if url.path == '/health':
+            uptime = (datetime.now() - self.service.started_at).total_seconds()
+            return self._send(200, 'application/json',
+                              json.dumps({'status': 'ok', 'source': self.service.source, 'uptime': uptime}))
+
+        if url.path in ('/', '/briefing', '/briefing.html', '/briefing.json'):
+            as_json = url.path == '/briefing.json' or fmt == 'json' or (
+                url.path == '/briefing' and 'application/json' in self.headers.get('Accept', ''))
+            try:
+                with span('request', 'server', path=url.path):
+                    briefing = self.service.briefing()
+            except PipelineAbort as e:
+                return self._send(503, 'application/json', json.dumps({'error': str(e)}))
+            except Exception as e:
+                return self._send(500, 'application/json', json.dumps({'error': str(e)}))
+
+            if as_json:
+                return self._send(200, 'application/json', json.dumps(briefing, ensure_ascii=False))
+            return self._send(200, 'text/html; charset=utf-8', self.service.render_html(briefing))
+
+        self._send(404, 'application/json', json.dumps({'error': f"Not found: {url.path}"}))
+
+    def _send(self, status, content_type, body):
+        """Write a complete response."""
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        """Log requests without relying on a TCP client address."""
+        print(f"  {self.command} {self.path} - {format % args}", flush=True)
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP server bound to a Unix domain socket."""
+
+    daemon_threads = True
+
+    def get_request(self):
+        """Accept a connection and give it a tuple client address for the handler."""
+        request, _ = super().get_request()
+        return request, ('unix', 0)
+
+
+def make_server(service, host='127.0.0.1', port=8765, socket_path=None):
+    """Create an HTTP server (TCP or Unix socket) bound to a warm service."""
+    handler = type('Handler', (BriefingRequestHandler,), {'service': service})
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        return ThreadingUnixHTTPServer(socket_path, handler)
+
+    return ThreadingHTTPServer((host, port), handler)
+
+
+@profiled
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description='Serve morning briefings from a warm process')
+    parser.add_argument('--source', choices=['file', 'gmail'], default='file',
+                        help='Email source: morning_email_input.json/MORNING_EMAIL_DATA or Gmail API tokens')
+    parser.add_argument('--host', default='127.0.0.1', help='Host to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port to bind (default: 8765)')
+    parser.add_argument('--socket', help='Serve on this Unix socket path instead of TCP')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("☀️  MORNING BRIEFING SERVER")
+    print("=" * 60)
+
+    try:
+        service = BriefingService(source=args.source)
+    except RuntimeError as e:
+        print(f"✗ {e}")
+        return 1
+
+    server = make_server(service, args.host, args.port, args.socket)
+    where = f"unix:{args.socket}" if args.socket else f"http://{args.host}:{args.port}"
+    print(f"✓ Serving {args.source} briefings at {where}")
+    print("  /briefing.html  interactive webpage")
+    print("  /briefing.json  briefing data")
+    print("  /health         server status")
+
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\nServer stopped")
+        sys.exit(0)
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Dashboard Renderer
+Draws the static briefing dashboard (date, email summary, top tasks) locally
+with Pillow in a fixed 16:9 layout. The same input always produces the same
+image in milliseconds and without an image-model call. Chinese text needs a
+CJK font (none is bundled); missing glyphs are reported when they occur.
+"""
+
+import os
+import sys
+import time
+import argparse
+from functools import lru_cache
+from pathlib import Path
+
+from briefing_model import PRIORITY_LABELS, BriefingTask
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:
+    Image = ImageDraw = ImageFont = None
+
+FONTS_DIR = Path(__file__).parent.parent / "assets" / "fonts"
+
+# Checked in order after MORNING_ROUTINE_FONT and assets/fonts/; CJK-capable fonts
+# come first since they also cover Latin text
+SYSTEM_FONTS = (
+    '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',
+    '/System/Library/Fonts/PingFang.ttc',
+    '/System/Library/Fonts/STHeiti Medium.ttc',
+    'C:/Windows/Fonts/msyh.ttc',
+    'C:/Windows/Fonts/simhei.ttf',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+    '/Library/Fonts/Arial Unicode.ttf',
+    'C:/Windows/Fonts/arial.ttf',
+)
+FONT_SUFFIXES = ('.ttf', '.otf', '.ttc')
+
+IMAGE_RENDERERS = ('local', 'model')
+DEFAULT_IMAGE_RENDERER = 'local'
+
+SIZE = (1920, 1080)
+MARGIN = 96
+MAX_TASKS = 8
+
+# Warm sunrise gradient, top to bottom
+GRADIENT = ((255, 204, 170), (255, 226, 196), (198, 224, 245))
+TEXT_COLOR = (45, 42, 50)
+MUTED_COLOR = (95, 90, 105)
+PANEL_COLOR = (255, 255, 255, 200)
+PRIORITY_COLORS = {'high': (220, 53, 69), 'medium': (240, 150, 20), 'low': (40, 160, 90)}
+
+
+def pillow_available():
+    """True when Pillow is installed."""
+    return Image is not None
+
+
+def image_renderer(renderer=None):
+    """Resolve the image renderer (argument, then MORNING_ROUTINE_IMAGE_RENDERER, then the default)."""
+    renderer = renderer or os.getenv('MORNING_ROUTINE_IMAGE_RENDERER') or DEFAULT_IMAGE_RENDERER
+    if renderer not in IMAGE_RENDERERS:
+        raise ValueError(f"Unknown image renderer '{renderer}' "
+                         f"(expected one of: {', '.join(IMAGE_RENDERERS)})")
+    return renderer
+
+
+# Private-use code point no font maps; its glyph is the font's "missing glyph" box
+_UNMAPPED = '\U0010fffd'
+
+
+@lru_cache(maxsize=None)
+def font_path():
+    """First usable font file: MORNING_ROUTINE_FONT, assets/fonts/, then common system fonts."""
+    candidates = [os.getenv('MORNING_ROUTINE_FONT')]
+    if FONTS_DIR.is_dir():
+        candidates += sorted(str(p) for p in FONTS_DIR.iterdir() if p.suffix.lower() in FONT_SUFFIXES)
+    candidates += SYSTEM_FONTS
+    for candidate in candidates:
+        if not candidate or not os.path.isfile(candidate):
+            continue
+        try:
+            ImageFont.truetype(candidate, 12)
+        except OSError as e:
+            print(f"⚠️  Skipping unreadable font {candidate}: {e}")
+            continue
+        return candidate
+    return None
+
+
+@lru_cache(maxsize=None)
+def load_font(size):
+    """Font at a pixel size (Pillow's built-in font when no font file is found)."""
+    path = font_path()
+    if path:
+        return ImageFont.truetype(path, size)
+    return ImageFont.load_default(size)
+
+
+@lru_cache(maxsize=4)
+def _background(size):
+    """Vertical gradient, built as one column and stretched to full width."""
+    width, height = size
+    column = Image.new('RGB', (1, height))
+    stops = len(GRADIENT) - 1
+    pixels = []
+    for y in range(height):
+        position = y / max(height - 1, 1) * stops
+        index = min(int(position), stops - 1)
+        t = position - index
+        start, end = GRADIENT[index], GRADIENT[index + 1]
+        pixels.append(tuple(round(a + (b - a) * t) for a, b in zip(start, end)))
+    column.putdata(pixels)
+    return column.resize(size, Image.NEAREST)
+
+
+def missing_glyphs(text, font=None):
+    """Characters of text the dashboard font cannot draw (they would render as boxes)."""
+    font = font or load_font(32)
+
+    def glyph(char):
+        image = Image.new('L', (64, 64))
+        ImageDraw.Draw(image).text((0, 0), char, font=font, fill=255)
+        return image.tobytes()
+
+    box = glyph(_UNMAPPED)
+    return ''.join(char for char in dict.fromkeys(text)
+                   if ord(char) > 127 and not char.isspace() and glyph(char) == box)
+
+
+def fit_text(text, font, max_width):
+    """Text shortened with an ellipsis so it fits max_width pixels."""
+    text = ' '.join(str(text).split())
+    if font.getlength(text) <= max_width:
+        return text
+    # Binary search on the prefix length (CJK and Latin glyphs differ in width)
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if font.getlength(text[:mid].rstrip() + '…') <= max_width:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low].rstrip() + '…'
+
+
+def render_dashboard(email_summary, tasks, output_path, today, size=SIZE):
+    """Draw the dashboard for the given (already ranked) BriefingTasks and save it as PNG.
+
+    Layout follows the model prompt: header with date and summary (top 15%),
+    task list (center 65%), motivation line (bottom 20%).
+    """
+    if not pillow_available():
+        raise RuntimeError("Pillow is not installed (pip install pillow)")
+
+    missing = missing_glyphs(email_summary + ''.join(task.text for task in tasks[:MAX_TASKS]))
+    if missing:
+        print(f"⚠️  Font {font_path() or 'Pillow default'} has no glyphs for {missing[:10]!r}; "
+              "they render as boxes. Put a CJK font (e.g. Noto Sans CJK) in assets/fonts/ "
+              "or set MORNING_ROUTINE_FONT")
+
+    width, height = size
+    image = _background(size).copy()
+    overlay = Image.new('RGBA', size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(overlay)
+    scale = height / SIZE[1]
+
+    title_font = load_font(round(56 * scale))
+    summary_font = load_font(round(30 * scale))
+    heading_font = load_font(round(38 * scale))
+    task_font = load_font(round(32 * scale))
+    badge_font = load_font(round(22 * scale))
+    footer_font = load_font(round(44 * scale))
+    small_font = load_font(round(26 * scale))
+
+    margin = round(MARGIN * scale)
+    content_width = width - 2 * margin
+
+    # Header
+    header_top = round(height * 0.04)
+    draw.text((margin, header_top), fit_text(f"Morning Briefing · {today}", title_font, content_width),
+              font=title_font, fill=TEXT_COLOR)
+    draw.text((margin, header_top + round(76 * scale)), fit_text(email_summary, summary_font, content_width),
+              font=summary_font, fill=MUTED_COLOR)
+
+    # Task panel
+    panel_top, panel_bottom = round(height * 0.17), round(height * 0.80)
+    draw.rounded_rectangle((margin, panel_top, width - margin, panel_bottom),
+                           radius=round(28 * scale), fill=PANEL_COLOR)
+    inner = margin + round(40 * scale)
+    draw.text((inner, panel_top + round(28 * scale)), "Today's Tasks", font=heading_font, fill=TEXT_COLOR)
+
+    shown = tasks[:MAX_TASKS]
+    rows_top = panel_top + round(100 * scale)
+    row_height = (panel_bottom - rows_top - round(20 * scale)) // MAX_TASKS
+    badge_width = round(90 * scale)
+    text_left = inner + round(56 * scale) + badge_width + round(20 * scale)
+    text_width = width - margin - round(40 * scale) - text_left
+
+    if not shown:
+        draw.text((inner, rows_top), "No tasks for today", font=task_font, fill=MUTED_COLOR)
+    for i, task in enumerate(shown):
+        y = rows_top + i * row_height
+        middle = y + row_height // 2
+        draw.text((inner, middle), f"{i + 1}.", font=task_font, fill=MUTED_COLOR, anchor='lm')
+
+        priority = task.priority
+        badge_left = inner + round(56 * scale)
+        badge_half = round(18 * scale)
+        draw.rounded_rectangle((badge_left, middle - badge_half, badge_left + badge_width, middle + badge_half),
+                               radius=badge_half, fill=PRIORITY_COLORS.get(priority, MUTED_COLOR))
+        draw.text((badge_left + badge_width // 2, middle), PRIORITY_LABELS.get(priority, 'TASK'),
+                  font=badge_font, fill=(255, 255, 255), anchor='mm')
+
+        draw.text((text_left, middle), fit_text(task.text, task_font, text_width),
+                  font=task_font, fill=TEXT_COLOR, anchor='lm')
+
+    # Motivation
+    footer_middle = round(height * 0.90)
+    draw.text((width // 2, footer_middle - round(24 * scale)), "Make Today Count",
+              font=footer_font, fill=TEXT_COLOR, anchor='mm')
+    draw.text((width // 2, footer_middle + round(30 * scale)), "Focus on what matters most",
+              font=small_font, fill=MUTED_COLOR, anchor='mm')
+
+    image.paste(overlay, (0, 0), overlay)
+    image.save(output_path, 'PNG')
+    return output_path
+
+
+def main():
+    """Render a sample dashboard and report the time per render."""
+    parser = argparse.ArgumentParser(description='Render a sample briefing dashboard locally')
+    parser.add_argument('output', nargs='?', default='dashboard-sample.png')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    if not pillow_available():
+        print("✗ Pillow is not installed (pip install pillow)")
+        return 1
+
+    tasks = [
+        BriefingTask('Review Q3 budget proposal before the 2pm meeting', 'high', 'email'),
+        BriefingTask('回复张三关于项目进度的邮件', 'high', 'email'),
+        BriefingTask('Prepare slides for the weekly sync', 'medium', 'user'),
+        BriefingTask('确认下周出差的机票和酒店预订信息，并同步给团队所有成员以便安排工作交接', 'medium', 'user'),
+        BriefingTask('Clear newsletter backlog', 'low', 'ai'),
+    ]
+    timings = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        render_dashboard('12 unread emails, 3 need replies · 12封未读邮件', tasks, args.output,
+                         'Monday, October 19, 2026')
+        timings.append((time.perf_counter() - start) * 1000)
+
+    print(f"✓ {args.output} (font: {font_path() or 'Pillow default'})")
+    print(f"  first render {timings[0]:.1f} ms, warm {min(timings):.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Email Thread Collapsing
+Groups messages into threads (Gmail threadId, or IMAP Message-ID / In-Reply-To /
+References) so only the newest message of each thread is classified and extracted.
+"""
+
+import re
+from email.utils import parseaddr, parsedate_to_datetime
+
+_MESSAGE_ID = re.compile(r'<[^<>\s]+>')
+_REPLY_PREFIX = re.compile(r'^\s*((re|fw|fwd|aw|回复|答复|转发)\s*(\[\d+\])?\s*[:：]\s*)+', re.IGNORECASE)
+
+
+def message_ids(header):
+    """Parse the <message-id> tokens of a Message-ID/In-Reply-To/References header."""
+    return _MESSAGE_ID.findall(header or '')
+
+
+def normalize_subject(subject):
+    """Strip reply/forward prefixes (Re:, Fwd:, 回复:, ...) and collapse whitespace."""
+    return ' '.join(_REPLY_PREFIX.sub('', subject or '').split()).lower()
+
+
+def _timestamp(email):
+    """Message time for ordering within a thread, or None when unknown."""
+    if email.get('internal_date'):
+        return int(email['internal_date']) / 1000
+    try:
+        return parsedate_to_datetime(email.get('date', '')).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class _UnionFind:
+    """Minimal union-find over hashable keys."""
+
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, key):
+        self.parent.setdefault(key, key)
+        root = key
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[key] != root:
+            self.parent[key], key = root, self.parent[key]
+        return root
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+
+def thread_keys(emails):
+    """Return one thread key per email.
+
+    Gmail messages use their threadId. IMAP messages are linked through
+    Message-ID, In-Reply-To and References. Messages with neither (e.g. manual
+    JSON input) fall back to sender plus normalized subject, so two people
+    mailing about "Meeting" stay separate.
+    """
+    links = _UnionFind()
+    keys = []
+    for i, email in enumerate(emails):
+        if email.get('thread_id'):
+            keys.append(f"thread:{email['thread_id']}")
+            continue
+
+        ids = message_ids(email.get('message_id')) + message_ids(email.get('in_reply_to')) \
+            + message_ids(email.get('references'))
+        if ids:
+            for other in ids[1:]:
+                links.union(ids[0], other)
+            keys.append(ids[0])
+        else:
+            subject = normalize_subject(email.get('subject'))
+            sender = parseaddr(email.get('from') or '')[1].lower() or (email.get('from') or '').strip().lower()
+            keys.append(f"subject:{sender}\x1f{subject}" if subject else f"message:{i}")
+
+    return [links.find(key) if key.startswith('<') else key for key in keys]
+
+
+def collapse_threads(emails):
+    """Collapse emails into thread records, keeping only the newest message of each thread.
+
+    Each record is a copy (dict or EmailRecord) of the newest message with
+    'thread_size' added; records keep the order in which their threads first appear.
+    """
+    threads = {}
+    for position, (key, email) in enumerate(zip(thread_keys(emails), emails)):
+        threads.setdefault(key, []).append((position, email))
+
+    records = []
+    for members in threads.values():
+        times = [_timestamp(email) for _, email in members]
+        if all(t is not None for t in times):
+            newest = members[max(range(len(members)), key=times.__getitem__)][1]
+        else:
+            # Fetchers list newest first, so the earliest position is the newest message
+            newest = members[0][1]
+        record = newest.copy()
+        record['thread_size'] = len(members)
+        records.append(record)
+    return records
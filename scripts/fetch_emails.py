@@ -8,10 +8,13 @@ import os
 import sys
 import imaplib
 import email
-from email.header import decode_header
 from datetime import datetime, timedelta
 import json
 
+from email_record import EmailRecord, json_default
+from mail_headers import decode_header_value
+from trace_spans import profiled, span
+
 def get_email_credentials():
     """Get email credentials from environment variables."""
     email_address = os.getenv('CAPY_USER_EMAIL') or os.getenv('USER_EMAIL')
@@ -31,8 +34,8 @@ def get_email_credentials():
     return email_address, email_password
 
 
-def connect_to_imap(email_address, password, imap_server=None):
-    """Connect to IMAP server."""
+def connect_to_imap(email_address, password, imap_server=None, port=None, use_ssl=True):
+    """Connect to IMAP server (use_ssl=False for a local test server)."""
     if not imap_server:
         # Determine IMAP server from email domain
         domain = email_address.split('@')[1]
@@ -46,32 +49,26 @@ def connect_to_imap(email_address, password, imap_server=None):
     print(f"Connecting to {imap_server}...")
 
     try:
-        mail = imaplib.IMAP4_SSL(imap_server)
-        mail.login(email_address, password)
+        with span('connect', 'mail'):
+            if use_ssl:
+                mail = imaplib.IMAP4_SSL(imap_server, port or imaplib.IMAP4_SSL_PORT)
+            else:
+                mail = imaplib.IMAP4(imap_server, port or imaplib.IMAP4_PORT)
+        with span('login', 'mail'):
+            mail.login(email_address, password)
         return mail
     except Exception as e:
         print(f"Failed to connect: {e}")
         return None
 
 
-def decode_mime_words(s):
-    """Decode MIME encoded-words in string."""
-    if not s:
-        return ""
-    decoded_fragments = decode_header(s)
-    return ''.join([
-        fragment.decode(encoding or 'utf-8') if isinstance(fragment, bytes) else fragment
-        for fragment, encoding in decoded_fragments
-    ])
-
-
 def fetch_recent_emails(mail, hours=24, max_emails=20):
     """Fetch recent emails from inbox."""
-    mail.select('INBOX')
-
     # Search for emails from the last N hours
     date_since = (datetime.now() - timedelta(hours=hours)).strftime("%d-%b-%Y")
-    status, messages = mail.search(None, f'(SINCE {date_since})')
+    with span('search', 'mail'):
+        mail.select('INBOX')
+        status, messages = mail.search(None, f'(SINCE {date_since})')
 
     if status != 'OK':
         print("Failed to search emails")
@@ -82,50 +79,44 @@ def fetch_recent_emails(mail, hours=24, max_emails=20):
 
     emails = []
     for email_id in reversed(email_ids):  # Newest first
-        status, msg_data = mail.fetch(email_id, '(RFC822)')
+        with span('fetch', 'mail'):
+            status, msg_data = mail.fetch(email_id, '(RFC822)')
         if status != 'OK':
             continue
 
         for response_part in msg_data:
             if isinstance(response_part, tuple):
-                msg = email.message_from_bytes(response_part[1])
-
-                # Extract email details
-                subject = decode_mime_words(msg['Subject'])
-                from_addr = decode_mime_words(msg['From'])
-                date = msg['Date']
-
-                # Get email body
-                body = ""
-                if msg.is_multipart():
-                    for part in msg.walk():
-                        if part.get_content_type() == "text/plain":
-                            try:
-                                body = part.get_payload(decode=True).decode()
-                                break
-                            except:
-                                pass
-                else:
-                    try:
-                        body = msg.get_payload(decode=True).decode()
-                    except:
-                        body = str(msg.get_payload())
+                with span('parse', 'mail'):
+                    msg = email.message_from_bytes(response_part[1])
+
+                    # Extract email details
+                    subject = decode_header_value(msg['Subject'])
+                    from_addr = decode_header_value(msg['From'])
+                    date = msg['Date']
 
                 # Check if email is unread
-                status, flags = mail.fetch(email_id, '(FLAGS)')
+                with span('fetch', 'mail'):
+                    status, flags = mail.fetch(email_id, '(FLAGS)')
                 is_unread = b'\\Seen' not in flags[0]
 
-                emails.append({
+                record = EmailRecord.from_dict({
                     'subject': subject,
                     'from': from_addr,
                     'date': date,
-                    'body': body[:500],  # First 500 chars
-                    'unread': is_unread
+                    'unread': is_unread,
+                    'message_id': msg['Message-ID'] or '',
+                    'in_reply_to': msg['In-Reply-To'] or '',
+                    'references': msg['References'] or ''
                 })
 
+                # Body is decoded on first read (HTML-only messages are converted to text)
+                record.set_message_body(msg, budget=500, no_text='')  # First 500 chars
+                emails.append(record)
+
     return emails
 
 
+@profiled
 def main():
     """Main function to fetch and display emails."""
     email_address, password = get_email_credentials()
@@ -181,7 +172,7 @@ def main():
     print(f"Unread: {sum(1 for e in emails if e['unread'])}")
 
     # Output as JSON
-    print(json.dumps(emails, indent=2))
+    print(json.dumps(emails, indent=2, default=json_default))
 
     mail.close()
     mail.logout()
@@ -9,6 +9,11 @@ import sys
 import json
 from datetime import datetime, timedelta
 
+from email_record import EmailRecord, json_default
+from gmail_service import NUM_RETRIES, build_service, client_library_available
+from mail_headers import decode_header_value
+from trace_spans import profiled, span
+
 def check_environment():
     """Check if Gmail OAuth tokens are provided via environment."""
     required_vars = [
@@ -21,12 +26,13 @@ def check_environment():
     available = all(os.getenv(var) for var in required_vars)
     return available
 
-def fetch_with_gmail_api():
-    """Fetch emails using Gmail API with system-provided tokens."""
+def build_gmail_service():
+    """Build a Gmail API service from system-provided tokens."""
     try:
         from google.auth.transport.requests import Request
         from google.oauth2.credentials import Credentials
-        from googleapiclient.discovery import build
+        if not client_library_available():
+            raise ImportError('google-api-python-client')
     except ImportError:
         print("✗ Gmail API libraries not installed")
         print("  Install with: pip install --break-system-packages google-auth google-auth-oauthlib google-api-python-client")
@@ -43,53 +49,71 @@ def fetch_with_gmail_api():
 
     # Auto-refresh if needed
     if creds.expired and creds.refresh_token:
-        creds.refresh(Request())
+        with span('login', 'mail'):
+            creds.refresh(Request())
 
     # Build Gmail service
-    service = build('gmail', 'v1', credentials=creds)
+    with span('connect', 'mail'):
+        return build_service(creds)
+
 
-    # Fetch recent emails (last 24 hours)
-    yesterday = datetime.now() - timedelta(days=1)
-    query = f'after:{int(yesterday.timestamp())}'
+def fetch_with_service(service, since=None):
+    """Fetch recent emails with an already-built Gmail API service.
 
-    results = service.users().messages().list(
-        userId='me',
-        maxResults=10,
-        q=query
-    ).execute()
+    since: optional epoch seconds; only messages after it are fetched
+    (defaults to the last 24 hours).
+    """
+    if since is None:
+        since = (datetime.now() - timedelta(days=1)).timestamp()
+    query = f'after:{int(since)}'
+
+    with span('search', 'mail'):
+        results = service.users().messages().list(
+            userId='me',
+            maxResults=10,
+            q=query
+        ).execute(num_retries=NUM_RETRIES)
 
     messages = results.get('messages', [])
 
     # Get profile for email address
-    profile = service.users().getProfile(userId='me').execute()
+    with span('profile', 'mail'):
+        profile = service.users().getProfile(userId='me').execute(num_retries=NUM_RETRIES)
     email_address = profile.get('emailAddress', 'Unknown')
 
     # Fetch message details
     emails = []
     for msg in messages[:10]:
-        msg_detail = service.users().messages().get(
-            userId='me',
-            id=msg['id'],
-            format='metadata',
-            metadataHeaders=['From', 'Subject', 'Date']
-        ).execute()
-
-        headers = {h['name']: h['value'] for h in msg_detail.get('payload', {}).get('headers', [])}
-
-        emails.append({
+        with span('fetch', 'mail'):
+            msg_detail = service.users().messages().get(
+                userId='me',
+                id=msg['id'],
+                format='metadata',
+                metadataHeaders=['From', 'Subject', 'Date']
+            ).execute(num_retries=NUM_RETRIES)
+
+        with span('parse', 'mail'):
+            headers = {h['name']: decode_header_value(h['value'])
+                       for h in msg_detail.get('payload', {}).get('headers', [])}
+
+        emails.append(EmailRecord.from_dict({
             'id': msg['id'],
+            'thread_id': msg_detail.get('threadId', msg.get('threadId')),
+            'internal_date': msg_detail.get('internalDate'),
             'from': headers.get('From', 'Unknown'),
             'subject': headers.get('Subject', '(No Subject)'),
             'date': headers.get('Date', ''),
+            'unread': 'UNREAD' in msg_detail.get('labelIds', []),
             'snippet': msg_detail.get('snippet', '')
-        })
+        }))
 
     # Get unread count
-    unread_results = service.users().messages().list(
-        userId='me',
-        q='is:unread',
-        maxResults=1
-    ).execute()
+    with span('search', 'mail'):
+        unread_results = service.users().messages().list(
+            userId='me',
+            q='is:unread',
+            maxResults=1
+        ).execute(num_retries=NUM_RETRIES)
 
     unread_count = unread_results.get('resultSizeEstimate', 0)
 
@@ -101,6 +125,14 @@ def fetch_with_gmail_api():
         'source': 'gmail_api_auto'
     }
 
+
+def fetch_with_gmail_api():
+    """Fetch emails using Gmail API with system-provided tokens."""
+    service = build_gmail_service()
+    if service is None:
+        return None
+    return fetch_with_service(service)
+
 def fetch_with_worker_api():
     """Fetch emails via Worker API (alternative pattern)."""
     try:
@@ -136,6 +168,7 @@ def fetch_with_worker_api():
     else:
         return None
 
+@profiled
 def main():
     """Main function - tries automatic methods, falls back to manual."""
     print("=" * 60)
@@ -151,7 +184,7 @@ def main():
         if result:
             print(f"✓ Fetched {result['total_fetched']} emails from {result['email_address']}")
             print(f"  Unread count: {result['unread_count']}")
-            print(json.dumps(result, indent=2))
+            print(json.dumps(result, indent=2, default=json_default))
             return 0
         else:
             print("✗ Gmail API fetch failed")
@@ -164,7 +197,7 @@ def main():
     result = fetch_with_worker_api()
     if result:
         print("✓ Fetched emails via Worker API")
-        print(json.dumps(result, indent=2))
+        print(json.dumps(result, indent=2, default=json_default))
         return 0
     else:
         print("✗ Worker API not available")
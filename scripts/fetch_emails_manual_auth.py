@@ -11,11 +11,16 @@ import base64
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from email_record import EmailRecord, json_default
+from gmail_service import NUM_RETRIES, build_service
+from mail_headers import decode_header_value
+from sender_rules import is_automated_sender
+from trace_spans import profiled, span
+
 try:
     from google.auth.transport.requests import Request
     from google.oauth2.credentials import Credentials
     from google_auth_oauthlib.flow import InstalledAppFlow
-    from googleapiclient.discovery import build
     from googleapiclient.errors import HttpError
 except ImportError:
     print("Error: Required packages not installed")
@@ -87,57 +92,51 @@ def get_credentials():
     return creds
 
 
-def decode_message_part(part):
-    """Decode email message part."""
-    if 'data' in part['body']:
-        data = part['body']['data']
-    elif 'attachmentId' in part['body']:
-        return None
-    else:
-        return None
-
-    data = base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
-    return data
-
+def find_part(payload, mime_type):
+    """Find the first part of a given MIME type, searching nested parts."""
+    if payload.get('mimeType') == mime_type and 'parts' not in payload:
+        return payload
+    for part in payload.get('parts', []):
+        found = find_part(part, mime_type)
+        if found:
+            return found
+    return None
 
-def get_message_body(payload):
-    """Extract plain text body from message payload."""
-    if 'parts' in payload:
-        for part in payload['parts']:
-            if part['mimeType'] == 'text/plain':
-                return decode_message_part(part)
-            elif part['mimeType'] == 'multipart/alternative':
-                for subpart in part.get('parts', []):
-                    if subpart['mimeType'] == 'text/plain':
-                        return decode_message_part(subpart)
-    elif payload['mimeType'] == 'text/plain':
-        return decode_message_part(payload)
 
-    return None
+def get_body_part(payload):
+    """Return (bytes, subtype) of the text/plain body, or of the text/html body when there is no plain text."""
+    for mime_type in ('text/plain', 'text/html'):
+        part = find_part(payload, mime_type)
+        if part and part['body'].get('data'):
+            return base64.urlsafe_b64decode(part['body']['data']), mime_type.split('/')[1]
+    return None, None
 
 
 def get_header_value(headers, name):
-    """Get header value by name."""
+    """Get header value by name, decoding any encoded-words left in it."""
     for header in headers:
         if header['name'].lower() == name.lower():
-            return header['value']
+            return decode_header_value(header['value'])
     return None
 
 
-def fetch_recent_emails(max_results=10):
-    """Fetch recent emails using Gmail API."""
+def fetch_recent_emails(max_results=10, service=None):
+    """Fetch recent emails using Gmail API (builds the service from saved credentials unless one is given)."""
     print("\n" + "="*60)
     print("FETCHING EMAILS FROM GMAIL")
     print("="*60)
 
-    creds = get_credentials()
-
     try:
-        service = build('gmail', 'v1', credentials=creds)
+        if service is None:
+            with span('login', 'mail'):
+                creds = get_credentials()
+            with span('connect', 'mail'):
+                service = build_service(creds)
 
         # Get user profile
         print("\nConnecting to Gmail...")
-        profile = service.users().getProfile(userId='me').execute()
+        with span('profile', 'mail'):
+            profile = service.users().getProfile(userId='me').execute(num_retries=NUM_RETRIES)
         email_address = profile['emailAddress']
         total_messages = profile['messagesTotal']
 
@@ -147,11 +146,12 @@ def fetch_recent_emails(max_results=10):
         # Query for recent messages
         print(f"\nFetching {max_results} most recent emails...")
 
-        results = service.users().messages().list(
-            userId='me',
-            maxResults=max_results,
-            labelIds=['INBOX']
-        ).execute()
+        with span('search', 'mail'):
+            results = service.users().messages().list(
+                userId='me',
+                maxResults=max_results,
+                labelIds=['INBOX']
+            ).execute(num_retries=NUM_RETRIES)
 
         messages = results.get('messages', [])
 
@@ -167,57 +167,59 @@ def fetch_recent_emails(max_results=10):
         print(f"Found {len(messages)} messages. Fetching details...")
 
         # Count unread messages
-        unread_results = service.users().messages().list(
-            userId='me',
-            q='is:unread',
-            maxResults=1
-        ).execute()
+        with span('search', 'mail'):
+            unread_results = service.users().messages().list(
+                userId='me',
+                q='is:unread',
+                maxResults=1
+            ).execute(num_retries=NUM_RETRIES)
         unread_count = unread_results.get('resultSizeEstimate', 0)
 
         # Fetch full message details
         emails = []
         for i, message in enumerate(messages, 1):
             try:
-                msg = service.users().messages().get(
-                    userId='me',
-                    id=message['id'],
-                    format='full'
-                ).execute()
-
-                payload = msg['payload']
-                headers = payload['headers']
-
-                subject = get_header_value(headers, 'Subject') or '(No subject)'
-                from_addr = get_header_value(headers, 'From') or '(Unknown sender)'
-                date_str = get_header_value(headers, 'Date') or ''
-
-                # Get message body
-                body = get_message_body(payload)
-                if body:
-                    body = body[:800]
-                else:
-                    body = '(No plain text content)'
+                with span('fetch', 'mail'):
+                    msg = service.users().messages().get(
+                        userId='me',
+                        id=message['id'],
+                        format='full'
+                    ).execute(num_retries=NUM_RETRIES)
+
+                with span('parse', 'mail'):
+                    payload = msg['payload']
+                    headers = payload['headers']
+
+                    subject = get_header_value(headers, 'Subject') or '(No subject)'
+                    from_addr = get_header_value(headers, 'From') or '(Unknown sender)'
+                    date_str = get_header_value(headers, 'Date') or ''
 
                 # Check if unread
                 labels = msg.get('labelIds', [])
                 is_unread = 'UNREAD' in labels
 
                 # Check if automated
-                is_automated = any(pattern in from_addr.lower() for pattern in [
-                    'no-reply@', 'noreply@', 'do-not-reply@'
-                ])
+                with span('classify', 'mail'):
+                    is_automated = is_automated_sender(from_addr)
 
-                emails.append({
+                record = EmailRecord.from_dict({
                     'id': message['id'],
+                    'thread_id': msg.get('threadId', message.get('threadId')),
+                    'internal_date': msg.get('internalDate'),
                     'subject': subject,
                     'from': from_addr,
-                    'body': body.strip(),
                     'date': date_str,
                     'unread': is_unread,
                     'automated': is_automated,
                     'labels': labels
                 })
 
+                # Body bytes are kept undecoded until the record is read or serialized
+                with span('parse', 'mail'):
+                    data, subtype = get_body_part(payload)
+                record.set_raw_body(data, 'utf-8', subtype, budget=800, no_text='(No plain text content)')
+                emails.append(record)
+
                 print(f"  [{i}/{len(messages)}] {subject[:60]}...")
 
             except HttpError as error:
@@ -237,6 +239,7 @@ def fetch_recent_emails(max_results=10):
         return None
 
 
+@profiled
 def main():
     """Main function."""
     print("="*60)
@@ -258,7 +261,7 @@ def main():
 
         # Output JSON
         print("\nJSON OUTPUT:")
-        print(json.dumps(result, indent=2, ensure_ascii=False))
+        print(json.dumps(result, indent=2, ensure_ascii=False, default=json_default))
 
         return 0
     else:
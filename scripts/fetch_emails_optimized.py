@@ -8,94 +8,68 @@ import os
 import sys
 import imaplib
 import email
-from email.header import decode_header
 import json
-import re
 
-
-def decode_mime(s):
-    """Decode MIME encoded-words in string."""
-    if not s:
-        return ""
-    try:
-        decoded = decode_header(s)
-        return ''.join([
-            frag.decode(enc or 'utf-8', errors='ignore') if isinstance(frag, bytes) else str(frag)
-            for frag, enc in decoded
-        ])
-    except:
-        return str(s)
+from email_record import EmailRecord, json_default
+from email_threads import collapse_threads
+from html_text import html_to_text, looks_like_html
+from keyword_matcher import ACTION_MATCHER, SECURITY_MATCHER
+from mail_headers import decode_header_value
+from sentence_segmenter import first_matching_sentences
+from sender_rules import is_automated_sender
+from trace_spans import profiled, span
 
 
 def is_automated_notification(subject, from_addr, body):
     """Check if email is an automated notification that should be filtered."""
-    automated_patterns = [
-        'no-reply@',
-        'noreply@',
-        'do-not-reply@',
-        'donotreply@',
-        'notifications@',
-        'alert@',
-        'security@accounts',
-    ]
-
-    # Check sender
-    for pattern in automated_patterns:
-        if pattern in from_addr.lower():
-            return True
+    # Check sender against the shared rule index (assets/sender_rules.json)
+    if is_automated_sender(from_addr):
+        return True
 
     # Check if it's a security alert with no actionable content
-    security_keywords = ['安全提醒', 'security alert', 'security notification', '登录活动']
-    if any(kw in subject for kw in security_keywords):
+    if SECURITY_MATCHER.search(subject):
         # Security alerts are usually informational only
         return True
 
     return False
 
 
-def extract_actionable_content(subject, body):
+def extract_actionable_content(subject, body, limit=3):
     """Extract potentially actionable content from email body."""
-    # Remove HTML tags
-    body_text = re.sub(r'<[^>]+>', '', body)
-
-    # Look for action keywords
-    action_keywords = [
-        'please', 'review', 'respond', 'complete', 'approve', 'confirm',
-        'action required', 'deadline', 'due', 'meeting', 'schedule',
-        '请', '需要', '完成', '审批', '确认', '会议', '截止'
-    ]
-
-    # Extract sentences with action keywords
-    sentences = re.split(r'[.!?\n]+', body_text)
-    actionable_sentences = []
+    # Bodies of text/html parts are already text; convert plain parts only when they
+    # really carry markup, so quoted addresses ("Bob <bob@x.com> wrote:") keep their lines
+    body_text = html_to_text(body) if looks_like_html(body) else body
 
-    for sentence in sentences:
-        if any(keyword in sentence.lower() for keyword in action_keywords):
-            clean_sentence = sentence.strip()
-            if len(clean_sentence) > 20 and len(clean_sentence) < 200:
-                actionable_sentences.append(clean_sentence)
+    # Sentences with action keywords (English and Chinese punctuation); the scan stops
+    # as soon as `limit` sentences are found
+    return first_matching_sentences(body_text, ACTION_MATCHER, limit=limit)
 
-    return actionable_sentences[:3]  # Return top 3
 
-
-def connect_and_fetch(email_addr, password, max_emails=10):
-    """Connect to Gmail and fetch most recent emails efficiently."""
+def connect_and_fetch(email_addr, password, max_emails=10, host='imap.gmail.com', port=993, use_ssl=True):
+    """Connect to Gmail (or another IMAP host) and fetch most recent emails efficiently."""
     print(f"Connecting to Gmail IMAP for {email_addr}...", flush=True)
 
     try:
-        mail = imaplib.IMAP4_SSL('imap.gmail.com', 993, timeout=10)
-        mail.login(email_addr, password)
-        mail.select('INBOX')
+        with span('connect', 'mail'):
+            if use_ssl:
+                mail = imaplib.IMAP4_SSL(host, port, timeout=10)
+            else:
+                mail = imaplib.IMAP4(host, port, timeout=10)
+        with span('login', 'mail'):
+            mail.login(email_addr, password)
 
         print("Connected! Fetching email metadata...", flush=True)
 
-        # Get total count and unread count efficiently
-        status, unread_msgs = mail.search(None, 'UNSEEN')
+        with span('search', 'mail'):
+            mail.select('INBOX')
+
+            # Get total count and unread count efficiently
+            status, unread_msgs = mail.search(None, 'UNSEEN')
+
+            # Get all message IDs (just the count, fast operation)
+            status, all_msgs = mail.search(None, 'ALL')
         unread_ids = unread_msgs[0].split() if unread_msgs[0] else []
         unread_count = len(unread_ids)
-
-        # Get all message IDs (just the count, fast operation)
-        status, all_msgs = mail.search(None, 'ALL')
         all_ids = all_msgs[0].split() if all_msgs[0] else []
         total_count = len(all_ids)
 
@@ -110,58 +84,38 @@ def connect_and_fetch(email_addr, password, max_emails=10):
         for i, eid in enumerate(reversed(recent_ids)):
             try:
                 # Fetch email with timeout protection
-                status, data = mail.fetch(eid, '(RFC822)')
+                with span('fetch', 'mail'):
+                    status, data = mail.fetch(eid, '(RFC822)')
 
                 if status != 'OK':
                     continue
 
                 for part in data:
                     if isinstance(part, tuple):
-                        msg = email.message_from_bytes(part[1])
-
-                        subject = decode_mime(msg.get('Subject', ''))
-                        from_addr = decode_mime(msg.get('From', ''))
-                        date_str = msg.get('Date', '')
-
-                        # Get plain text body
-                        body = ""
-                        if msg.is_multipart():
-                            for p in msg.walk():
-                                if p.get_content_type() == "text/plain":
-                                    try:
-                                        payload = p.get_payload(decode=True)
-                                        if payload:
-                                            body = payload.decode('utf-8', errors='ignore')[:1000]
-                                            break
-                                    except:
-                                        pass
-                        else:
-                            try:
-                                payload = msg.get_payload(decode=True)
-                                if payload:
-                                    body = payload.decode('utf-8', errors='ignore')[:1000]
-                            except:
-                                pass
+                        with span('parse', 'mail'):
+                            msg = email.message_from_bytes(part[1])
+
+                            subject = decode_header_value(msg.get('Subject', ''))
+                            from_addr = decode_header_value(msg.get('From', ''))
+                            date_str = msg.get('Date', '')
 
                         # Check if unread
                         is_unread = eid in unread_ids
 
-                        # Filter automated notifications
-                        is_automated = is_automated_notification(subject, from_addr, body)
-
-                        # Extract actionable content
-                        actionable = extract_actionable_content(subject, body) if not is_automated else []
-
-                        emails.append({
+                        record = EmailRecord.from_dict({
                             'subject': subject or '(No subject)',
                             'from': from_addr,
-                            'body': body.strip()[:500] if body else '(No text content)',
                             'date': date_str,
                             'unread': is_unread,
-                            'automated': is_automated,
-                            'actionable_content': actionable
+                            'message_id': msg.get('Message-ID', ''),
+                            'in_reply_to': msg.get('In-Reply-To', ''),
+                            'references': msg.get('References', '')
                         })
 
+                        # Body is decoded on first read (HTML-only messages are converted to text)
+                        record.set_message_body(msg, budget=1000)
+                        emails.append(record)
+
                         print(f"  [{i+1}/{len(recent_ids)}] {subject[:50]}...", flush=True)
 
             except Exception as e:
@@ -171,9 +125,28 @@ def connect_and_fetch(email_addr, password, max_emails=10):
         mail.close()
         mail.logout()
 
+        # Messages fetched and parsed, before reply chains are collapsed
+        fetched_count = len(emails)
+
+        # Collapse reply chains so only the newest message per thread is processed
+        with span('threads', 'mail'):
+            emails = collapse_threads(emails)
+
+        for e in emails:
+            # Filter automated notifications
+            with span('classify', 'mail'):
+                e['automated'] = is_automated_notification(e['subject'], e['from'], e['body'])
+
+            # Extract actionable content
+            with span('extract', 'mail'):
+                e['actionable_content'] = extract_actionable_content(e['subject'], e['body']) if not e['automated'] else []
+
+            e['body'] = e['body'][:500]
+
         return {
             'unread_count': unread_count,
             'total_count': total_count,
+            'fetched_count': fetched_count,
             'emails': emails,
             'actionable_emails': [e for e in emails if not e['automated'] and e['actionable_content']]
         }
@@ -183,6 +156,7 @@ def connect_and_fetch(email_addr, password, max_emails=10):
         return None
 
 
+@profiled
 def main():
     """Main function."""
     email_addr = os.getenv('CAPY_USER_EMAIL', 'yyf2464212962@gmail.com')
@@ -206,7 +180,7 @@ def main():
 
         # Output JSON
         print("\nJSON OUTPUT:")
-        print(json.dumps(result, indent=2, ensure_ascii=False))
+        print(json.dumps(result, indent=2, ensure_ascii=False, default=json_default))
     else:
         print("Failed to fetch emails")
         sys.exit(1)
@@ -10,13 +10,19 @@ import json
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from email_record import EmailRecord, json_default
+from gmail_service import NUM_RETRIES, build_service, client_library_available
+from mail_headers import decode_header_value
+from trace_spans import profiled, span
+
 def fetch_with_gmail_api():
     """Fetch emails using Gmail API with existing credentials."""
     try:
         from google.auth.transport.requests import Request
         from google.oauth2.credentials import Credentials
         from google_auth_oauthlib.flow import InstalledAppFlow
-        from googleapiclient.discovery import build
+        if not client_library_available():
+            raise ImportError('google-api-python-client')
     except ImportError:
         print("✗ Gmail API libraries not installed")
         print("  Run: pip install --break-system-packages google-auth google-auth-oauthlib google-api-python-client")
@@ -47,7 +53,8 @@ def fetch_with_gmail_api():
         if creds and creds.expired and creds.refresh_token:
             print("🔄 Refreshing expired token...")
             try:
-                creds.refresh(Request())
+                with span('login', 'mail'):
+                    creds.refresh(Request())
                 print("✓ Token refreshed successfully")
             except Exception as e:
                 print(f"✗ Token refresh failed: {e}")
@@ -83,55 +90,69 @@ def fetch_with_gmail_api():
 
     # Build Gmail service
     try:
-        service = build('gmail', 'v1', credentials=creds)
+        with span('connect', 'mail'):
+            service = build_service(creds)
     except Exception as e:
         print(f"✗ Could not build Gmail service: {e}")
         return None
 
-    # Fetch recent emails (last 24 hours)
+    return fetch_with_service(service)
+
+
+def fetch_with_service(service):
+    """Fetch the last 24 hours of email with an already-built Gmail API service."""
     try:
         yesterday = datetime.now() - timedelta(days=1)
         query = f'after:{int(yesterday.timestamp())}'
 
         print("📧 Fetching recent emails...")
-        results = service.users().messages().list(
-            userId='me',
-            maxResults=10,
-            q=query
-        ).execute()
+        with span('search', 'mail'):
+            results = service.users().messages().list(
+                userId='me',
+                maxResults=10,
+                q=query
+            ).execute(num_retries=NUM_RETRIES)
 
         messages = results.get('messages', [])
 
         # Get profile
-        profile = service.users().getProfile(userId='me').execute()
+        with span('profile', 'mail'):
+            profile = service.users().getProfile(userId='me').execute(num_retries=NUM_RETRIES)
         email_address = profile.get('emailAddress', 'Unknown')
 
         # Fetch message details
         emails = []
         for msg in messages[:10]:
-            msg_detail = service.users().messages().get(
-                userId='me',
-                id=msg['id'],
-                format='metadata',
-                metadataHeaders=['From', 'Subject', 'Date']
-            ).execute()
-
-            headers = {h['name']: h['value'] for h in msg_detail.get('payload', {}).get('headers', [])}
-
-            emails.append({
+            with span('fetch', 'mail'):
+                msg_detail = service.users().messages().get(
+                    userId='me',
+                    id=msg['id'],
+                    format='metadata',
+                    metadataHeaders=['From', 'Subject', 'Date']
+                ).execute(num_retries=NUM_RETRIES)
+
+            with span('parse', 'mail'):
+                headers = {h['name']: decode_header_value(h['value'])
+                           for h in msg_detail.get('payload', {}).get('headers', [])}
+
+            emails.append(EmailRecord.from_dict({
                 'id': msg['id'],
+                'thread_id': msg_detail.get('threadId', msg.get('threadId')),
+                'internal_date': msg_detail.get('internalDate'),
                 'from': headers.get('From', 'Unknown'),
                 'subject': headers.get('Subject', '(No Subject)'),
                 'date': headers.get('Date', ''),
+                'unread': 'UNREAD' in msg_detail.get('labelIds', []),
                 'snippet': msg_detail.get('snippet', '')
-            })
+            }))
 
         # Get unread count
-        unread_results = service.users().messages().list(
-            userId='me',
-            q='is:unread',
-            maxResults=1
-        ).execute()
+        with span('search', 'mail'):
+            unread_results = service.users().messages().list(
+                userId='me',
+                q='is:unread',
+                maxResults=1
+            ).execute(num_retries=NUM_RETRIES)
 
         unread_count = unread_results.get('resultSizeEstimate', 0)
 
@@ -147,6 +168,7 @@ def fetch_with_gmail_api():
         print(f"✗ Error fetching emails: {e}")
         return None
 
+@profiled
 def main():
     """Main function."""
     print("=" * 60)
@@ -175,7 +197,7 @@ def main():
         print("\n" + "=" * 60)
         print("JSON Output:")
         print("=" * 60)
-        print(json.dumps(result, indent=2))
+        print(json.dumps(result, indent=2, default=json_default))
 
         return 0
     else:
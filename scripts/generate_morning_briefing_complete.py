@@ -11,6 +11,12 @@ import subprocess
 from datetime import datetime
 from pathlib import Path
 
+from email_threads import collapse_threads
+from keyword_matcher import TASK_MATCHER, SUGGESTION_MATCHER
+from task_ranking import top_k
+from trace_spans import profiled, traced
+
+@traced('fetch', 'mail')
 def try_fetch_gmail():
     """Try to fetch emails from Gmail using existing credentials."""
     print("🔍 Attempting to fetch emails from Gmail...")
@@ -58,7 +64,7 @@ def try_fetch_gmail():
 
 def convert_gmail_data_to_briefing_format(gmail_data):
     """Convert Gmail API response to morning briefing format."""
-    emails = gmail_data.get('emails', [])
+    emails = collapse_threads(gmail_data.get('emails', []))
     unread_count = gmail_data.get('unread_count', 0)
 
     email_summary = f"{unread_count} unread emails"
@@ -71,7 +77,11 @@ def convert_gmail_data_to_briefing_format(gmail_data):
         key_emails.append({
             'from': email['from'],
             'subject': email['subject'],
-            'snippet': email.get('snippet', '')[:100]
+            'snippet': email.get('snippet', '')[:100],
+            'date': email.get('date', ''),
+            'unread': email.get('unread', False),
+            # Lets extract_tasks_from_data see these are already one message per thread
+            'thread_id': email.get('thread_id', '')
         })
 
     return {
@@ -94,6 +104,7 @@ def get_manual_input():
 
     return None
 
+@traced('extract', 'tasks')
 def extract_tasks_from_data(email_data):
     """Extract tasks from email data."""
     tasks = []
@@ -109,33 +120,39 @@ def extract_tasks_from_data(email_data):
 
     # Extract from key emails
     if 'key_emails' in email_data:
-        for email in email_data['key_emails']:
+        # One task per thread: reply-all chains collapse to their newest message
+        for email in collapse_threads(email_data['key_emails']):
             subject = email.get('subject', '')
             snippet = email.get('snippet', '')
 
-            action_words = ['meeting', 'review', 'feedback', 'deadline', 'urgent', 'asap']
-            if any(word in subject.lower() or word in snippet.lower() for word in action_words):
+            if TASK_MATCHER.search(subject) or TASK_MATCHER.search(snippet):
                 task_text = f"Respond to: {subject}"
                 tasks.append({
                     'task': task_text,
                     'priority': 'medium',
-                    'source': 'email'
+                    'source': 'email',
+                    'from': email.get('from', ''),
+                    'date': email.get('date', ''),
+                    'unread': email.get('unread', False)
                 })
 
     return tasks
 
+@traced('suggest', 'tasks')
 def generate_ai_suggestions(email_summary, existing_tasks):
     """Generate AI task suggestions."""
     suggestions = []
 
-    if 'meeting' in email_summary.lower():
+    summary_keywords = SUGGESTION_MATCHER.hits(email_summary)
+
+    if 'meeting' in summary_keywords:
         suggestions.append({
             'task': 'Review meeting agenda and prepare notes',
             'priority': 'medium',
             'source': 'ai'
         })
 
-    if 'feedback' in email_summary.lower() or 'response' in email_summary.lower():
+    if 'feedback' in summary_keywords or 'response' in summary_keywords:
         suggestions.append({
             'task': 'Draft responses to important emails',
             'priority': 'low',
@@ -148,15 +165,16 @@ def generate_ai_suggestions(email_summary, existing_tasks):
         'source': 'ai'
     })
 
-    return suggestions[:2]
+    return top_k(suggestions, 2)
 
+@traced('render-image', 'render')
 def generate_visual_dashboard(email_summary, tasks, output_path):
     """Generate visual dashboard using generate-image skill."""
     print("🎨 Generating visual dashboard...")
 
     # Build task list
     task_lines = []
-    for i, task in enumerate(tasks[:8], 1):
+    for i, task in enumerate(top_k(tasks, 8), 1):
         emoji = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}.get(task['priority'], '⚪')
         task_lines.append(f"{i}. {emoji} {task['task']}")
 
@@ -208,8 +226,11 @@ STYLE:
         print(f"✗ Error generating image: {e.stderr}")
         return None
 
+@profiled
 def main():
     """Main function."""
+    from briefing_pipeline import build_pipeline
+
     print("=" * 60)
     print("☀️  COMPLETE MORNING BRIEFING GENERATOR")
     print("=" * 60)
@@ -237,24 +258,14 @@ def main():
     source = email_data.get('source', 'manual')
     print(f"\n📧 Email summary ({source}): {email_summary}")
 
-    # Extract and generate tasks
+    # Tasks and dashboard come from the complete stages in briefing_pipeline.py
     print("\n📋 Extracting tasks...")
-    tasks = extract_tasks_from_data(email_data)
-
-    print("🤖 Generating AI suggestions...")
-    ai_suggestions = generate_ai_suggestions(email_summary, tasks)
-    tasks.extend(ai_suggestions)
-
-    print(f"✓ Total tasks: {len(tasks)}")
-
-    # Generate visual dashboard
     output_dir = os.getenv('MORNING_ROUTINE_OUTPUT_DIR', './outputs')
-    os.makedirs(output_dir, exist_ok=True)
-
-    timestamp = datetime.now().strftime("%Y%m%d")
-    output_path = f"{output_dir}/morning-briefing-{timestamp}.png"
-
-    dashboard = generate_visual_dashboard(email_summary, tasks, output_path)
+    pipeline = build_pipeline('complete', cache_dir=os.getenv('MORNING_ROUTINE_CACHE_DIR')).without('fetch')
+    context = pipeline.run(output_dir=output_dir, email_data=email_data)
+    tasks = context['tasks']
+    dashboard = context['image_result']
+    print(f"✓ Total tasks: {len(tasks)}")
 
     if dashboard:
         print("\n" + "=" * 60)
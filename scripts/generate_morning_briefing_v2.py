@@ -11,7 +11,13 @@ import subprocess
 from datetime import datetime
 from pathlib import Path
 
+from email_threads import collapse_threads
+from keyword_matcher import TASK_MATCHER, SUGGESTION_MATCHER
+from task_ranking import top_k
+from trace_spans import profiled, traced
 
+
+@traced('fetch', 'mail')
 def try_automatic_email_fetch():
     """Try to fetch emails automatically using system-provided tokens."""
     # Check if automatic fetching is available
@@ -43,7 +49,7 @@ def try_automatic_email_fetch():
 
 def convert_api_data_to_briefing_format(api_data):
     """Convert Gmail API response to morning briefing format."""
-    emails = api_data.get('emails', [])
+    emails = collapse_threads(api_data.get('emails', []))
 
     email_summary = f"{api_data.get('unread_count', 0)} unread emails"
     if len(emails) > 0:
@@ -55,7 +61,11 @@ def convert_api_data_to_briefing_format(api_data):
         key_emails.append({
             'from': email['from'],
             'subject': email['subject'],
-            'snippet': email.get('snippet', '')[:100]
+            'snippet': email.get('snippet', '')[:100],
+            'date': email.get('date', ''),
+            'unread': email.get('unread', False),
+            # Lets extract_tasks_from_data see these are already one message per thread
+            'thread_id': email.get('thread_id', '')
         })
 
     return {
@@ -113,6 +123,7 @@ def create_sample_input():
     return None
 
 
+@traced('extract', 'tasks')
 def extract_tasks_from_data(email_data):
     """Extract tasks from provided email data."""
     tasks = []
@@ -128,36 +139,42 @@ def extract_tasks_from_data(email_data):
 
     # Extract from key emails
     if 'key_emails' in email_data:
-        for email in email_data['key_emails']:
+        # One task per thread: reply-all chains collapse to their newest message
+        for email in collapse_threads(email_data['key_emails']):
             subject = email.get('subject', '')
             snippet = email.get('snippet', '')
 
             # Simple heuristic: look for action words
-            action_words = ['meeting', 'review', 'feedback', 'deadline', 'urgent', 'asap']
-            if any(word in subject.lower() or word in snippet.lower() for word in action_words):
+            if TASK_MATCHER.search(subject) or TASK_MATCHER.search(snippet):
                 task_text = f"Respond to: {subject}"
                 tasks.append({
                     'task': task_text,
                     'priority': 'medium',
-                    'source': 'email'
+                    'source': 'email',
+                    'from': email.get('from', ''),
+                    'date': email.get('date', ''),
+                    'unread': email.get('unread', False)
                 })
 
     return tasks
 
 
+@traced('suggest', 'tasks')
 def generate_ai_suggestions(email_summary, existing_tasks):
     """Generate simple AI task suggestions."""
     suggestions = []
 
     # Common morning tasks
-    if 'meeting' in email_summary.lower():
+    summary_keywords = SUGGESTION_MATCHER.hits(email_summary)
+
+    if 'meeting' in summary_keywords:
         suggestions.append({
             'task': 'Review meeting agenda and prepare notes',
             'priority': 'medium',
             'source': 'ai'
         })
 
-    if 'feedback' in email_summary.lower() or 'response' in email_summary.lower():
+    if 'feedback' in summary_keywords or 'response' in summary_keywords:
         suggestions.append({
             'task': 'Draft responses to important emails',
             'priority': 'low',
@@ -171,9 +188,10 @@ def generate_ai_suggestions(email_summary, existing_tasks):
         'source': 'ai'
     })
 
-    return suggestions[:2]  # Max 2 AI suggestions
+    return top_k(suggestions, 2)  # Max 2 AI suggestions, best first
 
 
+@traced('render-image', 'render')
 def generate_visual_dashboard(email_summary, tasks, output_path):
     """Generate visual dashboard using generate-image skill."""
     print("🎨 Generating visual dashboard...")
@@ -185,7 +203,7 @@ def generate_visual_dashboard(email_summary, tasks, output_path):
 
     # Build task list text
     task_lines = []
-    for i, task in enumerate(tasks[:8], 1):  # Max 8 tasks
+    for i, task in enumerate(top_k(tasks, 8), 1):  # Max 8 tasks, highest score first
         emoji = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}.get(task['priority'], '⚪')
         task_lines.append(f"{i}. {emoji} {task['task']}")
 
@@ -241,8 +259,11 @@ STYLE:
         return None
 
 
+@profiled
 def main():
     """Main function."""
+    from briefing_pipeline import build_pipeline
+
     print("=" * 60)
     print("☀️  MORNING BRIEFING GENERATOR V2")
     print("=" * 60)
@@ -282,25 +303,14 @@ def main():
     source = email_data.get('source', 'manual')
     print(f"\n📧 Email summary ({source}): {email_summary}")
 
-    # Extract tasks
+    # Tasks and dashboard come from the v2 stages in briefing_pipeline.py
     print("\n📋 Extracting tasks...")
-    tasks = extract_tasks_from_data(email_data)
-
-    # Generate AI suggestions
-    print("🤖 Generating AI suggestions...")
-    ai_suggestions = generate_ai_suggestions(email_summary, tasks)
-    tasks.extend(ai_suggestions)
-
-    print(f"✓ Total tasks: {len(tasks)}")
-
-    # Generate visual dashboard
     output_dir = os.getenv('MORNING_ROUTINE_OUTPUT_DIR', './outputs')
-    os.makedirs(output_dir, exist_ok=True)
-
-    timestamp = datetime.now().strftime("%Y%m%d")
-    output_path = f"{output_dir}/morning-briefing-{timestamp}.png"
-
-    dashboard = generate_visual_dashboard(email_summary, tasks, output_path)
+    pipeline = build_pipeline('v2', cache_dir=os.getenv('MORNING_ROUTINE_CACHE_DIR')).without('fetch')
+    context = pipeline.run(output_dir=output_dir, email_data=email_data)
+    tasks = context['tasks']
+    dashboard = context['image_result']
+    print(f"✓ Total tasks: {len(tasks)}")
 
     if dashboard:
         print("\n" + "=" * 60)
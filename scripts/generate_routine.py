@@ -8,9 +8,12 @@ import os
 import sys
 import json
 import subprocess
-from datetime import datetime
 from pathlib import Path
 
+from briefing_model import build_briefing, output_path
+from template_renderer import Template, load_template
+from trace_spans import profiled, traced
+
 
 def run_command(cmd, description=""):
     """Execute a shell command and return output."""
@@ -29,6 +32,7 @@ def run_command(cmd, description=""):
         return None
 
 
+@traced('fetch', 'mail')
 def get_email_summary():
     """Fetch recent emails and generate summary."""
     print("\n📧 Fetching emails...")
@@ -44,6 +48,7 @@ def get_email_summary():
     return email_summary
 
 
+@traced('extract', 'tasks')
 def extract_tasks_from_emails(email_data):
     """Extract actionable tasks from email content."""
     tasks = []
@@ -59,6 +64,7 @@ def extract_tasks_from_emails(email_data):
     return tasks
 
 
+@traced('suggest', 'tasks')
 def generate_ai_suggestions(email_summary, extracted_tasks):
     """Generate AI task suggestions based on context."""
     suggestions = []
@@ -74,6 +80,7 @@ def generate_ai_suggestions(email_summary, extracted_tasks):
     return suggestions
 
 
+@traced('render-image', 'render')
 def generate_motivational_image(tasks_context):
     """Generate personalized motivational image based on tasks."""
     print("\n🎨 Generating motivational image...")
@@ -86,76 +93,93 @@ def generate_motivational_image(tasks_context):
     return image_path
 
 
-def create_markdown_report(email_summary, tasks, image_path, output_dir):
-    """Create the final morning routine markdown report."""
-    print("\n📝 Creating morning routine report...")
-
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    date_str = datetime.now().strftime("%A, %B %d, %Y")
-
-    # Read the report template
-    template_path = Path(__file__).parent.parent / "assets" / "report_template.md"
+REPORT_TEMPLATE = 'report_template.md'
 
-    if template_path.exists():
-        with open(template_path, 'r') as f:
-            template = f.read()
-    else:
-        # Fallback template if asset doesn't exist
-        template = """# Morning Routine Report
-{date}
+# Used when assets/report_template.md is missing
+FALLBACK_REPORT_TEMPLATE = Template("""# Morning Routine Report
+{{ date }}
 
 ## 📧 Email Summary
 
-{email_summary}
+{{ email_summary }}
 
 ## ✅ Today's Tasks
 
-{tasks}
+{% for task in tasks %}
+{{ task.number }}. {{ task.emoji }} {{ task.text }} *[from {{ task.source }}]*
+{% endfor %}
 
 ## 💪 Daily Motivation
 
-{motivation}
+{{ motivation }}
 
 ---
-*Generated at {timestamp}*
-"""
+*Generated at {{ timestamp }}*
+""", '<fallback report>', escape_values=False)
+
+PRIORITY_EMOJI = {"high": "🔴", "medium": "🟡", "low": "🟢"}
+
+
+def report_template(name=REPORT_TEMPLATE):
+    """The compiled report template (compiled once per process, fallback if the asset is missing)."""
+    try:
+        return load_template(name)
+    except FileNotFoundError:
+        return FALLBACK_REPORT_TEMPLATE
+
+
+def report_context(briefing):
+    """Template context for the report; task rows are produced lazily."""
+    def task_rows():
+        for i, task in enumerate(briefing.tasks, 1):
+            yield {
+                'number': i,
+                'emoji': PRIORITY_EMOJI.get(task.priority, "⚪"),
+                'text': task.text,
+                'source': task.source
+            }
+
+    email_section = briefing.email_summary
+    if briefing.unread_count is not None:
+        email_section = f"**Unread emails:** {briefing.unread_count}\n\n{email_section}"
+
+    return {
+        'date': briefing.date,
+        'timestamp': briefing.generated_at.replace('T', ' '),
+        'email_summary': email_section,
+        'tasks': task_rows(),
+        'motivation': f"![Daily Motivation]({briefing.image_path})\n\n*Your personalized motivation for today*"
+    }
+
 
-    # Format email summary
-    email_section = f"**Unread emails:** {email_summary.get('unread_count', 0)}\n\n"
-    email_section += email_summary.get('summary', 'No email summary available.')
-
-    # Format tasks
-    tasks_section = ""
-    for i, task in enumerate(tasks, 1):
-        priority_emoji = {"high": "🔴", "medium": "🟡", "low": "🟢"}.get(task.get('priority', 'medium'), "⚪")
-        source_tag = f"*[from {task.get('source', 'unknown')}]*"
-        tasks_section += f"{i}. {priority_emoji} {task.get('task', 'Untitled task')} {source_tag}\n"
-
-    # Format motivation section
-    motivation_section = f"![Daily Motivation]({image_path})\n\n*Your personalized motivation for today*"
-
-    # Fill template
-    report = template.format(
-        date=date_str,
-        email_summary=email_section,
-        tasks=tasks_section,
-        motivation=motivation_section,
-        timestamp=timestamp
-    )
-
-    # Write report
-    output_path = Path(output_dir) / f"morning-routine-{datetime.now().strftime('%Y%m%d')}.md"
+def write_report(briefing, output_path, template=REPORT_TEMPLATE):
+    """Write the briefing's markdown report."""
+    print("\n📝 Creating morning routine report...")
+
+    output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(output_path, 'w') as f:
-        f.write(report)
+    # Stream the compiled template straight to the file
+    report_template(template).render_to_file(output_path, report_context(briefing))
 
     print(f"✓ Report created: {output_path}")
     return str(output_path)
 
 
+@traced('render-markdown', 'render')
+def create_markdown_report(email_summary, tasks, image_path, output_dir, template=REPORT_TEMPLATE):
+    """Create the final morning routine markdown report."""
+    briefing = build_briefing(email_summary.get('summary', 'No email summary available.'), tasks,
+                              unread_count=email_summary.get('unread_count', 0), image_path=image_path)
+    return write_report(briefing, output_path(briefing, output_dir, 'markdown', prefix='morning-routine'),
+                        template)
+
+
+@profiled
 def main():
     """Main orchestration function."""
+    from briefing_pipeline import build_pipeline
+
     print("=" * 60)
     print("☀️  MORNING ROUTINE AUTOMATOR")
     print("=" * 60)
@@ -163,28 +187,9 @@ def main():
     # Set output directory
     output_dir = os.getenv('MORNING_ROUTINE_OUTPUT_DIR', './outputs')
 
-    # Step 1: Get email summary
-    email_summary = get_email_summary()
-
-    # Step 2: Extract tasks from emails
-    extracted_tasks = extract_tasks_from_emails(email_summary)
-
-    # Step 3: Generate AI task suggestions
-    ai_suggestions = generate_ai_suggestions(email_summary, extracted_tasks)
-
-    # Combine all tasks
-    all_tasks = extracted_tasks + ai_suggestions
-
-    # Step 4: Generate motivational image
-    tasks_context = {
-        "task_count": len(all_tasks),
-        "email_count": email_summary.get('unread_count', 0),
-        "tasks": all_tasks
-    }
-    image_path = generate_motivational_image(tasks_context)
-
-    # Step 5: Create markdown report
-    report_path = create_markdown_report(email_summary, all_tasks, image_path, output_dir)
+    # Email summary, tasks, motivational image and report: the routine stages in briefing_pipeline.py
+    pipeline = build_pipeline('routine', cache_dir=os.getenv('MORNING_ROUTINE_CACHE_DIR'))
+    report_path = pipeline.run(output_dir=output_dir)['report_result']
 
     print("\n" + "=" * 60)
     print("✓ Morning routine complete!")
@@ -11,7 +11,11 @@ import subprocess
 from datetime import datetime
 from pathlib import Path
 
+from task_ranking import top_k
+from trace_spans import profiled, traced
 
+
+@traced('fetch', 'mail')
 def fetch_emails():
     """Fetch emails using the fetch_emails script."""
     print("📧 Fetching emails...")
@@ -42,6 +46,7 @@ def fetch_emails():
         return []
 
 
+@traced('summarize', 'tasks')
 def summarize_emails_with_llm(emails):
     """Summarize emails using LLM (Claude will do this interactively)."""
     if not emails:
@@ -66,6 +71,7 @@ def summarize_emails_with_llm(emails):
     }
 
 
+@traced('extract', 'tasks')
 def extract_tasks_with_llm(email_data):
     """Extract tasks from emails (Claude will do this interactively)."""
     # Placeholder - Claude will extract tasks
@@ -75,6 +81,7 @@ def extract_tasks_with_llm(email_data):
     }
 
 
+@traced('render-image', 'render')
 def generate_visual_todo_image(email_summary, tasks, output_path):
     """Generate a visual image with todo list using AI image generation."""
     print("🎨 Generating visual todo list image...")
@@ -87,7 +94,7 @@ def generate_visual_todo_image(email_summary, tasks, output_path):
     task_list = []
     all_tasks = tasks.get('extracted', []) + tasks.get('ai_suggested', [])
 
-    for i, task in enumerate(all_tasks[:8], 1):  # Max 8 tasks
+    for i, task in enumerate(top_k(all_tasks, 8), 1):  # Max 8 tasks, highest score first
         priority = task.get('priority', 'medium')
         emoji = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}.get(priority, '⚪')
         task_list.append(f"{i}. {emoji} {task.get('task', 'Task')}")
@@ -156,6 +163,7 @@ The image should feel like a premium productivity app screenshot - clean, modern
         return None
 
 
+@profiled
 def main():
     """Main orchestration function."""
     print("=" * 60)
@@ -0,0 +1,687 @@
+#!/usr/bin/env python3
+"""
+Gmail API Benchmark
+Measures the Gmail API fetchers offline. A local stand-in for the Gmail REST
+API, running in its own process, serves a synthetic mailbox through the
+endpoints the fetchers use (profile, messages.list/get, history, batch), with
+injected latency, server errors and per-user quota. Each fetcher runs against
+it through MORNING_ROUTINE_GMAIL_ENDPOINT, and the benchmark reports
+messages/sec, requests, errors and p50/p95/p99 request latency.
+"""
+
+import io
+import re
+import sys
+import json
+import html
+import math
+import time
+import base64
+import random
+import argparse
+import threading
+import http.client
+import multiprocessing
+from collections import Counter
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta, timezone
+from email import message_from_bytes
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from gmail_service import NUM_RETRIES, client_library_available
+from synthetic_mailbox import DEFAULT_CHARSETS, SyntheticMailbox
+
+# Quota units per call (Gmail API usage limits); the per-user limit is 250 units/second
+QUOTA_UNITS = {'profile': 1, 'list': 5, 'get': 5, 'history': 2}
+GMAIL_USER_QUOTA = 250
+
+MAX_BATCH = 100
+FIRST_HISTORY_ID = 100000
+SNIPPET_LENGTH = 200
+
+ROUTES = [
+    (re.compile(r'^/gmail/v1/users/([^/]+)/profile$'), 'profile'),
+    (re.compile(r'^/gmail/v1/users/([^/]+)/messages$'), 'list'),
+    (re.compile(r'^/gmail/v1/users/([^/]+)/messages/([^/]+)$'), 'get'),
+    (re.compile(r'^/gmail/v1/users/([^/]+)/history$'), 'history'),
+]
+
+# Statuses googleapiclient retries with num_retries (it also retries rate-limit 403s)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+STATUS_NAMES = {400: 'INVALID_ARGUMENT', 401: 'UNAUTHENTICATED', 404: 'NOT_FOUND',
+                429: 'RESOURCE_EXHAUSTED', 500: 'INTERNAL', 503: 'UNAVAILABLE'}
+
+
+def api_error(code, message, reason):
+    """(status, body) for an error in the Gmail API's JSON error format."""
+    return code, {'error': {'code': code, 'message': message, 'status': STATUS_NAMES.get(code, 'UNKNOWN'),
+                            'errors': [{'domain': 'global', 'reason': reason, 'message': message}]}}
+
+
+def _unfold(value):
+    return re.sub(r'\r?\n[ \t]+', ' ', value)
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).decode('ascii')
+
+
+def _part_resource(part, part_id):
+    resource = {'partId': part_id, 'mimeType': part.get_content_type(),
+                'filename': part.get_filename() or '',
+                'headers': [{'name': name, 'value': _unfold(value)} for name, value in part.items()]}
+    if part.is_multipart():
+        resource['body'] = {'size': 0}
+        prefix = f"{part_id}." if part_id else ''
+        resource['parts'] = [_part_resource(child, f"{prefix}{i}") for i, child in enumerate(part.get_payload())]
+        return resource
+    data = part.get_payload(decode=True) or b''
+    if resource['filename']:
+        # Attachments are fetched separately by id, as in the real API
+        resource['body'] = {'attachmentId': f"att-{part_id}", 'size': len(data)}
+    else:
+        resource['body'] = {'size': len(data), 'data': _b64(data)}
+    return resource
+
+
+def _snippet(msg):
+    for part in msg.walk():
+        if part.get_content_type() == 'text/plain':
+            text = part.get_payload(decode=True).decode(part.get_content_charset() or 'utf-8', 'replace')
+            return html.escape(' '.join(text.split())[:SNIPPET_LENGTH])
+    return ''
+
+
+class GmailMailbox:
+    """Gmail message resources for a synthetic mailbox, newest first like the API lists them."""
+
+    def __init__(self, mailbox, address='me@example.com'):
+        self.address = address
+        self.messages = []
+        for index, message in enumerate(mailbox.messages):
+            msg = message_from_bytes(message.raw)
+            labels = ['INBOX'] + (['UNREAD'] if message.unread else [])
+            labels.append('CATEGORY_UPDATES' if message.automated else 'CATEGORY_PERSONAL')
+            self.messages.append({
+                'id': f"{index:016x}",
+                'threadId': message.thread_id,
+                'labelIds': labels,
+                'snippet': _snippet(msg),
+                'historyId': str(FIRST_HISTORY_ID + index),
+                'internalDate': str(int(message.date.timestamp() * 1000)),
+                'sizeEstimate': len(message.raw),
+                'payload': _part_resource(msg, ''),
+                'raw': message.raw
+            })
+        self.messages.reverse()
+        self.by_id = {m['id']: m for m in self.messages}
+        self.history_id = FIRST_HISTORY_ID + len(self.messages) - 1
+
+    def matches(self, message, query):
+        """True when the message satisfies a search query (the is:/after:/before:/newer_than: subset)."""
+        seconds = int(message['internalDate']) // 1000
+        for term in query.split():
+            key, _, value = term.lower().partition(':')
+            if term.lower() in ('is:unread', 'is:read'):
+                if ('UNREAD' in message['labelIds']) != (value == 'unread'):
+                    return False
+            elif key in ('after', 'before'):
+                limit = int(value) if value.isdigit() else \
+                    datetime.strptime(value, '%Y/%m/%d').replace(tzinfo=timezone.utc).timestamp()
+                if (seconds <= limit) if key == 'after' else (seconds >= limit):
+                    return False
+            elif key == 'newer_than':
+                days = int(value[:-1]) * {'d': 1, 'm': 30, 'y': 365}[value[-1]]
+                if seconds <= (datetime.now(timezone.utc) - timedelta(days=days)).timestamp():
+                    return False
+            elif term.lower() != 'in:inbox':
+                raise ValueError(term)
+        return True
+
+
+class Faults:
+    """Injected latency, server errors and a token-bucket quota, shared by the server's threads."""
+
+    def __init__(self, latency=0.0, latency_sigma=0.0, error_rate=0.0, quota=None, seed=0):
+        self.latency = latency
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.quota = quota
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.tokens = float(quota or 0)
+        self.refilled = time.monotonic()
+
+    def delay(self):
+        """Seconds to hold one HTTP round trip (log-normal around the median latency)."""
+        if not self.latency:
+            return 0.0
+        with self.lock:
+            return self.latency * math.exp(self.rng.gauss(0, self.latency_sigma))
+
+    def fail(self):
+        """An injected server error for one API call, or None."""
+        with self.lock:
+            if self.rng.random() >= self.error_rate:
+                return None
+            code = self.rng.choice((500, 503))
+        return api_error(code, 'Backend Error', 'backendError') if code == 500 else \
+            api_error(code, 'The service is currently unavailable.', 'backendError')
+
+    def take(self, units):
+        """Spend quota units; False when the per-user rate is exceeded."""
+        if not self.quota:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.quota, self.tokens + (now - self.refilled) * self.quota)
+            self.refilled = now
+            if self.tokens < units:
+                return False
+            self.tokens -= units
+            return True
+
+
+class GmailStandInHandler(BaseHTTPRequestHandler):
+    """The Gmail REST subset the fetchers use, plus /__stats and /__reset for the benchmark."""
+
+    # Keep-alive, as the Google client's transport expects
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this, Nagle and delayed ACKs add ~40 ms
+    disable_nagle_algorithm = True
+
+    mailbox = None
+    faults = None
+    stats = None
+    stats_lock = None
+
+    def do_GET(self):
+        """Handle GET requests."""
+        if self.path == '/__stats':
+            with self.stats_lock:
+                return self._send_json(200, self.stats)
+        self._handle_api()
+
+    def do_POST(self):
+        """Handle POST requests (batch, and /__reset)."""
+        if self.path == '/__reset':
+            with self.stats_lock:
+                self.stats.update(requests=0, calls={}, status={}, delivered=0, latencies=[])
+            return self._send_json(200, {})
+        self._handle_api()
+
+    def _handle_api(self):
+        start = time.perf_counter()
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        time.sleep(self.faults.delay())
+
+        calls = []
+        if not self.headers.get('Authorization', '').startswith('Bearer '):
+            status, payload = api_error(401, 'Request is missing required authentication credential.',
+                                        'authError')
+            self._send_json(status, payload)
+        elif self.command == 'POST' and urlsplit(self.path).path in ('/batch/gmail/v1', '/batch'):
+            status, data, content_type, calls = self._batch(body)
+            self._send(status, data, content_type)
+        else:
+            endpoint, status, payload = self.dispatch(self.command, self.path)
+            calls.append((endpoint, status))
+            self._send_json(status, payload)
+
+        with self.stats_lock:
+            self.stats['requests'] += 1
+            self.stats['latencies'].append(time.perf_counter() - start)
+            for endpoint, call_status in calls:
+                self.stats['calls'][endpoint] = self.stats['calls'].get(endpoint, 0) + 1
+                self.stats['status'][str(call_status)] = self.stats['status'].get(str(call_status), 0) + 1
+                if endpoint == 'get' and call_status == 200:
+                    self.stats['delivered'] += 1
+
+    def dispatch(self, method, target):
+        """Run one API call; returns (endpoint, status, JSON body)."""
+        url = urlsplit(target)
+        params = {k: v if len(v) > 1 or k == 'metadataHeaders' else v[0] for k, v in parse_qs(url.query).items()}
+        for pattern, endpoint in ROUTES:
+            match = pattern.match(url.path)
+            if match and method == 'GET':
+                break
+        else:
+            return 'unknown', *api_error(404, f"Method not found: {method} {url.path}", 'notFound')
+
+        if not self.faults.take(QUOTA_UNITS[endpoint]):
+            return endpoint, *api_error(429, 'User-rate limit exceeded.', 'rateLimitExceeded')
+        failure = self.faults.fail()
+        if failure:
+            return endpoint, *failure
+        if match.group(1) not in ('me', self.mailbox.address):
+            return endpoint, *api_error(400, 'Invalid user id specified in request/Delegation denied',
+                                        'invalidArgument')
+        try:
+            return endpoint, *getattr(self, f"api_{endpoint}")(params, *match.groups()[1:])
+        except (KeyError, ValueError) as e:
+            return endpoint, *api_error(400, f"Invalid argument: {e}", 'invalidArgument')
+
+    def api_profile(self, params):
+        return 200, {'emailAddress': self.mailbox.address, 'messagesTotal': len(self.mailbox.messages),
+                     'threadsTotal': len({m['threadId'] for m in self.mailbox.messages}),
+                     'historyId': str(self.mailbox.history_id)}
+
+    def api_list(self, params):
+        labels = params.get('labelIds', [])
+        labels = [labels] if isinstance(labels, str) else labels
+        query = params.get('q', '')
+        found = [m for m in self.mailbox.messages
+                 if all(label in m['labelIds'] for label in labels) and self.mailbox.matches(m, query)]
+        offset = int(params.get('pageToken', 0))
+        size = min(int(params.get('maxResults', 100)), 500)
+        page = found[offset:offset + size]
+        result = {'messages': [{'id': m['id'], 'threadId': m['threadId']} for m in page],
+                  'resultSizeEstimate': len(found)}
+        if offset + size < len(found):
+            result['nextPageToken'] = str(offset + size)
+        if not page:
+            del result['messages']
+        return 200, result
+
+    def api_get(self, params, message_id):
+        message = self.mailbox.by_id.get(message_id)
+        if message is None:
+            return api_error(404, 'Requested entity was not found.', 'notFound')
+        fmt = params.get('format', 'full')
+        resource = {k: message[k] for k in ('id', 'threadId', 'labelIds', 'snippet', 'historyId',
+                                            'internalDate', 'sizeEstimate')}
+        if fmt == 'full':
+            resource['payload'] = message['payload']
+        elif fmt == 'metadata':
+            wanted = params.get('metadataHeaders')
+            wanted = {h.lower() for h in ([wanted] if isinstance(wanted, str) else wanted)} if wanted else None
+            payload = message['payload']
+            resource['payload'] = {'partId': '', 'mimeType': payload['mimeType'], 'filename': '',
+                                   'headers': [h for h in payload['headers']
+                                               if wanted is None or h['name'].lower() in wanted]}
+        elif fmt == 'raw':
+            resource['raw'] = _b64(message['raw'])
+        elif fmt != 'minimal':
+            raise ValueError(f"format={fmt}")
+        return 200, resource
+
+    def api_history(self, params):
+        start = int(params['startHistoryId'])
+        if start < FIRST_HISTORY_ID - 1:
+            return api_error(404, 'Requested entity was not found.', 'notFound')
+        added = [m for m in reversed(self.mailbox.messages) if int(m['historyId']) > start]
+        offset = int(params.get('pageToken', 0))
+        size = min(int(params.get('maxResults', 100)), 500)
+        records = [{'id': m['historyId'], 'messages': [{'id': m['id'], 'threadId': m['threadId']}],
+                    'messagesAdded': [{'message': {'id': m['id'], 'threadId': m['threadId'],
+                                                   'labelIds': m['labelIds']}}]}
+                   for m in added[offset:offset + size]]
+        result = {'historyId': str(self.mailbox.history_id)}
+        if records:
+            result['history'] = records
+        if offset + size < len(added):
+            result['nextPageToken'] = str(offset + size)
+        return 200, result
+
+    def _batch(self, body):
+        """multipart/mixed batch: each part is an HTTP request, answered in a part of the response."""
+        content_type = self.headers.get('Content-Type', '')
+        message = BytesParser().parsebytes(b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n' + body)
+        if not message.is_multipart():
+            status, payload = api_error(400, 'Batch request must be multipart/mixed', 'invalidArgument')
+            return status, json.dumps(payload).encode(), 'application/json; charset=UTF-8', []
+        parts = message.get_payload()
+        if len(parts) > MAX_BATCH:
+            status, payload = api_error(400, f"Too many requests in batch (max {MAX_BATCH})", 'invalidArgument')
+            return status, json.dumps(payload).encode(), 'application/json; charset=UTF-8', []
+
+        boundary = f"batch_{random.getrandbits(64):016x}"
+        out, calls = [], []
+        for part in parts:
+            request_line = part.get_payload().lstrip().split('\n', 1)[0].strip()
+            method, target = request_line.split()[:2]
+            target = urlsplit(target)._replace(scheme='', netloc='').geturl()
+            endpoint, status, payload = self.dispatch(method, target)
+            calls.append((endpoint, status))
+            content_id = part.get('Content-ID', '<>')
+            inner = json.dumps(payload)
+            out.append(f"--{boundary}\r\nContent-Type: application/http\r\n"
+                       f"Content-ID: <response-{content_id.strip('<>')}>\r\n\r\n"
+                       f"HTTP/1.1 {status} {self.responses.get(status, ('',))[0]}\r\n"
+                       f"Content-Type: application/json; charset=UTF-8\r\n"
+                       f"Content-Length: {len(inner.encode())}\r\n\r\n{inner}\r\n")
+        out.append(f"--{boundary}--\r\n")
+        return 200, ''.join(out).encode('utf-8'), f"multipart/mixed; boundary={boundary}", calls
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload).encode('utf-8'), 'application/json; charset=UTF-8')
+
+    def _send(self, status, data, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        """Stay quiet; the benchmark reports from /__stats."""
+
+
+def make_server(mailbox_params, faults, host='127.0.0.1', port=0):
+    """Threaded stand-in server for a synthetic mailbox."""
+    handler = type('Handler', (GmailStandInHandler,), {
+        'mailbox': GmailMailbox(SyntheticMailbox(**mailbox_params)),
+        'faults': faults,
+        'stats': {'requests': 0, 'calls': {}, 'status': {}, 'delivered': 0, 'latencies': []},
+        'stats_lock': threading.Lock()
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def _serve(mailbox_params, fault_params, conn):
+    server = make_server(mailbox_params, Faults(**fault_params))
+    conn.send((server.server_address[1], SyntheticMailbox(**mailbox_params).describe()))
+    server.serve_forever()
+
+
+def start_server(mailbox_params, fault_params):
+    """Start the stand-in in a child process; returns (process, port, mailbox summary)."""
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_serve, args=(mailbox_params, fault_params, child), daemon=True)
+    process.start()
+    port, summary = parent.recv()
+    return process, port, summary
+
+
+class GmailHTTPClient:
+    """Plain HTTP client over one keep-alive connection, for the request-pattern modes.
+
+    Calls answered 429 or 5xx are retried up to `retries` times with randomized
+    exponential backoff, the way googleapiclient's execute(num_retries=...) does.
+    """
+
+    def __init__(self, port, retries=NUM_RETRIES):
+        self.conn = http.client.HTTPConnection('127.0.0.1', port)
+        self.headers = {'Authorization': 'Bearer stand-in'}
+        self.retries = retries
+        self.rng = random.Random()
+
+    def backoff(self, attempt):
+        """Sleep before retry number `attempt` (1-based): random() * 2**attempt seconds."""
+        time.sleep(self.rng.random() * 2 ** attempt)
+
+    def request(self, method, path, body=None, headers=None):
+        self.conn.request(method, path, body, {**self.headers, **(headers or {})})
+        response = self.conn.getresponse()
+        return response.status, response.getheader('Content-Type', ''), response.read()
+
+    def call(self, path, **params):
+        target = f"/gmail/v1/users/me/{path}?{urlencode(params, doseq=True)}"
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.backoff(attempt)
+            status, _, data = self.request('GET', target)
+            if status not in RETRY_STATUSES:
+                break
+        if status != 200:
+            raise RuntimeError(f"HTTP {status} for {path}")
+        return json.loads(data)
+
+    def batch(self, paths):
+        """GET several API paths in one batch request; returns their JSON bodies in order.
+
+        Parts answered 429 or 5xx are sent again, in a smaller batch, after a backoff.
+        """
+        results = [None] * len(paths)
+        pending = list(range(len(paths)))
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.backoff(attempt)
+            failed = []
+            for index, head, inner in self._send_batch([(i, paths[i]) for i in pending]):
+                status = int(head.split(None, 2)[1])
+                if status == 200:
+                    results[index] = json.loads(inner)
+                elif status in RETRY_STATUSES:
+                    failed.append(index)
+                else:
+                    raise RuntimeError(head.split('\r\n', 1)[0])
+            pending = failed
+            if not pending:
+                return results
+        raise RuntimeError(f"HTTP {status} for {len(pending)} batch parts")
+
+    def _send_batch(self, items):
+        """POST one multipart batch; yields (index, status line and headers, body) per part."""
+        boundary = 'batch_benchmark'
+        body = ''.join(f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <item+{i}>\r\n\r\n"
+                       f"GET /gmail/v1/users/me/{path}\r\n\r\n" for i, path in items)
+        status, content_type, data = self.request(
+            'POST', '/batch/gmail/v1', f"{body}--{boundary}--\r\n".encode(),
+            {'Content-Type': f"multipart/mixed; boundary={boundary}"})
+        if status != 200:
+            # The whole batch failed; report it on every part so retryable statuses are retried
+            for index, _ in items:
+                yield index, f"HTTP/1.1 {status}", b''
+            return
+        message = BytesParser().parsebytes(b'Content-Type: ' + content_type.encode() + b'\r\n\r\n' + data)
+        for part in message.get_payload():
+            index = int(part.get('Content-ID', '').strip('<>').rpartition('+')[2])
+            head, _, inner = part.get_payload().partition('\r\n\r\n')
+            yield index, head, inner
+
+    def close(self):
+        self.conn.close()
+
+
+def _since():
+    return int((datetime.now() - timedelta(days=1)).timestamp())
+
+
+def run_http(port, max_emails):
+    """The fetchers' request pattern over plain HTTP: list, profile, one get per message, unread count."""
+    client = GmailHTTPClient(port)
+    try:
+        messages = client.call('messages', maxResults=max_emails, q=f"after:{_since()}").get('messages', [])
+        client.call('profile')
+        for msg in messages:
+            client.call(f"messages/{msg['id']}", format='metadata', metadataHeaders=['From', 'Subject', 'Date'])
+        client.call('messages', q='is:unread', maxResults=1)
+        return len(messages)
+    finally:
+        client.close()
+
+
+def run_http_batch(port, max_emails):
+    """The same pattern with the message gets sent as one batch request."""
+    client = GmailHTTPClient(port)
+    try:
+        messages = client.call('messages', maxResults=max_emails, q=f"after:{_since()}").get('messages', [])
+        client.call('profile')
+        fields = urlencode({'format': 'metadata', 'metadataHeaders': ['From', 'Subject', 'Date']}, doseq=True)
+        for start in range(0, len(messages), MAX_BATCH):
+            client.batch([f"messages/{m['id']}?{fields}" for m in messages[start:start + MAX_BATCH]])
+        client.call('messages', q='is:unread', maxResults=1)
+        return len(messages)
+    finally:
+        client.close()
+
+
+def run_http_history(port, max_emails):
+    """Incremental sync: history since a stored historyId, then a batch get of the added messages."""
+    client = GmailHTTPClient(port)
+    try:
+        start = int(client.call('profile')['historyId']) - max_emails
+        added = [record['messagesAdded'][0]['message']
+                 for record in client.call('history', startHistoryId=start).get('history', [])]
+        for first in range(0, len(added), MAX_BATCH):
+            client.batch([f"messages/{m['id']}?format=metadata" for m in added[first:first + MAX_BATCH]])
+        return len(added)
+    finally:
+        client.close()
+
+
+def _service(port):
+    from gmail_service import build_service, stand_in_credentials
+    return build_service(stand_in_credentials(), f"http://127.0.0.1:{port}/")
+
+
+def run_auto(port, max_emails):
+    """fetch_emails_auto.fetch_with_service: metadata gets for up to 10 messages from the last day."""
+    import fetch_emails_auto
+    return fetch_emails_auto.fetch_with_service(_service(port))['total_fetched']
+
+
+def run_simple(port, max_emails):
+    """fetch_emails_simple.fetch_with_service: the same metadata pattern."""
+    import fetch_emails_simple
+    result = fetch_emails_simple.fetch_with_service(_service(port))
+    if result is None:
+        raise RuntimeError("fetch_with_service failed")
+    return result['total_fetched']
+
+
+def _run_full(module_name, port, max_emails):
+    module = __import__(module_name)
+    result = module.fetch_recent_emails(max_emails, service=_service(port))
+    if result is None:
+        raise RuntimeError("fetch_recent_emails failed")
+    return len(result['emails'])
+
+
+def run_gmail_api(port, max_emails):
+    """fetch_emails_gmail_api.fetch_recent_emails: full-format gets of the newest INBOX messages."""
+    return _run_full('fetch_emails_gmail_api', port, max_emails)
+
+
+def run_manual_auth(port, max_emails):
+    """fetch_emails_manual_auth.fetch_recent_emails: the same full-format pattern."""
+    return _run_full('fetch_emails_manual_auth', port, max_emails)
+
+
+# Modes that drive the real fetchers need google-api-python-client
+MODES = {'http': run_http, 'http_batch': run_http_batch, 'http_history': run_http_history,
+         'auto': run_auto, 'simple': run_simple, 'gmail_api': run_gmail_api, 'manual_auth': run_manual_auth}
+CLIENT_MODES = ('auto', 'simple', 'gmail_api', 'manual_auth')
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+def _server_stats(port, path, method='GET'):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    try:
+        conn.request(method, path)
+        return json.loads(conn.getresponse().read())
+    finally:
+        conn.close()
+
+
+def benchmark(mode, port, max_emails, runs):
+    """Run one mode `runs` times; returns throughput, request counts and request latency percentiles.
+
+    A run that fails part way still counts the messages the stand-in delivered to it.
+    """
+    run = MODES[mode]
+    _server_stats(port, '/__reset', 'POST')
+    fetched = failures = 0
+    start = time.perf_counter()
+    for _ in range(runs):
+        delivered = _server_stats(port, '/__stats')['delivered']
+        try:
+            with redirect_stdout(io.StringIO()):
+                fetched += run(port, max_emails)
+        except Exception:
+            failures += 1
+            fetched += _server_stats(port, '/__stats')['delivered'] - delivered
+    seconds = time.perf_counter() - start
+    stats = _server_stats(port, '/__stats')
+
+    status = Counter({int(code): n for code, n in stats['status'].items()})
+    latencies = stats['latencies']
+    return {'mode': mode, 'messages': fetched, 'seconds': seconds,
+            'per_second': fetched / seconds if seconds else 0.0,
+            'requests': stats['requests'], 'calls': sum(status.values()),
+            'errors': sum(n for code, n in status.items() if code >= 400),
+            'throttled': status[429], 'failed_runs': failures,
+            'p50': percentile(latencies, 0.50), 'p95': percentile(latencies, 0.95),
+            'p99': percentile(latencies, 0.99)}
+
+
+def main():
+    """Benchmark the Gmail API fetchers against a local stand-in (or just serve it)."""
+    parser = argparse.ArgumentParser(description='Benchmark the Gmail API fetchers offline')
+    parser.add_argument('--count', type=int, default=500, help='messages in the mailbox')
+    parser.add_argument('--max-emails', type=int, default=50, help='messages each fetcher asks for')
+    parser.add_argument('--median-kb', type=float, default=6.0, help='median message body size')
+    parser.add_argument('--attachment-rate', type=float, default=0.1)
+    parser.add_argument('--charsets', nargs='+', default=list(DEFAULT_CHARSETS))
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='median delay added to every HTTP request')
+    parser.add_argument('--latency-sigma', type=float, default=0.0, help='log-normal spread of the delay')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of API calls answered 500/503')
+    parser.add_argument('--quota', type=float, nargs='?', const=GMAIL_USER_QUOTA,
+                        help=f"quota units per second before 429s (default when given: {GMAIL_USER_QUOTA})")
+    parser.add_argument('--runs', type=int, default=5, help='runs of each mode')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    parser.add_argument('--serve', type=int, metavar='PORT',
+                        help='only run the stand-in on this port (point MORNING_ROUTINE_GMAIL_ENDPOINT at it)')
+    args = parser.parse_args()
+
+    # A 23-hour span keeps the whole mailbox inside the fetchers' last-day window
+    params = {'count': args.count, 'seed': args.seed, 'median_kb': args.median_kb,
+              'attachment_rate': args.attachment_rate, 'charsets': args.charsets, 'span_hours': 23}
+    faults = {'latency': args.latency_ms / 1000, 'latency_sigma': args.latency_sigma,
+              'error_rate': args.error_rate, 'quota': args.quota, 'seed': args.seed}
+
+    if args.serve is not None:
+        server = make_server(params, Faults(**faults), port=args.serve)
+        print(f"✓ Gmail stand-in at http://127.0.0.1:{server.server_address[1]}/")
+        print(f"  export MORNING_ROUTINE_GMAIL_ENDPOINT=http://127.0.0.1:{server.server_address[1]}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return 0
+
+    modes = args.modes
+    if not client_library_available():
+        skipped = [m for m in modes if m in CLIENT_MODES]
+        modes = [m for m in modes if m not in CLIENT_MODES]
+        if skipped:
+            print(f"⚠️  google-api-python-client not installed, skipping: {', '.join(skipped)}")
+
+    process, port, summary = start_server(params, faults)
+    print(f"📬 Synthetic mailbox: {summary}")
+    print(f"   Gmail stand-in on 127.0.0.1:{port}, {args.latency_ms:g} ms latency "
+          f"(sigma {args.latency_sigma:g}), {args.error_rate:.0%} errors, "
+          f"quota {f'{args.quota:g} units/s' if args.quota else 'off'}\n")
+
+    try:
+        print(f"{'mode':<13} {'msgs':>5} {'msg/s':>8} {'requests':>9} {'calls':>6} {'errors':>7} "
+              f"{'429s':>5} {'failed':>7} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7}")
+        for mode in modes:
+            r = benchmark(mode, port, args.max_emails, args.runs)
+            print(f"{r['mode']:<13} {r['messages']:>5} {r['per_second']:>8.1f} {r['requests']:>9} "
+                  f"{r['calls']:>6} {r['errors']:>7} {r['throttled']:>5} {r['failed_runs']:>7} "
+                  f"{r['p50'] * 1000:>7.1f} {r['p95'] * 1000:>7.1f} {r['p99'] * 1000:>7.1f}")
+    finally:
+        process.terminate()
+        process.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
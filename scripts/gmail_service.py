@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Gmail Service
+Builds the Gmail API client shared by the API fetchers. Setting
+MORNING_ROUTINE_GMAIL_ENDPOINT sends its requests to another server, such as
+the local stand-in in gmail_benchmark.py, instead of gmail.googleapis.com.
+
+The fetchers pass NUM_RETRIES to every execute(), so 429 and 5xx answers are
+retried with exponential backoff; MORNING_ROUTINE_GMAIL_RETRIES changes it.
+"""
+
+import os
+
+NUM_RETRIES = int(os.getenv('MORNING_ROUTINE_GMAIL_RETRIES', '3'))
+
+
+def gmail_endpoint():
+    """Root URL override from MORNING_ROUTINE_GMAIL_ENDPOINT, or None for the real API."""
+    return os.getenv('MORNING_ROUTINE_GMAIL_ENDPOINT') or None
+
+
+def client_library_available():
+    """True when google-api-python-client and google-auth are importable."""
+    try:
+        import googleapiclient.discovery
+        import google.oauth2.credentials
+    except ImportError:
+        return False
+    return True
+
+
+def build_service(credentials, endpoint=None):
+    """Gmail v1 service for the credentials (needs google-api-python-client)."""
+    from googleapiclient.discovery import build
+
+    endpoint = endpoint or gmail_endpoint()
+    options = {'api_endpoint': endpoint} if endpoint else None
+    return build('gmail', 'v1', credentials=credentials, client_options=options)
+
+
+def stand_in_credentials(token='stand-in'):
+    """Bearer-token credentials for a local stand-in; they never expire or refresh."""
+    from google.oauth2.credentials import Credentials
+
+    return Credentials(token=token)
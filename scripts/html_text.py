@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+HTML to Text Extractor
+Streams HTML through html.parser, skipping script/style blocks, decoding entities
+and stopping as soon as the character budget is reached. Block elements, <br>,
+blank lines and <pre> text keep their line breaks.
+"""
+
+import re
+import sys
+from html.parser import HTMLParser
+
+# Content of these elements is never visible text. <head> itself is not skipped:
+# its end tag may be omitted, and everything visible would be lost with it.
+SKIP_TAGS = {'script', 'style', 'title', 'noscript', 'template', 'svg'}
+
+# Elements that start a new line of text
+BLOCK_TAGS = {
+    'p', 'div', 'br', 'li', 'ul', 'ol', 'tr', 'table', 'section', 'article',
+    'header', 'footer', 'blockquote', 'pre', 'hr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'dl', 'dt', 'dd', 'main', 'nav', 'aside', 'figure', 'figcaption', 'caption', 'address', 'body'
+}
+
+# Tags that mark a text as HTML; a bare '<' (quoted addresses, "a < b") does not
+_MARKUP = re.compile(
+    r'<(?:!doctype\s+html|html|head|body|p|div|br|span|a|table|tr|td|ul|ol|li|b|i|strong|em|font|img|'
+    r'h[1-6]|blockquote|pre|style|meta)\b[^<>]*>|</(?:html|body|p|div|span|a|table|td|li|b|i|strong|em|font)>',
+    re.IGNORECASE)
+
+CHUNK_SIZE = 4096
+
+_WHITESPACE = re.compile(r'\s+')
+# A blank line inside text data separates paragraphs
+_PARAGRAPH_BREAK = re.compile(r'[ \t\r\f\v]*\n[ \t\r\f\v]*\n\s*')
+
+
+def looks_like_html(text):
+    """True when text contains real HTML markup, not just a '<' character."""
+    return bool(text) and _MARKUP.search(text) is not None
+
+
+class _BudgetReached(Exception):
+    """Internal signal to stop parsing once enough text has been collected."""
+
+
+class HTMLTextExtractor(HTMLParser):
+    """Incremental HTML tokenizer that collects visible text up to a budget."""
+
+    def __init__(self, budget=None):
+        super().__init__(convert_charrefs=True)
+        self.budget = budget
+        self.parts = []
+        self.length = 0
+        self.skip_depth = 0
+        self.pre_depth = 0
+        self.at_line_start = True
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._newline()
+            if tag == 'pre':
+                self.pre_depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self._newline()
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self._newline()
+            if tag == 'pre':
+                self.pre_depth = max(0, self.pre_depth - 1)
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        if self.pre_depth:
+            lines = data.split('\n')
+        else:
+            lines = _PARAGRAPH_BREAK.split(data)
+        for i, line in enumerate(lines):
+            if i:
+                self._newline()
+            self._inline(line)
+
+    def _inline(self, data):
+        """Emit text with whitespace runs collapsed to single spaces."""
+        text = _WHITESPACE.sub(' ', data)
+        if self.at_line_start:
+            text = text.lstrip()
+        if text:
+            self._emit(text)
+            self.at_line_start = text.endswith(' ')
+
+    def _newline(self):
+        """Start a new line unless already at the start of one."""
+        if self.parts and not self.at_line_start:
+            if self.parts[-1].endswith(' '):
+                self.parts[-1] = self.parts[-1].rstrip(' ')
+                self.length -= 1
+            self._emit('\n')
+        self.at_line_start = True
+
+    def _emit(self, text):
+        """Append text, raising _BudgetReached once the budget is used up."""
+        if self.budget is not None and self.length + len(text) >= self.budget:
+            text = text[:self.budget - self.length]
+            self.parts.append(text)
+            self.length += len(text)
+            raise _BudgetReached()
+        self.parts.append(text)
+        self.length += len(text)
+
+    def text(self):
+        """Return the collected text."""
+        return ''.join(self.parts).strip()
+
+
+def html_to_text(html, budget=None, chunk_size=CHUNK_SIZE):
+    """Convert HTML to plain text, reading no further than needed for `budget` characters."""
+    if not html:
+        return ''
+
+    parser = HTMLTextExtractor(budget)
+    try:
+        for start in range(0, len(html), chunk_size):
+            parser.feed(html[start:start + chunk_size])
+        parser.close()
+    except _BudgetReached:
+        pass
+    return parser.text()
+
+
+def decode_bytes(payload, charset=None):
+    """Decode body bytes with a declared charset (lenient fallback to utf-8)."""
+    try:
+        return payload.decode(charset or 'utf-8', errors='ignore')
+    except LookupError:
+        return payload.decode('utf-8', errors='ignore')
+
+
+def decode_payload(part):
+    """Decode a MIME part's payload using its declared charset (lenient fallback to utf-8)."""
+    payload = part.get_payload(decode=True)
+    if not payload:
+        return ''
+    return decode_bytes(payload, part.get_content_charset())
+
+
+def text_part(msg):
+    """Return a message's first non-empty text/plain part, else its first text/html part."""
+    html_part = None
+    for part in msg.walk():
+        if part.is_multipart():
+            continue
+        content_type = part.get_content_type()
+        if content_type == 'text/plain':
+            if part.get_payload(decode=True):
+                return part
+        elif content_type == 'text/html' and html_part is None:
+            html_part = part
+    return html_part
+
+
+def message_text(msg, budget=None):
+    """Return a message's text/plain body, or its text/html body converted to text."""
+    part = text_part(msg)
+    if part is None:
+        return ''
+    text = decode_payload(part)
+    if part.get_content_subtype() == 'html':
+        return html_to_text(text, budget)
+    return text[:budget] if budget else text
+
+
+def main():
+    """Convert an HTML file (or stdin) to text."""
+    source = open(sys.argv[1], encoding='utf-8', errors='ignore') if len(sys.argv) > 1 else sys.stdin
+    budget = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    with source:
+        print(html_to_text(source.read(), budget))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
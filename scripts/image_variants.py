@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Image Variants
+Post-processes a rendered dashboard PNG into smaller downloads: WebP (and AVIF
+where Pillow supports it) at several widths for phones, tablets and desktops.
+The source is decoded once and every variant is encoded from that single
+in-memory image, so extra sizes never mean rendering the dashboard again.
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = features = None
+
+# Desktop, tablet and phone widths; never larger than the source
+DEFAULT_WIDTHS = (1920, 1280, 750)
+IMAGE_FORMATS = ('webp', 'avif')
+DEFAULT_FORMATS = ('webp',)
+
+# Encoder settings per format
+SAVE_OPTIONS = {
+    'webp': {'quality': 82, 'method': 4},
+    'avif': {'quality': 60, 'speed': 6},
+}
+
+
+def _env_list(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return tuple(default)
+    return tuple(part.strip().lower() for part in value.split(',') if part.strip() and part.strip() != 'none')
+
+
+def variant_widths(widths=None):
+    """Target widths (argument, then MORNING_ROUTINE_IMAGE_WIDTHS, then the defaults)."""
+    widths = widths if widths is not None else _env_list('MORNING_ROUTINE_IMAGE_WIDTHS', DEFAULT_WIDTHS)
+    return sorted({int(w) for w in widths}, reverse=True)
+
+
+def variant_formats(formats=None):
+    """Output formats (argument, then MORNING_ROUTINE_IMAGE_FORMATS, then WebP only)."""
+    formats = formats if formats is not None else _env_list('MORNING_ROUTINE_IMAGE_FORMATS', DEFAULT_FORMATS)
+    for fmt in formats:
+        if fmt not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format '{fmt}' (expected one of: {', '.join(IMAGE_FORMATS)})")
+    return tuple(formats)
+
+
+def supported(fmt):
+    """True when the installed Pillow can encode the format."""
+    return Image is not None and features.check(fmt)
+
+
+def write_variants(source_path, widths=None, formats=None):
+    """Write every width x format variant of an image next to it.
+
+    Returns a list of {'path', 'format', 'width', 'bytes'} dicts, largest width first.
+    Widths above the source width collapse to the source width; formats this Pillow
+    build cannot encode are skipped.
+    """
+    if Image is None:
+        raise RuntimeError("Pillow is not installed (pip install pillow)")
+
+    source_path = Path(source_path)
+    formats = [fmt for fmt in variant_formats(formats) if supported(fmt)]
+    if not formats:
+        return []
+
+    with Image.open(source_path) as decoded:
+        source = decoded.convert('RGB')
+
+    variants = []
+    stem = source_path.with_suffix('')
+    for width in sorted({min(w, source.width) for w in variant_widths(widths)}, reverse=True):
+        if width == source.width:
+            image = source
+        else:
+            height = round(source.height * width / source.width)
+            image = source.resize((width, height), Image.LANCZOS, reducing_gap=2.0)
+        for fmt in formats:
+            path = Path(f"{stem}-{width}w.{fmt}")
+            image.save(path, fmt.upper(), **SAVE_OPTIONS[fmt])
+            variants.append({'path': str(path), 'format': fmt, 'width': width,
+                             'bytes': path.stat().st_size})
+    return variants
+
+
+def savings_report(source_path, variants):
+    """Lines comparing each variant's size with the source file."""
+    source_bytes = os.path.getsize(source_path)
+    lines = [f"  {'source':<6} {'':>6} {source_bytes / 1024:>8.1f} KB  {Path(source_path).name}"]
+    for variant in variants:
+        saved = 1 - variant['bytes'] / source_bytes
+        lines.append(f"  {variant['format']:<6} {variant['width']:>5}w {variant['bytes'] / 1024:>8.1f} KB  "
+                     f"{saved:>6.1%} smaller  {Path(variant['path']).name}")
+    return lines
+
+
+def process_image(image_path):
+    """Write the configured variants of a rendered image and print the savings.
+
+    Returns the variant paths, or None when there is no image, Pillow is missing
+    or every format is switched off.
+    """
+    if not image_path or Image is None or not variant_formats():
+        return None
+    print("🗜️  Writing compressed image variants...")
+    try:
+        variants = write_variants(image_path)
+    except OSError as e:
+        print(f"✗ Error writing image variants: {e}")
+        return None
+    print('\n'.join(savings_report(image_path, variants)))
+    return [variant['path'] for variant in variants] or None
+
+
+def main():
+    """Write the variants of an image and report the byte savings."""
+    parser = argparse.ArgumentParser(description='Write compressed multi-size variants of an image')
+    parser.add_argument('image', help='Source image (e.g. outputs/morning-briefing-YYYYMMDD.png)')
+    parser.add_argument('--widths', type=int, nargs='+', help=f'default: {DEFAULT_WIDTHS}')
+    parser.add_argument('--formats', nargs='+', choices=IMAGE_FORMATS, help='default: webp')
+    args = parser.parse_args()
+
+    if Image is None:
+        print("✗ Pillow is not installed (pip install pillow)")
+        return 1
+
+    start = time.perf_counter()
+    variants = write_variants(args.image, args.widths, args.formats)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"✓ {len(variants)} variants in {elapsed:.0f} ms (one decode)")
+    print('\n'.join(savings_report(args.image, variants)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+IMAP Benchmark
+Measures the IMAP fetchers offline. A local IMAP4rev1 stand-in, running in
+its own process, serves a synthetic mailbox with optional per-round-trip
+latency. Each fetcher mode runs against it, and the benchmark reports
+messages/sec, bytes transferred, round trips and the fetcher's peak memory.
+"""
+
+import io
+import re
+import sys
+import time
+import argparse
+import tracemalloc
+import multiprocessing
+import socketserver
+from contextlib import redirect_stdout
+from datetime import datetime
+
+from synthetic_mailbox import DEFAULT_CHARSETS, SyntheticMailbox
+
+_SEARCH_TOKEN = re.compile(rb'\(|\)|"[^"]*"|[^\s()]+')
+_FETCH_ITEM = re.compile(rb'BODY(?:\.PEEK)?\[[^\]]*\]|[A-Z0-9.]+')
+
+
+class ServerStats:
+    """Counters shared between the stand-in server process and the benchmark."""
+
+    FIELDS = ('bytes_in', 'bytes_out', 'round_trips', 'connections')
+
+    def __init__(self):
+        for field in self.FIELDS:
+            setattr(self, field, multiprocessing.Value('q', 0))
+
+    def add(self, field, amount=1):
+        counter = getattr(self, field)
+        with counter.get_lock():
+            counter.value += amount
+
+    def snapshot(self):
+        return {field: getattr(self, field).value for field in self.FIELDS}
+
+    def reset(self):
+        for field in self.FIELDS:
+            getattr(self, field).value = 0
+
+
+def _sequence(spec, count):
+    """Message numbers of an IMAP sequence set such as 1:5,7,9:*."""
+    numbers = []
+    for part in spec.split(b','):
+        first, _, last = part.partition(b':')
+        start = count if first == b'*' else int(first)
+        end = start if not last else (count if last == b'*' else int(last))
+        numbers.extend(range(min(start, end), max(start, end) + 1))
+    return [n for n in numbers if 1 <= n <= count]
+
+
+class IMAPStandInHandler(socketserver.StreamRequestHandler):
+    """The IMAP subset the fetchers use: LOGIN, SELECT, SEARCH, FETCH, CLOSE, LOGOUT."""
+
+    mailbox = None
+    messages = ()
+    latency = 0.0
+    stats = None
+
+    def _write(self, data):
+        self.stats.add('bytes_out', len(data))
+        self.wfile.write(data)
+
+    def handle(self):
+        self.stats.add('connections')
+        self._write(b'* OK [CAPABILITY IMAP4rev1] Synthetic IMAP ready\r\n')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            self.stats.add('bytes_in', len(line))
+            self.stats.add('round_trips')
+            tag, _, rest = line.rstrip(b'\r\n').partition(b' ')
+            command, _, args = rest.partition(b' ')
+            if self.latency:
+                time.sleep(self.latency)
+
+            handler = getattr(self, f"cmd_{command.decode('ascii', 'replace').lower()}", None)
+            if handler is None:
+                self._write(tag + b' BAD unsupported command\r\n')
+                continue
+            untagged, status = handler(args)
+            self._write(untagged + tag + b' ' + status + b'\r\n')
+            if command.upper() == b'LOGOUT':
+                return
+
+    def cmd_capability(self, args):
+        return b'* CAPABILITY IMAP4rev1\r\n', b'OK CAPABILITY completed'
+
+    def cmd_noop(self, args):
+        return b'', b'OK NOOP completed'
+
+    def cmd_login(self, args):
+        return b'', b'OK LOGIN completed'
+
+    def cmd_select(self, args):
+        untagged = (f"* {len(self.messages)} EXISTS\r\n* 0 RECENT\r\n"
+                    "* FLAGS (\\Seen \\Answered \\Flagged \\Deleted \\Draft)\r\n").encode()
+        return untagged, b'OK [READ-WRITE] SELECT completed'
+
+    cmd_examine = cmd_select
+
+    def cmd_search(self, args):
+        tokens = [t for t in _SEARCH_TOKEN.findall(args.upper()) if t not in (b'(', b')')]
+        if tokens[:1] == [b'CHARSET']:
+            tokens = tokens[2:]
+        matches = list(range(1, len(self.messages) + 1))
+        while tokens:
+            key = tokens.pop(0)
+            if key == b'UNSEEN':
+                matches = [n for n in matches if self.mailbox.messages[n - 1].unread]
+            elif key == b'SEEN':
+                matches = [n for n in matches if not self.mailbox.messages[n - 1].unread]
+            elif key == b'SINCE' and tokens:
+                since = datetime.strptime(tokens.pop(0).strip(b'"').decode().title(), '%d-%b-%Y').date()
+                matches = [n for n in matches if self.mailbox.messages[n - 1].date.date() >= since]
+            elif key != b'ALL':
+                return b'', b'BAD unsupported search key'
+        return b'* SEARCH ' + b' '.join(str(n).encode() for n in matches) + b'\r\n', b'OK SEARCH completed'
+
+    def cmd_fetch(self, args):
+        spec, _, items = args.partition(b' ')
+        items = _FETCH_ITEM.findall(items.upper())
+        out = []
+        for number in _sequence(spec, len(self.messages)):
+            raw = self.messages[number - 1]
+            parts = []
+            for item in items:
+                if item == b'FLAGS':
+                    seen = b'' if self.mailbox.messages[number - 1].unread else b'\\Seen'
+                    parts.append(b'FLAGS (' + seen + b')')
+                elif item == b'RFC822.SIZE':
+                    parts.append(b'RFC822.SIZE %d' % len(raw))
+                elif item in (b'RFC822', b'BODY[]', b'BODY.PEEK[]'):
+                    name = b'RFC822' if item == b'RFC822' else b'BODY[]'
+                    parts.append(name + b' {%d}\r\n' % len(raw) + raw)
+                elif item in (b'RFC822.HEADER', b'BODY.PEEK[HEADER]', b'BODY[HEADER]'):
+                    header = raw[:raw.find(b'\r\n\r\n') + 4]
+                    name = b'RFC822.HEADER' if item == b'RFC822.HEADER' else b'BODY[HEADER]'
+                    parts.append(name + b' {%d}\r\n' % len(header) + header)
+            out.append(b'* %d FETCH (' % number + b' '.join(parts) + b')\r\n')
+        return b''.join(out), b'OK FETCH completed'
+
+    def cmd_close(self, args):
+        return b'', b'OK CLOSE completed'
+
+    def cmd_logout(self, args):
+        return b'* BYE logging out\r\n', b'OK LOGOUT completed'
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def _serve(mailbox_params, latency, stats, conn):
+    mailbox = SyntheticMailbox(**mailbox_params)
+    handler = type('Handler', (IMAPStandInHandler,), {
+        'mailbox': mailbox,
+        # IMAP literals are CRLF-terminated
+        'messages': [m.raw.replace(b'\r\n', b'\n').replace(b'\n', b'\r\n') for m in mailbox.messages],
+        'latency': latency,
+        'stats': stats
+    })
+    server = _Server(('127.0.0.1', 0), handler)
+    conn.send((server.server_address[1], mailbox.describe()))
+    server.serve_forever()
+
+
+def start_server(mailbox_params, latency=0.0):
+    """Start the stand-in in a child process; returns (process, port, stats, mailbox summary)."""
+    stats = ServerStats()
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_serve, args=(mailbox_params, latency, stats, child), daemon=True)
+    process.start()
+    port, summary = parent.recv()
+    return process, port, stats, summary
+
+
+def run_basic(port, max_emails, hours):
+    """fetch_emails: SEARCH SINCE, then RFC822 and FLAGS per message."""
+    import fetch_emails
+    mail = fetch_emails.connect_to_imap('me@example.com', 'secret', '127.0.0.1', port, use_ssl=False)
+    emails = fetch_emails.fetch_recent_emails(mail, hours=hours, max_emails=max_emails)
+    mail.logout()
+    for e in emails:
+        e['body']  # decode the lazy bodies so both modes do the same work
+    return len(emails)
+
+
+def run_optimized(port, max_emails, hours):
+    """fetch_emails_optimized: UNSEEN/ALL searches, RFC822 per message, threads and classification."""
+    import fetch_emails_optimized
+    result = fetch_emails_optimized.connect_and_fetch('me@example.com', 'secret', max_emails,
+                                                      host='127.0.0.1', port=port, use_ssl=False)
+    if result is None:
+        raise RuntimeError("connect_and_fetch failed")
+    # Per-message fetch errors are skipped inside connect_and_fetch, so count what it parsed
+    return result['fetched_count']
+
+
+MODES = {'basic': run_basic, 'optimized': run_optimized}
+
+
+def benchmark(mode, port, stats, max_emails, hours):
+    """Run one mode twice (timed, then traced for memory); returns its metrics."""
+    run = MODES[mode]
+    stats.reset()
+    with redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        fetched = run(port, max_emails, hours)
+        seconds = time.perf_counter() - start
+    traffic = stats.snapshot()
+
+    tracemalloc.start()
+    with redirect_stdout(io.StringIO()):
+        run(port, max_emails, hours)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {'mode': mode, 'messages': fetched, 'seconds': seconds,
+            'per_second': fetched / seconds if seconds else 0.0,
+            'bytes': traffic['bytes_in'] + traffic['bytes_out'],
+            'round_trips': traffic['round_trips'], 'peak_bytes': peak}
+
+
+def main():
+    """Benchmark the IMAP fetchers against a synthetic mailbox."""
+    parser = argparse.ArgumentParser(description='Benchmark the IMAP fetchers offline')
+    parser.add_argument('--count', type=int, default=500, help='messages in the mailbox')
+    parser.add_argument('--max-emails', type=int, default=50, help='messages each fetcher asks for')
+    parser.add_argument('--median-kb', type=float, default=6.0, help='median message body size')
+    parser.add_argument('--size-sigma', type=float, default=1.0, help='log-normal spread of sizes')
+    parser.add_argument('--attachment-rate', type=float, default=0.1)
+    parser.add_argument('--attachment-kb', type=float, default=150)
+    parser.add_argument('--charsets', nargs='+', default=list(DEFAULT_CHARSETS))
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='delay added to every round trip')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--modes', nargs='+', choices=sorted(MODES), default=sorted(MODES))
+    args = parser.parse_args()
+
+    span_hours = 72
+    params = {'count': args.count, 'seed': args.seed, 'median_kb': args.median_kb,
+              'size_sigma': args.size_sigma, 'attachment_rate': args.attachment_rate,
+              'attachment_kb': args.attachment_kb, 'charsets': args.charsets, 'span_hours': span_hours}
+    process, port, stats, summary = start_server(params, args.latency_ms / 1000)
+    print(f"📬 Synthetic mailbox: {summary}")
+    print(f"   IMAP stand-in on 127.0.0.1:{port}, {args.latency_ms:g} ms per round trip\n")
+
+    try:
+        print(f"{'mode':<10} {'msgs':>5} {'seconds':>8} {'msg/s':>8} {'KB moved':>10} "
+              f"{'round trips':>12} {'peak MB':>8}")
+        for mode in args.modes:
+            r = benchmark(mode, port, stats, args.max_emails, span_hours + 48)
+            print(f"{r['mode']:<10} {r['messages']:>5} {r['seconds']:>8.2f} {r['per_second']:>8.1f} "
+                  f"{r['bytes'] / 1024:>10.1f} {r['round_trips']:>12} {r['peak_bytes'] / 1e6:>8.1f}")
+    finally:
+        process.terminate()
+        process.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Page Assets
+The briefing webpage's stylesheet and script, either inlined into the page
+(single self-contained file) or written once next to the pages under
+content-hashed names (briefing.<hash>.css) that browsers can cache indefinitely.
+"""
+
+import os
+import sys
+import hashlib
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+ASSETS_DIR = Path(__file__).parent.parent / "assets"
+
+# Template slot -> asset source file
+PAGE_ASSETS = {'styles': 'briefing.css', 'script': 'briefing.js'}
+
+ASSET_MODES = ('external', 'inline')
+DEFAULT_ASSET_MODE = 'external'
+
+HASH_LENGTH = 10
+
+
+@lru_cache(maxsize=None)
+def asset_content(name):
+    """Source text of an asset (read once per process)."""
+    return (ASSETS_DIR / name).read_text(encoding='utf-8')
+
+
+@lru_cache(maxsize=None)
+def hashed_name(name):
+    """Content-addressed file name, e.g. briefing.3f2a1c9d0b.css."""
+    digest = hashlib.sha256(asset_content(name).encode('utf-8')).hexdigest()[:HASH_LENGTH]
+    stem, suffix = os.path.splitext(name)
+    return f"{stem}.{digest}{suffix}"
+
+
+def write_asset(name, output_dir):
+    """Write an asset under its hashed name unless it is already there; return the file name."""
+    filename = hashed_name(name)
+    path = Path(output_dir) / filename
+    if not path.exists():
+        # Write-then-rename so a concurrent run never serves a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=output_dir, prefix=f".{filename}.")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(asset_content(name))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    return filename
+
+
+def asset_mode(mode=None):
+    """Resolve the asset mode (argument, then MORNING_ROUTINE_ASSETS, then the default)."""
+    mode = mode or os.getenv('MORNING_ROUTINE_ASSETS') or DEFAULT_ASSET_MODE
+    if mode not in ASSET_MODES:
+        raise ValueError(f"Unknown asset mode '{mode}' (expected one of: {', '.join(ASSET_MODES)})")
+    return mode
+
+
+def asset_tags(mode='inline', output_dir=None):
+    """Markup for the page's asset slots: inline <style>/<script>, or references to hashed files."""
+    if asset_mode(mode) == 'inline':
+        return {
+            'styles': f"<style>\n{asset_content(PAGE_ASSETS['styles'])}</style>",
+            'script': f"<script>\n{asset_content(PAGE_ASSETS['script'])}</script>"
+        }
+
+    os.makedirs(output_dir, exist_ok=True)
+    return {
+        'styles': f'<link rel="stylesheet" href="{write_asset(PAGE_ASSETS["styles"], output_dir)}">',
+        'script': f'<script src="{write_asset(PAGE_ASSETS["script"], output_dir)}"></script>'
+    }
+
+
+def main():
+    """Write the hashed assets into a directory (default: MORNING_ROUTINE_OUTPUT_DIR)."""
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else os.getenv('MORNING_ROUTINE_OUTPUT_DIR', './outputs')
+    os.makedirs(output_dir, exist_ok=True)
+    for name in PAGE_ASSETS.values():
+        print(os.path.join(output_dir, write_asset(name, output_dir)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Precompression
+Writes gzip (and, with the optional `brotli` package, Brotli) variants next to
+text artifacts in the outputs directory (page.html -> page.html.gz,
+page.html.br), so a static server can send them without compressing per
+request. Variants are rewritten only when their source is newer.
+"""
+
+import os
+import sys
+import gzip
+import time
+import argparse
+import tempfile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Text artifacts worth compressing (images are already compressed)
+COMPRESSIBLE = ('.html', '.css', '.js', '.json', '.jsonl', '.md', '.txt', '.svg')
+
+# Encoding -> file suffix
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+
+def _gzip(data):
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data):
+    return brotli.compress(data, quality=11)
+
+
+COMPRESSORS = {'br': _brotli, 'gzip': _gzip}
+
+
+def supported(encoding):
+    """True when the encoding can be written here (Brotli needs `pip install brotli`)."""
+    return encoding == 'gzip' or (encoding == 'br' and brotli is not None)
+
+
+def precompress_encodings(encodings=None):
+    """Encodings to write (argument, then MORNING_ROUTINE_PRECOMPRESS, then none).
+
+    MORNING_ROUTINE_PRECOMPRESS is a comma-separated list such as 'gzip,br'.
+    Encodings this installation cannot write are dropped.
+    """
+    if encodings is None:
+        value = os.getenv('MORNING_ROUTINE_PRECOMPRESS', '')
+        encodings = [e.strip() for e in value.split(',') if e.strip() and e.strip() != 'none']
+    unknown = [e for e in encodings if e not in ENCODINGS]
+    if unknown:
+        raise ValueError(f"Unknown encoding(s) {', '.join(unknown)} (expected: {', '.join(ENCODINGS)})")
+    return tuple(e for e in encodings if supported(e))
+
+
+def precompress_file(path, encodings, source_mtime=None):
+    """Write the stale variants of one file; returns the variant paths written."""
+    if source_mtime is None:
+        source_mtime = os.stat(path).st_mtime_ns
+    data = None
+    written = []
+    for encoding in encodings:
+        target = path + ENCODINGS[encoding]
+        try:
+            if os.stat(target).st_mtime_ns >= source_mtime:
+                continue
+        except FileNotFoundError:
+            pass
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        directory, name = os.path.split(target)
+        fd, tmp_path = tempfile.mkstemp(dir=directory or '.', prefix=f".{name}.")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(COMPRESSORS[encoding](data))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, target)
+        written.append(target)
+    return written
+
+
+def precompress_dir(output_dir, encodings=None):
+    """Bring every compressible file's variants in a directory up to date; returns the paths written."""
+    encodings = precompress_encodings(encodings)
+    if not encodings:
+        return []
+    written = []
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            if entry.name.startswith('.') or not entry.name.endswith(COMPRESSIBLE) or not entry.is_file():
+                continue
+            written += precompress_file(entry.path, encodings, entry.stat().st_mtime_ns)
+    return written
+
+
+def precompress_outputs(output_dir):
+    """Render-time hook: precompress the outputs directory when MORNING_ROUTINE_PRECOMPRESS asks for it."""
+    try:
+        written = precompress_dir(output_dir)
+    except OSError as e:
+        print(f"✗ Error precompressing outputs: {e}")
+        return None
+    if written:
+        print(f"🗜️  Precompressed {len(written)} files ({', '.join(precompress_encodings())})")
+    return written or None
+
+
+def main():
+    """Precompress an outputs directory and report the savings."""
+    parser = argparse.ArgumentParser(description='Write gzip/brotli variants of text outputs')
+    parser.add_argument('output_dir', nargs='?', default=os.getenv('MORNING_ROUTINE_OUTPUT_DIR', './outputs'))
+    parser.add_argument('--encodings', nargs='+', choices=sorted(ENCODINGS), default=['gzip', 'br'])
+    args = parser.parse_args()
+
+    if 'br' in args.encodings and brotli is None:
+        print("⚠️  brotli not installed (pip install brotli), writing gzip only")
+
+    start = time.perf_counter()
+    written = precompress_dir(args.output_dir, args.encodings)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    original = compressed = 0
+    for path in written:
+        compressed += os.path.getsize(path)
+        original += os.path.getsize(os.path.splitext(path)[0])
+    print(f"✓ {len(written)} variants written in {elapsed:.0f} ms")
+    if written:
+        print(f"  {original / 1024:.1f} KB -> {compressed / 1024:.1f} KB "
+              f"({1 - compressed / original:.1%} smaller)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
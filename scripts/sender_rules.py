@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Sender Rule Index
+Classifies automated senders with hash lookups on the full address, local part
+and domain (including parent domains), loaded once from assets/sender_rules.json.
+"""
+
+import os
+import sys
+import json
+from functools import lru_cache
+from pathlib import Path
+
+from mail_headers import parse_address
+
+DEFAULT_RULES_PATH = Path(__file__).parent.parent / "assets" / "sender_rules.json"
+
+
+class SenderRuleIndex:
+    """Set-based index of automated-sender rules."""
+
+    def __init__(self, addresses=(), local_parts=(), domains=()):
+        self.addresses = {a.strip().lower() for a in addresses}
+        self.local_parts = {p.strip().lower() for p in local_parts}
+        self.domains = {d.strip().lower().lstrip('.') for d in domains}
+
+    @classmethod
+    def load(cls, path):
+        """Load rules from a JSON config file."""
+        with open(path, 'r', encoding='utf-8') as f:
+            rules = json.load(f)
+        return cls(rules.get('addresses', []), rules.get('local_parts', []), rules.get('domains', []))
+
+    def __len__(self):
+        return len(self.addresses) + len(self.local_parts) + len(self.domains)
+
+    def match(self, from_header):
+        """Return the rule matching a From header (e.g. 'local:noreply'), or None."""
+        _, address = parse_address(from_header)
+        if '@' not in address:
+            return None
+
+        if address in self.addresses:
+            return f"address:{address}"
+
+        local, _, domain = address.rpartition('@')
+        if local in self.local_parts:
+            return f"local:{local}"
+
+        # Suffix match: mail.github.com checks mail.github.com, github.com, com
+        labels = domain.split('.')
+        for i in range(len(labels)):
+            suffix = '.'.join(labels[i:])
+            if suffix in self.domains:
+                return f"domain:{suffix}"
+
+        return None
+
+
+_default_index = None
+
+
+def default_index():
+    """The shared rule index, loaded once per process."""
+    global _default_index
+    if _default_index is None:
+        path = os.getenv('MORNING_ROUTINE_SENDER_RULES') or DEFAULT_RULES_PATH
+        _default_index = SenderRuleIndex.load(path) if Path(path).exists() else SenderRuleIndex()
+    return _default_index
+
+
+@lru_cache(maxsize=4096)
+def is_automated_sender(from_header):
+    """Return True if the sender matches an automated-notification rule."""
+    return default_index().match(from_header) is not None
+
+
+def main():
+    """Classify From headers given as arguments (or one per line on stdin)."""
+    headers = sys.argv[1:] or [line.strip() for line in sys.stdin if line.strip()]
+    index = default_index()
+    print(f"Loaded {len(index)} sender rules")
+    for header in headers:
+        print(f"{index.match(header) or '-':<40} {header}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
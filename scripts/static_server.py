@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Static Outputs Server
+Serves the outputs directory (briefing pages, images, history) over local
+HTTP. Precompressed .br/.gz variants are sent when the client accepts them,
+every response carries an ETag and Last-Modified, and conditional requests
+are answered with 304 Not Modified. Content-hashed assets are cached for a year.
+"""
+
+import os
+import re
+import sys
+import shutil
+import argparse
+import mimetypes
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, unquote
+
+from briefing_history import INDEX_PAGE
+from precompress import COMPRESSIBLE, ENCODINGS, precompress_dir
+
+COPY_BUFFER_SIZE = 1 << 16
+
+# briefing.<10 hex digits>.css/js never change under the same name
+HASHED_ASSET = re.compile(r'\.[0-9a-f]{10}\.(?:css|js)$')
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+# Everything else may be rewritten (today's page, history), so revalidate each time
+REVALIDATE_CACHE = 'no-cache'
+
+TEXT_TYPES = ('text/', 'application/json', 'application/javascript')
+
+
+def content_type(path):
+    """MIME type of a file, with charset for text."""
+    mime = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    if mime == 'application/octet-stream' and path.endswith('.jsonl'):
+        mime = 'application/json'
+    return f"{mime}; charset=utf-8" if mime.startswith(TEXT_TYPES) else mime
+
+
+def accepted_encodings(header):
+    """Encodings from an Accept-Encoding header, without those explicitly refused (q=0)."""
+    accepted = set()
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        if name and params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+class StaticRequestHandler(BaseHTTPRequestHandler):
+    """GET/HEAD for files in `root`, preferring fresh precompressed variants."""
+
+    root = '.'
+
+    def do_HEAD(self):
+        """Handle HEAD requests."""
+        self._serve(body=False)
+
+    def do_GET(self):
+        """Handle GET requests."""
+        self._serve(body=True)
+
+    def _resolve(self):
+        path = unquote(urlparse(self.path).path)
+        if path in ('', '/'):
+            path = '/' + INDEX_PAGE
+        parts = [part for part in path.split('/') if part]
+        # No parent references, hidden files (in-progress temp files) or directories
+        if any(part.startswith('.') for part in parts):
+            return None
+        full = os.path.join(self.root, *parts)
+        return full if os.path.isfile(full) else None
+
+    def _variant(self, path, stat):
+        """The (encoding, path, stat) to send: a fresh compressed variant if the client accepts one."""
+        accepted = accepted_encodings(self.headers.get('Accept-Encoding'))
+        for encoding, suffix in ENCODINGS.items():
+            if encoding not in accepted:
+                continue
+            try:
+                variant_stat = os.stat(path + suffix)
+            except OSError:
+                continue
+            if variant_stat.st_mtime_ns >= stat.st_mtime_ns:
+                return encoding, path + suffix, variant_stat
+        return None, path, stat
+
+    def _not_modified(self, etag, mtime):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return if_none_match.strip() == '*' or etag in [t.strip() for t in if_none_match.split(',')]
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _serve(self, body):
+        path = self._resolve()
+        if path is None:
+            return self._send_error(404, 'Not found')
+
+        stat = os.stat(path)
+        encoding, send_path, send_stat = self._variant(path, stat)
+        # One validator per representation: source version plus the encoding sent
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}{"-" + encoding if encoding else ""}"'
+        name = os.path.basename(path)
+
+        not_modified = self._not_modified(etag, stat.st_mtime)
+        self.send_response(304 if not_modified else 200)
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', formatdate(stat.st_mtime, usegmt=True))
+        self.send_header('Cache-Control', IMMUTABLE_CACHE if HASHED_ASSET.search(name) else REVALIDATE_CACHE)
+        if name.endswith(COMPRESSIBLE):
+            self.send_header('Vary', 'Accept-Encoding')
+        if not_modified:
+            self.end_headers()
+            return
+
+        self.send_header('Content-Type', content_type(path))
+        self.send_header('Content-Length', str(send_stat.st_size))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        if body:
+            with open(send_path, 'rb') as f:
+                shutil.copyfileobj(f, self.wfile, COPY_BUFFER_SIZE)
+
+    def _send_error(self, status, message):
+        data = message.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        """Log requests on one line."""
+        print(f"  {self.command} {self.path} - {format % args}", flush=True)
+
+
+def make_server(root, host='127.0.0.1', port=8766):
+    """Create a threaded HTTP server for a directory."""
+    handler = type('Handler', (StaticRequestHandler,), {'root': os.path.abspath(root)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description='Serve the outputs directory with precompression and caching')
+    parser.add_argument('output_dir', nargs='?', default=os.getenv('MORNING_ROUTINE_OUTPUT_DIR', './outputs'))
+    parser.add_argument('--host', default='127.0.0.1', help='Host to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8766, help='Port to bind (default: 8766)')
+    parser.add_argument('--precompress', nargs='*', choices=sorted(ENCODINGS),
+                        help='Write missing/stale variants before serving (default encodings: gzip br)')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.output_dir):
+        print(f"✗ No outputs directory: {args.output_dir}")
+        return 1
+
+    if args.precompress is not None:
+        written = precompress_dir(args.output_dir, args.precompress or ['gzip', 'br'])
+        print(f"🗜️  {len(written)} precompressed variants written")
+
+    server = make_server(args.output_dir, args.host, args.port)
+    print(f"✓ Serving {os.path.abspath(args.output_dir)} at http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\nServer stopped")
+        sys.exit(0)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Synthetic Mailbox
+Generates a reproducible mailbox of RFC 822 messages for offline benchmarks:
+configurable message count, size distribution, HTML and attachment rates,
+charsets (UTF-8, GB2312, Latin-1), reply threads, automated senders and
+unread flags. The same parameters and seed always give the same bytes.
+"""
+
+import sys
+import math
+import random
+import argparse
+from collections import Counter, namedtuple
+from datetime import datetime, timedelta, timezone
+from email.header import Header
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import format_datetime, formataddr
+
+DEFAULT_CHARSETS = ('utf-8', 'gb2312', 'iso-8859-1')
+
+PEOPLE = [('Alice Chen', 'alice@example.com'), ('张三', 'zhangsan@example.cn'),
+          ('Bob Martin', 'bob@example.org'), ('李四', 'lisi@example.cn'), ('Carol Diaz', 'carol@example.com')]
+AUTOMATED = [('GitHub', 'notifications@github.com'), ('Weekly Digest', 'noreply@news.example.com'),
+             ('Shop', 'no-reply@shop.example.com')]
+
+SUBJECTS_EN = ['Q3 budget review', 'Please confirm the meeting time', 'Design feedback for the dashboard',
+               'Action required: sign the contract', 'Weekly newsletter', 'Your order has shipped',
+               'Deadline moved to Friday', '3 pull requests awaiting review']
+SUBJECTS_ZH = ['项目进度更新', '请确认下周的出差安排', '会议纪要和待办事项', '请在周五之前提交报告']
+
+SENTENCES_EN = ['Please review the attached budget before Friday.',
+                'Can you confirm the meeting time for tomorrow?',
+                'The weekly numbers are in the shared folder.',
+                'We need your approval on the revised contract by end of day.',
+                'Thanks for the update, everything looks good on our side.',
+                'Let me know if you have any questions about the proposal.']
+SENTENCES_ZH = ['请在周五之前确认会议时间并回复邮件。', '本周项目进展顺利，团队已经完成了测试。',
+                '附件是最新的预算表，请查收。', '麻烦尽快审核合同并给出意见。']
+
+SyntheticMessage = namedtuple('SyntheticMessage', ['raw', 'date', 'unread', 'thread_id', 'message_id', 'automated'])
+SyntheticMessage.__doc__ = """One generated message: RFC 822 bytes plus the metadata servers need."""
+
+
+class SyntheticMailbox:
+    """A generated mailbox, oldest message first (IMAP sequence order)."""
+
+    def __init__(self, count=200, seed=0, median_kb=6.0, size_sigma=1.0, html_rate=0.5,
+                 attachment_rate=0.1, attachment_kb=150, charsets=DEFAULT_CHARSETS,
+                 unread_rate=0.3, reply_rate=0.3, automated_rate=0.3, span_hours=72, now=None):
+        self.params = {
+            'count': count, 'seed': seed, 'median_kb': median_kb, 'size_sigma': size_sigma,
+            'html_rate': html_rate, 'attachment_rate': attachment_rate, 'attachment_kb': attachment_kb,
+            'charsets': tuple(charsets), 'unread_rate': unread_rate, 'reply_rate': reply_rate,
+            'automated_rate': automated_rate, 'span_hours': span_hours
+        }
+        now = now or datetime.now(timezone.utc).replace(microsecond=0)
+        rng = random.Random(seed)
+        self.messages = []
+        for index in range(count):
+            date = now - timedelta(hours=span_hours * (count - index) / max(count, 1))
+            self.messages.append(self._message(rng, index, date))
+
+    def _message(self, rng, index, date):
+        p = self.params
+        charset = rng.choice(p['charsets'])
+        # Latin-1 cannot carry Chinese text
+        chinese = charset != 'iso-8859-1' and rng.random() < 0.5
+        automated = rng.random() < p['automated_rate']
+        name, address = rng.choice(AUTOMATED if automated else PEOPLE)
+        if charset == 'iso-8859-1' and not name.isascii():
+            name, address = PEOPLE[0]
+        message_id = f"<{index}.{p['seed']}@synthetic.local>"
+
+        subject = rng.choice(SUBJECTS_ZH if chinese else SUBJECTS_EN)
+        parent = None
+        if index and not automated and rng.random() < p['reply_rate']:
+            parent = self.messages[rng.randrange(max(0, index - 20), index)]
+            subject = f"Re: {subject}"
+
+        # Log-normal size around the median, built from whole sentences
+        target = min(int(p['median_kb'] * 1024 * math.exp(rng.gauss(0, p['size_sigma']))), 2 << 20)
+        sentences = SENTENCES_ZH + SENTENCES_EN if chinese else SENTENCES_EN
+        lines, size = [], 0
+        while size < target:
+            lines.append(rng.choice(sentences))
+            size += len(lines[-1].encode('utf-8')) + 1
+        text = '\n'.join(lines)
+
+        if rng.random() < p['html_rate']:
+            html = '<html><body>' + ''.join(f"<p>{line}</p>" for line in lines) + '</body></html>'
+            body = MIMEMultipart('alternative')
+            body.attach(MIMEText(text, 'plain', charset))
+            body.attach(MIMEText(html, 'html', charset))
+        else:
+            body = MIMEText(text, 'plain', charset)
+
+        if rng.random() < p['attachment_rate']:
+            msg = MIMEMultipart('mixed')
+            msg.attach(body)
+            attachment = MIMEApplication(rng.randbytes(int(p['attachment_kb'] * 1024)), 'pdf')
+            attachment.add_header('Content-Disposition', 'attachment', filename=f"report-{index}.pdf")
+            msg.attach(attachment)
+        else:
+            msg = body
+
+        msg['Subject'] = Header(subject, charset)
+        msg['From'] = formataddr((str(Header(name, charset)) if not name.isascii() else name, address))
+        msg['To'] = 'me@example.com'
+        msg['Date'] = format_datetime(date)
+        msg['Message-ID'] = message_id
+        if parent:
+            msg['In-Reply-To'] = parent.message_id
+            msg['References'] = parent.message_id
+
+        return SyntheticMessage(
+            raw=msg.as_bytes(),
+            date=date,
+            unread=rng.random() < p['unread_rate'],
+            thread_id=parent.thread_id if parent else f"{index:016x}",
+            message_id=message_id,
+            automated=automated
+        )
+
+    def __len__(self):
+        return len(self.messages)
+
+    def describe(self):
+        """Summary line: count, total size, unread count and charset mix."""
+        total = sum(len(m.raw) for m in self.messages)
+        unread = sum(m.unread for m in self.messages)
+        charsets = Counter()
+        for message in self.messages:
+            for charset in self.params['charsets']:
+                if f'charset="{charset}"'.encode() in message.raw:
+                    charsets[charset] += 1
+                    break
+        mix = ', '.join(f"{name} {n}" for name, n in charsets.most_common())
+        return (f"{len(self.messages)} messages, {total / 1e6:.1f} MB, {unread} unread"
+                + (f" ({mix})" if mix else ''))
+
+
+def main():
+    """Generate a mailbox and print its summary (optionally write it as an mbox file)."""
+    parser = argparse.ArgumentParser(description='Generate a synthetic mailbox')
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--median-kb', type=float, default=6.0)
+    parser.add_argument('--attachment-rate', type=float, default=0.1)
+    parser.add_argument('--mbox', help='Write the messages to this mbox file')
+    args = parser.parse_args()
+
+    mailbox = SyntheticMailbox(args.count, args.seed, args.median_kb, attachment_rate=args.attachment_rate)
+    print(mailbox.describe())
+
+    if args.mbox:
+        with open(args.mbox, 'wb') as f:
+            for message in mailbox.messages:
+                f.write(b'From synthetic@example.com ' + message.date.strftime('%a %b %d %H:%M:%S %Y').encode()
+                        + b'\n' + message.raw.replace(b'\nFrom ', b'\n>From ') + b'\n\n')
+        print(f"✓ {args.mbox}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
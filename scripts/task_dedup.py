@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Task Elimination
+MinHash signatures over normalized task tokens, an LSH band index to find
+candidate pairs without comparing every task to every other, and exact Jaccard
+verification before merging.
+"""
+
+import re
+import sys
+import time
+import zlib
+import random
+import argparse
+
+NUM_PERMUTATIONS = 32
+BAND_ROWS = 2
+DEFAULT_THRESHOLD = 0.5
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20260203)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERMUTATIONS)]
+
+_TOKEN = re.compile(r'[a-z][a-z0-9]*|[一-鿿]+')
+_TASK_PREFIX = re.compile(r'^\s*(respond to|reply to|re|fwd?)\s*[:：]\s*', re.IGNORECASE)
+
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'to', 'for', 'of', 'on', 'in', 'at', 'with', 'from',
+    'your', 'my', 'our', 'all', 'any', 'is', 'are', 'be', 'this', 'that', 'it'
+}
+
+PRIORITY_RANK = {'high': 3, 'medium': 2, 'low': 1}
+
+
+def _stem(word):
+    """Very light English stemming so plurals and -ing forms line up."""
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'  # replies -> reply
+    if len(word) > 6 and word.endswith('ing'):
+        return word[:-3]
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]  # updates -> update, not address -> addres
+    return word
+
+
+def task_tokens(text):
+    """Normalized token set of a task: lowercase words (stemmed) and CJK bigrams."""
+    text = _TASK_PREFIX.sub('', text or '').lower()
+    tokens = set()
+    for token in _TOKEN.findall(text):
+        if '一' <= token[0] <= '鿿':
+            tokens.update(token[i:i + 2] for i in range(max(1, len(token) - 1)))
+        elif token not in STOPWORDS:
+            tokens.add(_stem(token))
+    return tokens
+
+
+def minhash(tokens):
+    """MinHash signature of a token set."""
+    hashes = [zlib.crc32(token.encode('utf-8')) for token in tokens]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def jaccard(a, b):
+    """Exact Jaccard similarity of two sets."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def candidate_pairs(signatures):
+    """Pairs of indexes sharing at least one LSH band bucket."""
+    buckets = {}
+    for i, signature in enumerate(signatures):
+        if signature is None:
+            continue
+        for band in range(0, NUM_PERMUTATIONS, BAND_ROWS):
+            buckets.setdefault((band, signature[band:band + BAND_ROWS]), []).append(i)
+
+    pairs = set()
+    for members in buckets.values():
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                pairs.add((members[x], members[y]))
+    return pairs
+
+
+def dedupe_tasks(tasks, threshold=DEFAULT_THRESHOLD):
+    """Merge near-duplicate tasks, keeping the earliest one of each group.
+
+    The kept task takes the highest priority of its group and records every
+    source in 'sources' and the merged task texts in 'merged_from'.
+    """
+    token_sets = [task_tokens(task.get('task', '')) for task in tasks]
+    signatures = [minhash(tokens) if tokens else None for tokens in token_sets]
+
+    parent = list(range(len(tasks)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in candidate_pairs(signatures):
+        if jaccard(token_sets[i], token_sets[j]) >= threshold:
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    groups = {}
+    for i in range(len(tasks)):
+        groups.setdefault(find(i), []).append(i)
+
+    deduped = []
+    for root in sorted(groups):
+        members = groups[root]
+        task = dict(tasks[root])
+        if len(members) > 1:
+            group = [tasks[i] for i in members]
+            task['priority'] = max((t.get('priority', 'medium') for t in group),
+                                   key=lambda p: PRIORITY_RANK.get(p, 0))
+            task['sources'] = list(dict.fromkeys(t.get('source', 'unknown') for t in group))
+            task['merged_from'] = [t.get('task', '') for t in group[1:]]
+        deduped.append(task)
+    return deduped
+
+
+def _synthetic_tasks(count, seed=0):
+    """Task list where about a third of entries are rephrased duplicates."""
+    rng = random.Random(seed)
+    verbs = ['Review', 'Prepare', 'Update', 'Draft', 'Schedule', 'Check', 'Approve', 'Send']
+    syllables = ['ka', 'lo', 'mi', 'ren', 'tas', 'vo', 'pel', 'dri', 'son', 'qua', 'zet', 'bur']
+    nouns = sorted({''.join(rng.sample(syllables, 3)) for _ in range(2000)})
+    tasks = []
+    for _ in range(count):
+        if tasks and rng.random() < 0.33:
+            base = rng.choice(tasks)['task']
+            tasks.append({'task': f"Respond to: {base} pending", 'priority': 'medium', 'source': 'email'})
+        else:
+            words = ' '.join(rng.sample(nouns, 4))
+            tasks.append({'task': f"{rng.choice(verbs)} {words}", 'priority': 'high', 'source': 'user'})
+    return tasks
+
+
+def main():
+    """Benchmark LSH dedup against all-pairs comparison."""
+    parser = argparse.ArgumentParser(description='Benchmark near-duplicate task elimination')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000])
+    args = parser.parse_args()
+
+    print(f"{'tasks':>6} {'kept':>6} {'lsh ms':>9} {'all-pairs ms':>13}")
+    for size in args.sizes:
+        tasks = _synthetic_tasks(size)
+
+        start = time.perf_counter()
+        kept = dedupe_tasks(tasks)
+        lsh_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        token_sets = [task_tokens(t['task']) for t in tasks]
+        for i in range(len(token_sets)):
+            for j in range(i + 1, len(token_sets)):
+                jaccard(token_sets[i], token_sets[j])
+        pairs_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{size:>6} {len(kept):>6} {lsh_ms:>9.1f} {pairs_ms:>13.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
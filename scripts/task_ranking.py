@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Task Ranking
+Scores tasks from priority, sender weight, unread status, recency and keyword
+hits, and selects the top k with a heap (O(n log k)).
+"""
+
+import os
+import sys
+import json
+import time
+import heapq
+import random
+import argparse
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+from keyword_matcher import ACTION_MATCHER, TASK_MATCHER
+from mail_headers import parse_address
+from sender_rules import is_automated_sender
+
+DEFAULT_WEIGHTS_PATH = Path(__file__).parent.parent / "assets" / "ranking_weights.json"
+
+DEFAULT_MODEL = {
+    'weights': {'priority': 1.0, 'sender': 1.0, 'unread': 0.5, 'recency': 1.0, 'keywords': 0.5, 'sources': 0.5},
+    'priorities': {'high': 3.0, 'medium': 2.0, 'low': 1.0},
+    'recency_half_life_hours': 12,
+    'automated_sender_weight': -1.0,
+    'senders': {}
+}
+
+MAX_KEYWORD_HITS = 3
+
+_model = None
+
+
+def load_model(path=None):
+    """Load the ranking model, filling unspecified values from the defaults."""
+    path = path or os.getenv('MORNING_ROUTINE_RANKING_WEIGHTS') or DEFAULT_WEIGHTS_PATH
+    model = json.loads(json.dumps(DEFAULT_MODEL))
+    if Path(path).exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        for key, value in config.items():
+            if isinstance(value, dict) and isinstance(model.get(key), dict):
+                model[key].update(value)
+            elif key in model:
+                model[key] = value
+    model['senders'] = {k.lower(): v for k, v in model['senders'].items()}
+    return model
+
+
+def default_model():
+    """The ranking model shared by the process, loaded once."""
+    global _model
+    if _model is None:
+        _model = load_model()
+    return _model
+
+
+def sender_weight(from_header, model):
+    """Configured weight of a sender (full address first, then domain suffixes)."""
+    if not from_header:
+        return 0.0
+    address = parse_address(from_header)[1]
+    if address in model['senders']:
+        return model['senders'][address]
+    labels = address.rpartition('@')[2].split('.')
+    for i in range(len(labels)):
+        suffix = '.'.join(labels[i:])
+        if suffix in model['senders']:
+            return model['senders'][suffix]
+    if is_automated_sender(from_header):
+        return model['automated_sender_weight']
+    return 0.0
+
+
+def recency(date_header, half_life_hours, now=None):
+    """Exponential decay in [0, 1] by message age; 0 when the date is unknown."""
+    if not date_header:
+        return 0.0
+    try:
+        sent = parsedate_to_datetime(date_header)
+    except (TypeError, ValueError, IndexError):
+        return 0.0
+    if sent.tzinfo is None:
+        sent = sent.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    age_hours = max(0.0, (now - sent).total_seconds() / 3600)
+    return 0.5 ** (age_hours / half_life_hours)
+
+
+def score_task(task, model=None, now=None):
+    """Weighted score of one task; higher is more important."""
+    model = model or default_model()
+    weights = model['weights']
+    text = task.get('task', '')
+    keyword_hits = len(ACTION_MATCHER.hits(text) | TASK_MATCHER.hits(text))
+
+    return (
+        weights['priority'] * model['priorities'].get(task.get('priority'), 0.0)
+        + weights['sender'] * sender_weight(task.get('from'), model)
+        + weights['unread'] * (1.0 if task.get('unread') else 0.0)
+        + weights['recency'] * recency(task.get('date'), model['recency_half_life_hours'], now)
+        + weights['keywords'] * min(keyword_hits, MAX_KEYWORD_HITS)
+        + weights['sources'] * (len(task.get('sources', ())) - 1 if task.get('sources') else 0)
+    )
+
+
+def top_k(tasks, k, model=None):
+    """The k highest-scoring tasks, best first; ties keep their original order."""
+    model = model or default_model()
+    now = datetime.now(timezone.utc)
+    ranked = heapq.nlargest(k, enumerate(tasks), key=lambda item: (score_task(item[1], model, now), -item[0]))
+    return [task for _, task in ranked]
+
+
+def main():
+    """Benchmark heap top-k selection against a full sort of the scores."""
+    parser = argparse.ArgumentParser(description='Benchmark scored top-k task selection')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('-k', type=int, default=8)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words = ['Review', 'budget', 'deadline', 'meeting', 'notes', 'urgent', 'release', 'please', 'plan']
+    model = default_model()
+    print(f"{'tasks':>7} {'score ms':>9} {'heap ms':>8} {'sort ms':>8}")
+    for size in args.sizes:
+        tasks = [{
+            'task': ' '.join(rng.sample(words, 4)),
+            'priority': rng.choice(['high', 'medium', 'low']),
+            'unread': rng.random() < 0.5,
+            'from': rng.choice(['boss@company.com', 'noreply@github.com', 'friend@example.com'])
+        } for _ in range(size)]
+
+        start = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        scores = [score_task(task, model, now) for task in tasks]
+        score_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        heapq.nlargest(args.k, range(size), key=scores.__getitem__)
+        heap_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        sorted(range(size), key=scores.__getitem__, reverse=True)[:args.k]
+        sort_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{size:>7} {score_ms:>9.1f} {heap_ms:>8.2f} {sort_ms:>8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
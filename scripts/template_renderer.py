@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Template Renderer
+Compiles a small template syntax once ({{ name.attr }} for values, escaped in
+HTML templates; {{ name|raw }} for trusted markup; {% for item in items %}...
+{% endfor %} for loops; {% include "partial" %} for partials) and streams the
+output to any writer, so a page with thousands of tasks is written piece by
+piece instead of by repeated string concatenation.
+"""
+
+import io
+import re
+import sys
+import time
+import tempfile
+import argparse
+import tracemalloc
+from html import escape
+from pathlib import Path
+
+TEMPLATES_DIR = Path(__file__).parent.parent / "assets"
+
+WRITE_BUFFER_SIZE = 1 << 16
+
+# A block tag alone on its line takes its trailing newline with it
+_TAG = re.compile(r'\{\{\s*([\w.]+)(\|raw)?\s*\}\}|\{%\s*(.+?)\s*%\}\n?')
+_FOR = re.compile(r'for\s+(\w+)\s+in\s+([\w.]+)$')
+_INCLUDE = re.compile(r'include\s+["\']([^"\']+)["\']$')
+
+# Templates with these suffixes HTML-escape their values by default
+ESCAPED_SUFFIXES = ('.html', '.htm')
+
+
+class TemplateError(Exception):
+    """Raised for malformed templates."""
+
+
+class Template:
+    """A template compiled once into a Python render function.
+
+    Values are looked up in dict contexts: {{ task.text }} is task['text'] inside a
+    loop over tasks, or context['task']['text'] otherwise. {% include "name" %}
+    inlines a partial fetched through `loader` at compile time.
+    """
+
+    def __init__(self, source, name='<string>', escape_values=True, loader=None):
+        self.name = name
+        self.escape = escape if escape_values else str
+        self.loader = loader
+        self.includes = []
+        self.nodes = self._parse(source, (name,))
+        self._render = self._compile(self.nodes)
+
+    def _parse(self, source, parents):
+        root = []
+        stack = [(None, root)]
+        pos = 0
+        for match in _TAG.finditer(source):
+            body = stack[-1][1]
+            if match.start() > pos:
+                body.append(source[pos:match.start()])
+            pos = match.end()
+
+            if match.group(1):
+                body.append(('value', tuple(match.group(1).split('.')), bool(match.group(2))))
+                continue
+
+            statement = match.group(3)
+            loop = _FOR.match(statement)
+            include = _INCLUDE.match(statement)
+            if include:
+                partial = include.group(1)
+                if partial in parents:
+                    raise TemplateError(f"{self.name}: recursive include of '{partial}'")
+                if self.loader is None:
+                    raise TemplateError(f"{self.name}: no loader for include '{partial}'")
+                if partial not in self.includes:
+                    self.includes.append(partial)
+                body.extend(self._parse(self.loader(partial), parents + (partial,)))
+            elif loop:
+                node = ('for', loop.group(1), tuple(loop.group(2).split('.')), [])
+                body.append(node)
+                stack.append((node, node[3]))
+            elif statement == 'endfor':
+                if len(stack) == 1:
+                    raise TemplateError(f"{self.name}: 'endfor' without 'for'")
+                stack.pop()
+            else:
+                raise TemplateError(f"{self.name}: unknown tag '{{% {statement} %}}'")
+
+        if len(stack) > 1:
+            raise TemplateError(f"{self.name}: unclosed 'for {stack[-1][0][1]}'")
+        if pos < len(source):
+            stack[-1][1].append(source[pos:])
+        return root
+
+    def _compile(self, nodes):
+        """Generate one function; each run of literals and values becomes a single write."""
+        lines = ['def render(context, write, escape):']
+
+        # Loop variables get their own prefix so no template name can shadow a keyword,
+        # a builtin, or a name the generated code uses
+        def local(name):
+            return f"loop_{name}"
+
+        def expression(path, loop_vars):
+            head = local(path[0]) if path[0] in loop_vars else f"context[{path[0]!r}]"
+            return head + ''.join(f"[{part!r}]" for part in path[1:])
+
+        def emit(body, depth, loop_vars):
+            indent = '    ' * depth
+            parts = []
+            for node in body + [None]:
+                if type(node) is str:
+                    parts.append(repr(node))
+                    continue
+                if node is not None and node[0] == 'value':
+                    value = f"str({expression(node[1], loop_vars)})"
+                    parts.append(value if node[2] else f"escape({value})")
+                    continue
+                if parts:
+                    lines.append(f"{indent}write({' + '.join(parts)})")
+                    parts = []
+                if node is not None:
+                    _, name, path, loop_body = node
+                    if not name.isidentifier():
+                        raise TemplateError(f"{self.name}: invalid loop variable '{name}'")
+                    lines.append(f"{indent}for {local(name)} in {expression(path, loop_vars)}:")
+                    emit(loop_body, depth + 1, loop_vars | {name})
+                    if not loop_body:
+                        lines.append(f"{indent}    pass")
+
+        emit(nodes, 1, frozenset())
+        if len(lines) == 1:
+            lines.append('    pass')
+        namespace = {}
+        exec(compile('\n'.join(lines), self.name, 'exec'), namespace)
+        return namespace['render']
+
+    def stream(self, writer, context):
+        """Write the rendered template to a file-like object."""
+        self._render(context, writer.write, self.escape)
+
+    def render(self, context):
+        """Render the template to a string."""
+        buffer = io.StringIO()
+        self.stream(buffer, context)
+        return buffer.getvalue()
+
+    def render_to_file(self, path, context):
+        """Stream the rendered template to a file through a large write buffer."""
+        with open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            self.stream(f, context)
+        return path
+
+
+_compiled = {}
+
+
+def load_template(name, templates_dir=TEMPLATES_DIR, escape_values=None):
+    """Compile a named template once per process.
+
+    Partials are resolved from the same directory. The compiled template is reused
+    until the template or one of its partials changes on disk. HTML templates
+    escape values unless `escape_values` says otherwise.
+    """
+    templates_dir = Path(templates_dir)
+    key = (templates_dir / name, escape_values)
+    cached = _compiled.get(key)
+    if cached is not None:
+        mtimes, template = cached
+        if all((templates_dir / dep).stat().st_mtime_ns == mtime for dep, mtime in mtimes):
+            return template
+
+    if escape_values is None:
+        escape_values = name.endswith(ESCAPED_SUFFIXES)
+    template = Template((templates_dir / name).read_text(encoding='utf-8'), name, escape_values,
+                        loader=lambda partial: (templates_dir / partial).read_text(encoding='utf-8'))
+    mtimes = [(dep, (templates_dir / dep).stat().st_mtime_ns) for dep in [name] + template.includes]
+    _compiled[key] = (mtimes, template)
+    return template
+
+
+def _concat_tasks(tasks):
+    """The previous approach: one f-string of task markup appended per task (benchmark baseline)."""
+    html = ""
+    for i, task in enumerate(tasks):
+        source_label = ' + '.join(task.get('sources', [task['source']]))
+        html += f"""
+                <div class="task-item" data-task-id="{i}">
+                    <div class="task-checkbox"></div>
+                    <div class="task-content">
+                        <div class="task-text">{task['task']}</div>
+                        <div class="task-meta">
+                            <span class="task-priority {task['priority']}">{task['priority'].upper()}</span>
+                            <span class="task-source">📝 {source_label}</span>
+                        </div>
+                    </div>
+                </div>
+"""
+    return html
+
+
+def main():
+    """Benchmark the briefing page: streamed JSON task payload vs concatenated task markup."""
+    from briefing_model import build_briefing
+    from generate_morning_briefing_final import task_context
+
+    parser = argparse.ArgumentParser(description='Benchmark the compiled briefing page renderer')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000, 20000])
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    template = load_template('briefing_template.html')
+    print(f"compile: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    print(f"{'tasks':>7} {'concat ms':>10} {'stream ms':>10} {'concat peak MB':>15} {'stream peak MB':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        concat_path, stream_path = Path(tmp, 'concat.html'), Path(tmp, 'stream.html')
+        for size in args.sizes:
+            tasks = [{'task': f"Review <item> #{i} & reply", 'priority': ('high', 'medium', 'low')[i % 3],
+                      'source': ('user', 'email', 'ai')[i % 3]} for i in range(size)]
+            # Built once per run and shared by every renderer, so not part of the timing
+            briefing = build_briefing('12 unread emails', tasks)
+
+            def concat():
+                concat_path.write_text(_concat_tasks(tasks), encoding='utf-8')
+
+            def stream():
+                template.render_to_file(stream_path, task_context(briefing))
+
+            results = []
+            for run in (concat, stream):
+                start = time.perf_counter()
+                run()
+                elapsed = (time.perf_counter() - start) * 1000
+                tracemalloc.start()
+                run()
+                peak = tracemalloc.get_traced_memory()[1] / 1e6
+                tracemalloc.stop()
+                results += [elapsed, peak]
+
+            print(f"{size:>7} {results[0]:>10.1f} {results[2]:>10.1f} {results[1]:>15.1f} {results[3]:>15.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Trace Spans
+Timing spans for briefing runs. Code marks its phases with
+`with span('fetch'): ...` (connect, login, search, fetch, parse, classify,
+extract, render-html, render-image); when a run is profiled the spans are
+recorded and written as a Chrome trace (open it in chrome://tracing or
+Perfetto) and/or summarized in a table. Unprofiled runs pay only a flag check.
+
+Entry points decorate main() with @profiled, which accepts `--profile`
+(print the summary table at exit) and `--trace PATH` (write the trace file);
+MORNING_ROUTINE_TRACE sets a default trace path. Worker processes record their
+own spans and hand them back with export(); the parent adds them with merge().
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import functools
+from collections import namedtuple
+from contextlib import nullcontext
+
+# process is None for spans recorded in this process, else the worker's pid
+TraceEvent = namedtuple('TraceEvent', ['name', 'category', 'start', 'seconds', 'thread', 'args', 'process'],
+                        defaults=(None,))
+
+_NO_SPAN = nullcontext()
+
+
+class Recorder:
+    """Completed spans of one run, appended from any thread."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.events = []
+        self.threads = {}
+        self.lock = threading.Lock()
+
+    def add(self, name, category, start, seconds, args):
+        thread = threading.current_thread()
+        with self.lock:
+            # Small, stable thread ids keep the trace viewer's rows readable
+            tid = self.threads.setdefault(thread.ident, (len(self.threads) + 1, thread.name, None))[0]
+            self.events.append(TraceEvent(name, category, start - self.origin, seconds, tid, args))
+
+    def export(self):
+        """The recording as picklable data for merge() in another process."""
+        with self.lock:
+            return {'pid': os.getpid(), 'origin': self.origin,
+                    'threads': [(ident, tid, name) for ident, (tid, name, _) in self.threads.items()],
+                    'events': [tuple(event) for event in self.events]}
+
+    def merge(self, exported):
+        """Add spans exported by a worker process, on this recording's timeline.
+
+        perf_counter is a system-wide monotonic clock, so the workers' start
+        times line up with ours once their origin is accounted for.
+        """
+        pid = exported['pid']
+        shift = exported['origin'] - self.origin
+        with self.lock:
+            tids = {tid: self.threads.setdefault(('process', pid, ident),
+                                                 (len(self.threads) + 1, f"{name} (pid {pid})", pid))[0]
+                    for ident, tid, name in exported['threads']}
+            for event in exported['events']:
+                event = TraceEvent(*event)
+                self.events.append(event._replace(start=event.start + shift, thread=tids[event.thread],
+                                                  process=pid))
+
+
+_recorder = None
+
+
+class _Span:
+    __slots__ = ('name', 'category', 'args', 'start')
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        recorder = _recorder
+        if recorder is not None:
+            args = self.args
+            if exc_type is not None:
+                args = {**args, 'error': exc_type.__name__}
+            recorder.add(self.name, self.category, self.start, time.perf_counter() - self.start, args)
+        return False
+
+
+def span(name, category='briefing', **args):
+    """Context manager timing one phase; a no-op unless recording is enabled."""
+    if _recorder is None:
+        return _NO_SPAN
+    return _Span(name, category, args)
+
+
+def traced(name, category='briefing'):
+    """Decorator form of span() for functions that are one phase end to end."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def enable():
+    """Start recording spans (dropping any earlier recording)."""
+    global _recorder
+    _recorder = Recorder()
+    return _recorder
+
+
+def disable():
+    """Stop recording; returns the recorder that was active, if any."""
+    global _recorder
+    recorder, _recorder = _recorder, None
+    return recorder
+
+
+def recording():
+    """True while spans are being recorded."""
+    return _recorder is not None
+
+
+def merge(exported):
+    """Add a worker's exported spans to the active recording, if any."""
+    recorder = _recorder
+    if recorder is not None and exported:
+        recorder.merge(exported)
+
+
+def chrome_trace(recorder):
+    """The recorded spans in Chrome's Trace Event Format ('X' complete events, microseconds)."""
+    pid = os.getpid()
+    events = [{'name': 'thread_name', 'ph': 'M', 'pid': process or pid, 'tid': tid, 'args': {'name': name}}
+              for tid, name, process in recorder.threads.values()]
+    events += [{'name': e.name, 'cat': e.category, 'ph': 'X', 'pid': e.process or pid, 'tid': e.thread,
+                'ts': round(e.start * 1e6, 3), 'dur': round(e.seconds * 1e6, 3), 'args': e.args}
+               for e in recorder.events]
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def write_trace(recorder, path):
+    """Write the Chrome trace JSON atomically."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.")
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(chrome_trace(recorder), f)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+    return path
+
+
+def summarize(recorder):
+    """Per-span-name rows (name, count, total, mean, max seconds), in order of first appearance."""
+    rows = {}
+    for event in recorder.events:
+        row = rows.setdefault(event.name, [0, 0.0, 0.0, event.start])
+        row[0] += 1
+        row[1] += event.seconds
+        row[2] = max(row[2], event.seconds)
+        row[3] = min(row[3], event.start)
+    ordered = sorted(rows.items(), key=lambda item: item[1][3])
+    return [(name, count, total, total / count, longest) for name, (count, total, longest, _) in ordered]
+
+
+def print_summary(recorder, wall=None):
+    """Print the span summary table; share is of the run's wall time (parallel spans can add past 100%)."""
+    wall = wall or (time.perf_counter() - recorder.origin)
+    print(f"\n⏱️  Profile ({wall * 1000:.1f} ms wall):")
+    print(f"  {'span':<22} {'count':>6} {'total ms':>10} {'mean ms':>9} {'max ms':>9} {'share':>7}")
+    for name, count, total, mean, longest in summarize(recorder):
+        print(f"  {name:<22} {count:>6} {total * 1000:>10.1f} {mean * 1000:>9.2f} "
+              f"{longest * 1000:>9.1f} {total / wall:>7.1%}")
+
+
+def profile_options(argv=None):
+    """Take --profile and --trace PATH out of argv (sys.argv by default); returns (profile, trace_path)."""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--profile', action='store_true')
+    parser.add_argument('--trace', default=os.getenv('MORNING_ROUTINE_TRACE') or None)
+    if argv is None:
+        args, rest = parser.parse_known_args(sys.argv[1:])
+        sys.argv[1:] = rest
+    else:
+        args, _ = parser.parse_known_args(argv)
+    return args.profile, args.trace
+
+
+def profiled(main):
+    """Decorate an entry point's main() with --profile/--trace handling.
+
+    The flags are removed from sys.argv before main() parses its own arguments.
+    """
+    @functools.wraps(main)
+    def wrapper(*args, **kwargs):
+        profile, trace_path = profile_options()
+        if not (profile or trace_path):
+            return main(*args, **kwargs)
+
+        recorder = enable()
+        try:
+            with span('main', 'run'):
+                return main(*args, **kwargs)
+        finally:
+            disable()
+            if trace_path:
+                try:
+                    print(f"\n🧭 Trace written: {write_trace(recorder, trace_path)}")
+                except OSError as e:
+                    print(f"\n✗ Error writing trace: {e}")
+            if profile:
+                print_summary(recorder)
+    return wrapper
+
+
+def main():
+    """Summarize a trace file written by a profiled run."""
+    parser = argparse.ArgumentParser(description='Print the span summary of a Chrome trace file')
+    parser.add_argument('trace', help='Trace JSON written with --trace')
+    args = parser.parse_args()
+
+    with open(args.trace, 'r', encoding='utf-8') as f:
+        events = json.load(f)['traceEvents']
+
+    recorder = Recorder()
+    recorder.origin = 0.0
+    for e in events:
+        if e.get('ph') == 'X':
+            recorder.events.append(TraceEvent(e['name'], e.get('cat', ''), e['ts'] / 1e6, e['dur'] / 1e6,
+                                              e['tid'], e.get('args', {})))
+    if not recorder.events:
+        print("✗ No spans in trace")
+        return 1
+    wall = max(e.start + e.seconds for e in recorder.events) - min(e.start for e in recorder.events)
+    print_summary(recorder, wall)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())